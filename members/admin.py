@@ -1,35 +1,172 @@
+from datetime import datetime, timedelta, timezone
+
 from django import forms
+from django.conf import settings
 from django.contrib import admin, messages
 from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.http import FileResponse, Http404, JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.views.decorators.http import require_POST
+
+from .models import (
+    BingoItem,
+    BingoSubmission,
+    BingoSubmissionAttachment,
+    Event,
+    Member,
+    SubmissionStatusEvent,
+    Team,
+    TeamProgress,
+)
+from .profiling import (
+    DEFAULT_TOKEN_MAX_AGE,
+    QUERY_PARAM,
+    list_profiles,
+    make_profile_token,
+    profile_dir,
+    profile_path,
+    summarize_profile,
+)
+from .tenants import team_choices
+from .transitions import record_status_event, transition_submissions
+
+
+class TeamListFilter(admin.SimpleListFilter):
+    """team 에 choices 가 없으므로 목록 필터의 항목을 Team 표에서 만든다."""
+
+    title = "팀"
+    parameter_name = "team"
+
+    def lookups(self, request, model_admin):
+        return [(team.code, str(team)) for team in Team.objects.select_related("event")]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(team=self.value())
+        return queryset
+
+
+class TeamFieldMixin:
+    """team 은 등록된 팀 중에서 행사별로 묶어 고르게 하고, 목록에는 코드 대신 팀 이름을 보인다."""
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if db_field.name == "team":
+            return forms.ChoiceField(label="팀", choices=[("", "---------"), *team_choices()])
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+    @admin.display(description="팀", ordering="team")
+    def team_label(self, obj):
+        return obj.get_team_display()
+
 
-from .models import BingoItem, BingoSubmission, BingoSubmissionAttachment, Member
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "is_active", "created_at")
+    list_filter = ("is_active",)
+    prepopulated_fields = {"slug": ("name",)}
+    search_fields = ("name", "slug")
+
+
+@admin.register(Team)
+class TeamAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "event", "position")
+    list_filter = ("event",)
+    list_select_related = ("event",)
+    ordering = ("event", "position", "code")
+
+    def get_readonly_fields(self, request, obj=None):
+        # 팀 코드는 각 행의 team 값과 캐시 키에 쓰이므로 만든 뒤에는 바꾸지 않는다.
+        return ("event", "code") if obj else ()
 
 
 @admin.register(Member)
-class MemberAdmin(admin.ModelAdmin):
-    list_display = ("name", "student_id", "team", "phone_last4")
-    list_filter = ("team",)
+class MemberAdmin(TeamFieldMixin, admin.ModelAdmin):
+    list_display = ("name", "student_id", "team_label", "phone_last4")
+    list_filter = ("event", TeamListFilter)
     search_fields = ("name", "student_id", "phone_number")
 
 
 @admin.register(BingoItem)
-class BingoItemAdmin(admin.ModelAdmin):
-    list_display = ("team", "position", "title")
-    list_filter = ("team",)
+class BingoItemAdmin(TeamFieldMixin, admin.ModelAdmin):
+    list_display = ("team_label", "position", "title")
+    list_filter = ("event", TeamListFilter)
     ordering = ("team", "position")
     search_fields = ("title", "description")
 
 
+@admin.register(TeamProgress)
+class TeamProgressAdmin(admin.ModelAdmin):
+    list_display = (
+        "event",
+        "team",
+        "approved_count",
+        "pending_count",
+        "rejected_count",
+        "completed_lines",
+        "first_bingo_at",
+        "updated_at",
+    )
+    readonly_fields = list_display + ("board_size", "approved_mask")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SubmissionStatusEvent)
+class SubmissionStatusEventAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "team", "item_position", "from_status", "to_status", "actor", "reason")
+    list_filter = ("team", "to_status")
+    list_select_related = ("actor",)
+    search_fields = ("reason", "actor__username")
+    date_hierarchy = "created_at"
+
+    # 이력은 추가만 한다.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 class BingoSubmissionAttachmentInline(admin.TabularInline):
     model = BingoSubmissionAttachment
     extra = 0
     readonly_fields = ("uploaded_at",)
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_review_cursor(submission) -> str:
+    return f"{(submission.created_at - _EPOCH) // _MICROSECOND}-{submission.pk}"
+
+
+def decode_review_cursor(value: str):
+    """'<created_at 마이크로초>-<id>' 를 (created_at, id) 로. 형식이 틀리면 None."""
+    try:
+        micros, pk = (int(part) for part in value.split("-", 1))
+    except ValueError:
+        return None
+    return _EPOCH + micros * _MICROSECOND, pk
+
+
 @admin.register(BingoSubmission)
-class BingoSubmissionAdmin(admin.ModelAdmin):
-    list_display = ("bingo_item", "team", "status", "submitted_by", "created_at")
-    list_filter = ("team", "status")
+class BingoSubmissionAdmin(TeamFieldMixin, admin.ModelAdmin):
+    REVIEW_PAGE_SIZE = 50
+
+    list_display = ("bingo_item", "team_label", "status", "submitted_by", "created_at")
+    list_select_related = ("bingo_item", "submitted_by")
+    list_filter = ("event", TeamListFilter, "status")
     search_fields = ("title", "content", "submitted_by__name")
     autocomplete_fields = ("submitted_by", "participants", "bingo_item")
     actions = ["approve_selected", "reject_selected"]
@@ -44,9 +181,88 @@ class BingoSubmissionAdmin(admin.ModelAdmin):
 
     action_form = RejectReasonActionForm
 
+    def save_model(self, request, obj, form, change):
+        old_status = getattr(obj, "_loaded_status", None) if change else None
+        old_reason = getattr(obj, "_loaded_rejected_reason", None) if change else None
+        super().save_model(request, obj, form, change)
+        if change and (old_status, old_reason) != (obj.status, obj.rejected_reason):
+            record_status_event(obj, old_status, actor=request.user)
+
+    # -- 검토 대기열 ---------------------------------------------------------
+    # 검토중 제출을 오래된 순으로 (created_at, id) 키셋 페이지네이션해 보여주고,
+    # 승인/반려는 AJAX 로 한 건씩 처리한다. 한 페이지는 본문 1 + prefetch 2 쿼리로 그린다.
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path("review/", self.admin_site.admin_view(self.review_queue_view), name="%s_%s_review" % info),
+            path(
+                "review/<int:submission_id>/decide/",
+                self.admin_site.admin_view(require_POST(self.review_decide_view)),
+                name="%s_%s_review_decide" % info,
+            ),
+        ] + super().get_urls()
+
+    def review_queryset(self, request):
+        queryset = (
+            self.get_queryset(request)
+            .filter(status=BingoSubmission.STATUS_PENDING)
+            .select_related("bingo_item", "submitted_by")
+            .prefetch_related("participants", "attachments")
+            .order_by("created_at", "id")
+        )
+        team = request.GET.get("team")
+        if team:
+            queryset = queryset.for_team(team)
+        return queryset
+
+    def review_queue_view(self, request):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        queryset = self.review_queryset(request)
+        cursor = decode_review_cursor(request.GET.get("after", ""))
+        if cursor:
+            created_at, pk = cursor
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+        # 한 건 더 읽어 다음 페이지가 있는지 안다.
+        page = list(queryset[: self.REVIEW_PAGE_SIZE + 1])
+        has_next = len(page) > self.REVIEW_PAGE_SIZE
+        page = page[: self.REVIEW_PAGE_SIZE]
+        next_cursor = encode_review_cursor(page[-1]) if has_next else ""
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": "검토 대기열",
+            "submissions": page,
+            "next_cursor": next_cursor,
+            "team": request.GET.get("team", ""),
+            "team_choices": [(team.code, str(team)) for team in Team.objects.select_related("event")],
+            "decide_url": reverse("admin:members_bingosubmission_review_decide", args=[0]),
+        }
+        return TemplateResponse(request, "admin/members/bingosubmission/review_queue.html", context)
+
+    def review_decide_view(self, request, submission_id: int):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        decision = request.POST.get("decision")
+        reason = request.POST.get("reason", "").strip()
+        if decision == "approve":
+            status, reason = BingoSubmission.STATUS_APPROVED, ""
+        elif decision == "reject":
+            if not reason:
+                return JsonResponse({"error": "반려 사유를 입력해주세요."}, status=400)
+            status = BingoSubmission.STATUS_REJECTED
+        else:
+            return JsonResponse({"error": "알 수 없는 처리입니다."}, status=400)
+        # 다른 검토자가 먼저 처리한 제출은 건드리지 않는다.
+        queryset = BingoSubmission.objects.filter(pk=submission_id, status=BingoSubmission.STATUS_PENDING)
+        if not transition_submissions(queryset, status, reason, actor=request.user):
+            return JsonResponse({"error": "이미 처리된 제출입니다."}, status=409)
+        return JsonResponse({"id": submission_id, "status": status, "reason": reason})
+
     @admin.action(description="승인 처리")
     def approve_selected(self, request, queryset):
-        updated = queryset.update(status=BingoSubmission.STATUS_APPROVED, rejected_reason="")
+        updated = len(transition_submissions(queryset, BingoSubmission.STATUS_APPROVED, actor=request.user))
         self.message_user(request, f"{updated}개 제출을 승인했습니다.")
 
     @admin.action(description="반려 처리")
@@ -55,7 +271,7 @@ class BingoSubmissionAdmin(admin.ModelAdmin):
         if not reason:
             messages.error(request, "반려 사유를 입력해주세요.")
             return
-        updated = queryset.update(status=BingoSubmission.STATUS_REJECTED, rejected_reason=reason)
+        updated = len(transition_submissions(queryset, BingoSubmission.STATUS_REJECTED, reason, actor=request.user))
         self.message_user(request, f"{updated}개 제출을 반려했습니다.")
 
 
@@ -79,3 +295,45 @@ class BingoSubmissionAdminForm(forms.ModelForm):
 
 
 BingoSubmissionAdmin.form = BingoSubmissionAdminForm
+
+
+# -- 요청 프로파일 -----------------------------------------------------------
+# ProfilingMiddleware 가 남긴 파일 목록. 모델이 아니므로 secant/urls.py 에서 admin_view 로 감싸 연결한다.
+
+
+def profile_list_view(request):
+    token = ""
+    if request.method == "POST":
+        token = make_profile_token(request.user)
+    context = {
+        **admin.site.each_context(request),
+        "title": "요청 프로파일",
+        "profiles": list_profiles(),
+        "token": token,
+        "token_max_age": getattr(settings, "BINGO_PROFILE_TOKEN_MAX_AGE", DEFAULT_TOKEN_MAX_AGE) // 60,
+        "query_param": QUERY_PARAM,
+        "profile_dir": profile_dir(),
+        "profiler": getattr(settings, "BINGO_PROFILER", "sampling"),
+        "sample_rate": getattr(settings, "BINGO_PROFILE_SAMPLE_RATE", 0.0),
+    }
+    return TemplateResponse(request, "admin/members/profiles/list.html", context)
+
+
+def profile_detail_view(request, name: str):
+    if profile_path(name) is None:
+        raise Http404("프로파일이 없습니다.")
+    context = {
+        **admin.site.each_context(request),
+        "title": name,
+        "name": name,
+        "is_cprofile": name.endswith(".prof"),
+        "summary": summarize_profile(name),
+    }
+    return TemplateResponse(request, "admin/members/profiles/detail.html", context)
+
+
+def profile_download_view(request, name: str):
+    path = profile_path(name)
+    if path is None:
+        raise Http404("프로파일이 없습니다.")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name, content_type="application/octet-stream")
@@ -0,0 +1,512 @@
+"""
+행사 당일 트래픽 벤치마크.
+
+팀/팀원/아이템/제출(첨부 포함)을 만든 뒤 여러 스레드가 Django 테스트 클라이언트로 로그인,
+보드 새로고침, 제출, 수정, 취소, admin 일괄 승인을 섞어 보낸다. 작업별 지연 시간 백분위수,
+처리량, 요청당 쿼리 수, SQLite 잠금 오류를 JSON 으로 남기고, 두 결과를 비교해 성능 변경을
+숫자로 확인한다. 실행 순서는 seed 로 정해지지만 스레드 간 끼어들기까지 같지는 않다.
+"""
+import math
+import platform
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import BingoItem, BingoSubmission, Event, Member, Team, phone_last4_digest
+from .thumbnails import drain_thumbnails
+from .uploads import add_attachments
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 가 없으면 JPEG 헤더만 있는 가짜 파일을 올린다.
+    Image = None
+
+REPORT_VERSION = 1
+DEFAULT_MIX = {"board": 50, "cells": 10, "detail": 10, "login": 10, "submit": 12, "update": 8, "cancel": 5, "approve": 5}
+OPERATIONS = tuple(DEFAULT_MIX)
+LATENCY_METRICS = ("p50", "p95", "p99")
+MIN_MEMBERS_PER_TEAM = 4  # 제출에는 본인 포함 4명이 필요하다.
+REVIEWABLE = [BingoSubmission.STATUS_PENDING, BingoSubmission.STATUS_REJECTED]
+
+
+@dataclass
+class BenchmarkConfig:
+    teams: int = 3
+    members_per_team: int = 12
+    items_per_team: int = 9
+    submissions_per_team: int = 4
+    attachments_per_submission: int = 2
+    workers: int = 4
+    requests: int = 400
+    warmup: int = 20
+    approve_batch: int = 10
+    seed: int = 1
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+
+    def __post_init__(self):
+        if self.members_per_team < MIN_MEMBERS_PER_TEAM:
+            raise ValueError(f"팀원은 팀마다 {MIN_MEMBERS_PER_TEAM}명 이상이어야 합니다.")
+        if self.submissions_per_team > self.items_per_team:
+            raise ValueError("팀당 제출 수는 아이템 수보다 많을 수 없습니다.")
+        unknown = set(self.mix) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"알 수 없는 작업입니다: {', '.join(sorted(unknown))}")
+        if not any(weight > 0 for weight in self.mix.values()):
+            raise ValueError("작업 비율이 모두 0입니다.")
+
+
+def parse_mix(value: str) -> dict:
+    """'board=50,submit=10' 형식의 작업 비율."""
+    mix = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        try:
+            mix[name.strip()] = int(weight)
+        except ValueError:
+            raise ValueError(f"작업 비율 형식이 잘못되었습니다: {part!r}") from None
+    return mix
+
+
+def percentile(values, pct: float) -> float:
+    """nearest-rank 백분위수."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)), 1) - 1]
+
+
+@lru_cache(maxsize=1)
+def _jpeg_base() -> bytes:
+    if Image is None:
+        return b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (40, 120, 200)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _photo(tag: str) -> SimpleUploadedFile:
+    # JPEG 끝에 꼬리표를 붙여 내용 주소 저장소에서 서로 다른 블롭이 되게 한다.
+    return SimpleUploadedFile(f"{tag}.jpg", _jpeg_base() + tag.encode(), content_type="image/jpeg")
+
+
+# ---------------------------------------------------------------------------
+# 데이터 준비
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SeededData:
+    event: Event
+    teams: list
+    members: list
+    items: dict  # 팀 코드 → 아이템 id 목록
+    admin: object
+
+
+def seed_database(config: BenchmarkConfig, slug: str = "bench") -> SeededData:
+    event = Event.objects.create(slug=slug, name="벤치마크 행사")
+    teams = [
+        Team.objects.create(event=event, code=f"{slug}-{n}", name=f"벤치 {n}조", position=n)
+        for n in range(1, config.teams + 1)
+    ]
+    # bulk_create 는 save() 를 거치지 않으므로 event 와 로그인 해시를 직접 채운다.
+    members = []
+    for t, team in enumerate(teams):
+        for i in range(config.members_per_team):
+            student_id = f"b{t:03d}{i:05d}"
+            phone = f"010{t:04d}{i:04d}"
+            members.append(
+                Member(
+                    event=event,
+                    team=team.code,
+                    name=f"{team.name} {i + 1}",
+                    student_id=student_id,
+                    phone_number=phone,
+                    phone_last4_hash=phone_last4_digest(student_id, phone[-4:]),
+                )
+            )
+    members = Member.objects.bulk_create(members)
+    BingoItem.objects.bulk_create(
+        BingoItem(event=event, team=team.code, title=f"미션 {pos}", position=pos)
+        for team in teams
+        for pos in range(1, config.items_per_team + 1)
+    )
+    items = {team.code: [] for team in teams}
+    for pk, team in BingoItem.objects.for_event(event).order_by("team", "position").values_list("id", "team"):
+        items[team].append(pk)
+
+    statuses = [BingoSubmission.STATUS_APPROVED, BingoSubmission.STATUS_PENDING, BingoSubmission.STATUS_REJECTED]
+    for team in teams:
+        team_members = [m for m in members if m.team == team.code]
+        for n, item_id in enumerate(items[team.code][: config.submissions_per_team]):
+            status = statuses[n % len(statuses)]
+            submission = BingoSubmission.objects.create(
+                team=team.code,
+                bingo_item_id=item_id,
+                submitted_by=team_members[n % len(team_members)],
+                title=f"인증 {n + 1}",
+                content="다같이 다녀왔어요",
+                status=status,
+                rejected_reason="사진이 흐려요" if status == BingoSubmission.STATUS_REJECTED else "",
+            )
+            submission.participants.set(team_members[n + 1 : n + 4] or team_members[1:4])
+            add_attachments(
+                submission,
+                [_photo(f"seed-{team.code}-{n}-{a}") for a in range(config.attachments_per_submission)],
+            )
+    admin = get_user_model().objects.create_superuser(f"{slug}-admin", f"{slug}-admin@example.com", None)
+    return SeededData(event=event, teams=teams, members=members, items=items, admin=admin)
+
+
+@contextmanager
+def isolated_database():
+    """
+    설정된 DB 대신 테스트 DB 와 임시 MEDIA_ROOT 를 새로 만들어 쓴다. 실제 데이터는 건드리지 않는다.
+    """
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    media_root = tempfile.mkdtemp(prefix="secant-bench-media-")
+    try:
+        with override_settings(MEDIA_ROOT=media_root):
+            yield
+    finally:
+        # 남은 썸네일 작업이 지워진 DB 에 쓰지 않도록 먼저 기다린다.
+        drain_thumbnails()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# 요청 재생
+# ---------------------------------------------------------------------------
+
+
+class _Worker:
+    """스레드 하나. 맡은 팀원들의 로그인된 클라이언트로 작업을 차례로 보낸다."""
+
+    def __init__(self, index: int, config: BenchmarkConfig, data: SeededData, members):
+        self.index = index
+        self.config = config
+        self.data = data
+        self.members = members
+        self.member_by_id = {member.id: member for member in members}
+        self.rng = random.Random(config.seed * 1000 + index)
+        self.operations = [op for op in OPERATIONS if config.mix.get(op, 0) > 0]
+        self.weights = [config.mix[op] for op in self.operations]
+        self.clients = {}
+        self.samples = {}
+        self.statuses = {}
+        self.errors = {}
+        self.admin_client = None
+        self.logins = 0
+
+    def _remote_addr(self) -> str:
+        self.logins += 1
+        return f"10.{self.index % 250}.{self.logins // 250 % 250}.{self.logins % 250 + 1}"
+
+    def setup(self) -> None:
+        for member in self.members:
+            client = Client(REMOTE_ADDR=self._remote_addr())
+            session = client.session
+            session["member_id"] = member.id
+            session.save()
+            self.clients[member.id] = client
+        self.admin_client = Client()
+        self.admin_client.force_login(self.data.admin)
+
+    # 각 prepare_* 는 측정 밖에서 필요한 id 를 고르고 (작업 이름, 요청 함수) 를 돌려준다.
+
+    def prepare_board(self, member):
+        return "board", lambda: self.clients[member.id].get(reverse("board"))
+
+    def prepare_cells(self, member):
+        return "cells", lambda: self.clients[member.id].get(reverse("board_cells"), {"since": 0})
+
+    def prepare_detail(self, member):
+        # 보드에서 칸을 눌러 모달을 여는 요청.
+        ids = list(BingoSubmission.objects.for_team(member.team).values_list("id", flat=True))
+        if not ids:
+            return self.prepare_board(member)
+        url = reverse("submission_detail", args=[self.rng.choice(ids)])
+        return "detail", lambda: self.clients[member.id].get(url)
+
+    def prepare_login(self, member):
+        client = Client(REMOTE_ADDR=self._remote_addr())
+        data = {"student_id": member.student_id, "phone_last4": member.phone_number[-4:]}
+        return "login", lambda: client.post(reverse("login"), data)
+
+    def _submission_data(self, member, files):
+        teammates = [m.id for m in self.data.members if m.team == member.team and m.id != member.id]
+        return {
+            "title": "벤치마크 인증",
+            "content": "다같이 했어요",
+            "participants": self.rng.sample(teammates, 3),
+            "attachments": files,
+        }
+
+    def prepare_submit(self, member):
+        items = self.data.items[member.team]
+        taken = set(BingoSubmission.objects.for_team(member.team).values_list("bingo_item_id", flat=True))
+        # 빈 칸이 없으면 이미 제출된 칸을 골라 중복 제출 경로를 잰다.
+        item_id = self.rng.choice([pk for pk in items if pk not in taken] or items)
+        data = self._submission_data(member, [_photo(f"w{self.index}-{time.perf_counter_ns()}")])
+        url = reverse("submit_bingo_item", args=[item_id])
+        return "submit", lambda: self.clients[member.id].post(url, data)
+
+    def _own_submission(self, member):
+        """이 스레드의 팀원이 낸 검토중/반려 제출 하나와 그 제출자. 없으면 (member, None)."""
+        candidates = list(
+            BingoSubmission.objects.filter(submitted_by_id__in=self.clients, status__in=REVIEWABLE)
+            .order_by("id")
+            .values_list("id", "submitted_by_id")[:20]
+        )
+        if not candidates:
+            return member, None
+        submission_id, submitter_id = self.rng.choice(candidates)
+        return self.member_by_id[submitter_id], submission_id
+
+    def prepare_update(self, member):
+        member, submission_id = self._own_submission(member)
+        if submission_id is None:
+            return self.prepare_submit(member)
+        data = self._submission_data(member, [])
+        url = reverse("update_submission", args=[submission_id])
+        return "update", lambda: self.clients[member.id].post(url, data)
+
+    def prepare_cancel(self, member):
+        member, submission_id = self._own_submission(member)
+        if submission_id is None:
+            return self.prepare_submit(member)
+        url = reverse("cancel_submission", args=[submission_id])
+        return "cancel", lambda: self.clients[member.id].post(url)
+
+    def prepare_approve(self, member):
+        ids = list(
+            BingoSubmission.objects.for_event(self.data.event)
+            .filter(status=BingoSubmission.STATUS_PENDING)
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)[: self.config.approve_batch]
+        )
+        if not ids:
+            return self.prepare_board(member)
+        data = {"action": "approve_selected", "_selected_action": ids}
+        return "approve", lambda: self.admin_client.post(reverse("admin:members_bingosubmission_changelist"), data)
+
+    def step(self, record: bool) -> None:
+        member = self.rng.choice(self.members)
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        name, call = getattr(self, f"prepare_{operation}")(member)
+        error = None
+        status = None
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            try:
+                status = call().status_code
+            except OperationalError as exc:
+                message = str(exc)
+                error = "lock" if "locked" in message or "busy" in message else type(exc).__name__
+            except Exception as exc:
+                error = type(exc).__name__
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        if not record:
+            return
+        self.samples.setdefault(name, []).append((elapsed_ms, len(queries.captured_queries)))
+        self.statuses.setdefault(name, Counter())[str(status or "error")] += 1
+        if error is None and status >= 500:
+            error = f"http_{status}"
+        if error:
+            self.errors.setdefault(name, Counter())[error] += 1
+
+    def run(self, barrier, warmup: int, requests: int) -> None:
+        try:
+            barrier.wait()
+            for n in range(warmup + requests):
+                self.step(record=n >= warmup)
+        finally:
+            connections.close_all()
+
+
+def _split(total: int, parts: int, index: int) -> int:
+    return total // parts + (1 if index < total % parts else 0)
+
+
+def _summarize(samples, statuses, errors, seconds: float) -> dict:
+    latencies = [latency for latency, _ in samples]
+    queries = [count for _, count in samples]
+    return {
+        "count": len(samples),
+        "throughput": round(len(samples) / seconds, 2) if seconds else 0.0,
+        "latency_ms": {
+            **{metric: round(percentile(latencies, float(metric[1:])), 3) for metric in LATENCY_METRICS},
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "max": round(max(latencies, default=0.0), 3),
+        },
+        "queries": {
+            "mean": round(sum(queries) / len(queries), 2) if queries else 0.0,
+            "max": max(queries, default=0),
+        },
+        "status": dict(sorted(statuses.items())),
+        "errors": sum(errors.values()),
+        "lock_errors": errors.get("lock", 0),
+        "error_types": dict(sorted(errors.items())),
+    }
+
+
+def _environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "sqlite_profile": getattr(settings, "BINGO_SQLITE_PROFILE", ""),
+        "session_engine": settings.SESSION_ENGINE,
+        "cache_backend": settings.CACHES["default"]["BACKEND"],
+    }
+
+
+def run_benchmark(config: BenchmarkConfig, data: SeededData | None = None) -> dict:
+    """
+    현재 DB 에 데이터를 만들고(data 를 주면 그대로 쓰고) 요청을 재생한 결과 보고서를 돌려준다.
+    실제 DB 에서 돌리지 않도록 관리 명령은 isolated_database() 안에서 부른다.
+    """
+    data = data or seed_database(config)
+    workers = [
+        _Worker(index, config, data, data.members[index :: config.workers]) for index in range(config.workers)
+    ]
+    for worker in workers:
+        worker.setup()
+
+    barrier = threading.Barrier(config.workers + 1)
+    threads = [
+        threading.Thread(
+            target=worker.run,
+            args=(
+                barrier,
+                _split(config.warmup, config.workers, worker.index),
+                _split(config.requests, config.workers, worker.index),
+            ),
+        )
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    samples, statuses, errors = {}, {}, {}
+    for worker in workers:
+        for name, values in worker.samples.items():
+            samples.setdefault(name, []).extend(values)
+        for name, counter in worker.statuses.items():
+            statuses.setdefault(name, Counter()).update(counter)
+        for name, counter in worker.errors.items():
+            errors.setdefault(name, Counter()).update(counter)
+
+    views = {
+        name: _summarize(samples[name], statuses.get(name, Counter()), errors.get(name, Counter()), seconds)
+        for name in sorted(samples)
+    }
+    everything = [sample for values in samples.values() for sample in values]
+    total_errors = sum((errors.get(name, Counter()) for name in errors), Counter())
+    totals = _summarize(everything, Counter(), total_errors, seconds)
+    return {
+        "version": REPORT_VERSION,
+        "created_at": timezone.now().isoformat(),
+        "config": asdict(config),
+        "environment": _environment(),
+        "totals": {
+            "requests": totals["count"],
+            "seconds": round(seconds, 3),
+            "throughput": totals["throughput"],
+            "latency_ms": totals["latency_ms"],
+            "queries": totals["queries"],
+            "errors": totals["errors"],
+            "lock_errors": totals["lock_errors"],
+        },
+        "views": views,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 결과 비교
+# ---------------------------------------------------------------------------
+
+
+def _change(base, new) -> dict:
+    return {
+        "base": base,
+        "new": new,
+        "change_pct": round((new - base) / base * 100, 1) if base else None,
+    }
+
+
+def _worse_by(change: dict, threshold: float, higher_is_better: bool = False) -> bool:
+    pct = change["change_pct"]
+    if pct is None:
+        return False
+    return -pct > threshold if higher_is_better else pct > threshold
+
+
+def compare_reports(base: dict, new: dict, threshold: float = 10.0) -> dict:
+    """
+    두 보고서를 작업별로 비교한다. 지연 시간/쿼리 수가 threshold% 넘게 늘거나 처리량이
+    그만큼 줄거나 잠금 오류가 늘면 regressions 에 담는다.
+    """
+    views = {}
+    regressions = []
+    for name in sorted(set(base["views"]) | set(new["views"])):
+        old, cur = base["views"].get(name), new["views"].get(name)
+        if old is None or cur is None:
+            views[name] = {"only_in": "new" if old is None else "base"}
+            continue
+        row = {metric: _change(old["latency_ms"][metric], cur["latency_ms"][metric]) for metric in LATENCY_METRICS}
+        row["queries"] = _change(old["queries"]["mean"], cur["queries"]["mean"])
+        row["throughput"] = _change(old["throughput"], cur["throughput"])
+        row["lock_errors"] = _change(old["lock_errors"], cur["lock_errors"])
+        views[name] = row
+        regressions += [
+            f"{name}.{metric}" for metric in (*LATENCY_METRICS, "queries") if _worse_by(row[metric], threshold)
+        ]
+        if cur["lock_errors"] > old["lock_errors"]:
+            regressions.append(f"{name}.lock_errors")
+
+    totals = {
+        key: _change(base["totals"][key], new["totals"][key]) for key in ("throughput", "errors", "lock_errors")
+    }
+    if _worse_by(totals["throughput"], threshold, higher_is_better=True):
+        regressions.append("totals.throughput")
+    if new["totals"]["lock_errors"] > base["totals"]["lock_errors"]:
+        regressions.append("totals.lock_errors")
+    config_diff = sorted(
+        key for key in set(base["config"]) | set(new["config"]) if base["config"].get(key) != new["config"].get(key)
+    )
+    return {
+        "threshold_pct": threshold,
+        "config_diff": config_diff,
+        "totals": totals,
+        "views": views,
+        "regressions": regressions,
+    }
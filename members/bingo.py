@@ -0,0 +1,74 @@
+"""
+N×N 빙고판 판정 엔진.
+
+칸 위치(position)는 1부터 시작해 왼쪽 위에서 오른쪽 아래로 행 우선 순서로 매긴다.
+position p 는 비트 (p - 1) 에 대응하며, 승인된 칸 집합은 하나의 정수 마스크로 표현한다.
+가로/세로/대각선 줄 마스크는 판 크기별로 한 번만 계산해 재사용한다.
+"""
+import math
+from functools import lru_cache
+
+DEFAULT_BOARD_SIZE = 3
+
+
+def board_size_for(max_position: int) -> int:
+    """가장 큰 position 을 담을 수 있는 가장 작은 판 크기."""
+    if max_position <= 0:
+        return DEFAULT_BOARD_SIZE
+    return math.isqrt(max_position - 1) + 1
+
+
+def cell_bit(position: int) -> int:
+    return 1 << (position - 1)
+
+
+def positions_to_mask(positions) -> int:
+    mask = 0
+    for position in positions:
+        mask |= cell_bit(position)
+    return mask
+
+
+@lru_cache(maxsize=None)
+def line_masks(size: int) -> tuple[int, ...]:
+    rows = [sum(1 << (r * size + c) for c in range(size)) for r in range(size)]
+    cols = [sum(1 << (r * size + c) for r in range(size)) for c in range(size)]
+    diagonals = [
+        sum(1 << (i * size + i) for i in range(size)),
+        sum(1 << (i * size + (size - 1 - i)) for i in range(size)),
+    ]
+    if size == 1:
+        diagonals = diagonals[:1]
+    return tuple(rows + cols + diagonals)
+
+
+@lru_cache(maxsize=None)
+def cell_line_masks(size: int) -> tuple[tuple[int, ...], ...]:
+    """칸 인덱스별로 그 칸을 지나는 줄 마스크 목록."""
+    masks = line_masks(size)
+    return tuple(tuple(line for line in masks if line >> cell & 1) for cell in range(size * size))
+
+
+def count_completed_lines(mask: int, size: int) -> int:
+    return sum(1 for line in line_masks(size) if mask & line == line)
+
+
+def has_bingo(mask: int, size: int) -> bool:
+    return any(mask & line == line for line in line_masks(size))
+
+
+def set_cell(mask: int, size: int, position: int, approved: bool) -> tuple[int, int]:
+    """
+    한 칸의 승인 여부를 바꾸고 (새 마스크, 완성된 줄 수 변화량) 을 돌려준다.
+    해당 칸을 지나는 줄만 검사하므로 판 크기와 무관하게 최대 4개의 줄만 본다.
+    """
+    bit = cell_bit(position)
+    new_mask = mask | bit if approved else mask & ~bit
+    if new_mask == mask or not 1 <= position <= size * size:
+        return new_mask, 0
+    delta = 0
+    for line in cell_line_masks(size)[position - 1]:
+        before = mask & line == line
+        after = new_mask & line == line
+        delta += int(after) - int(before)
+    return new_mask, delta
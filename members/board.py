@@ -0,0 +1,417 @@
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import BingoItem, BingoSubmission, Member
+from .progress import get_team_progress
+
+# build_board_snapshot 한 번에 실행되는 쿼리 수 상한.
+# 아이템 1 + 제출 1 + 참가자 prefetch 1 + 첨부 prefetch 1 + 팀원 1 + 진행 상황 1
+BOARD_QUERY_BUDGET = 6
+
+
+@dataclass(frozen=True)
+class ItemState:
+    id: int
+    title: str
+    description: str
+    position: int
+
+
+@dataclass(frozen=True)
+class ParticipantState:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class AttachmentState:
+    url: str
+    name: str
+    kind: str
+    thumb: str = ""
+    poster: str = ""
+
+
+@dataclass(frozen=True)
+class SubmissionState:
+    id: int
+    item_id: int
+    item_position: int
+    title: str
+    content: str
+    status: str
+    rejected_reason: str
+    submitted_by_id: int
+    submitted_by_name: str
+    participants: tuple[ParticipantState, ...] = ()
+    attachments: tuple[AttachmentState, ...] = ()
+    updated_at: datetime | None = None
+
+    @property
+    def cursor(self) -> int:
+        return to_cursor(self.updated_at)
+
+    @property
+    def is_approved(self) -> bool:
+        return self.status == BingoSubmission.STATUS_APPROVED
+
+    @property
+    def is_rejected(self) -> bool:
+        return self.status == BingoSubmission.STATUS_REJECTED
+
+
+def to_cursor(value: datetime | None) -> int:
+    """updated_at 을 마이크로초 단위 정수 커서로 바꾼다."""
+    if value is None:
+        return 0
+    return int(value.timestamp() * 1_000_000)
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    """
+    팀 빙고판의 읽기 전용 스냅샷. 템플릿/JSON 렌더링에 필요한 값만 담는다.
+    """
+
+    team: str
+    items: tuple[ItemState, ...]
+    submissions: dict[int, SubmissionState] = field(default_factory=dict)
+    team_members: tuple[ParticipantState, ...] = ()
+    board_size: int = 3
+    completed_lines: int = 0
+    # 캐시에서 꺼낸 스냅샷이면 만들 때 읽은 팀 버전. 템플릿 조각 캐시 키에 쓴다.
+    version: int = 0
+
+    @property
+    def bingo_line_completed(self) -> bool:
+        return self.completed_lines > 0
+
+    @property
+    def board_data(self) -> list[tuple[ItemState, SubmissionState | None]]:
+        return [(item, self.submissions.get(item.id)) for item in self.items]
+
+    @property
+    def approved_positions(self) -> frozenset[int]:
+        return frozenset(s.item_position for s in self.submissions.values() if s.is_approved)
+
+    @property
+    def approved_count(self) -> int:
+        return len(self.approved_positions)
+
+    @property
+    def rejected_submissions(self) -> list[SubmissionState]:
+        return [s for s in self.submissions.values() if s.is_rejected]
+
+    @property
+    def cursor(self) -> int:
+        return max((s.cursor for s in self.submissions.values()), default=0)
+
+    def cells_since(self, cursor: int = 0) -> dict:
+        """
+        cursor 이후에 바뀐 칸만 담은 압축 응답. 첨부 파일은 별도 배열 "a" 에 모으고
+        각 칸은 그 인덱스만 참조한다. "e" 는 현재 제출이 없는 칸 목록이다.
+        """
+        attachments = []
+        cells = []
+        for item in self.items:
+            s = self.submissions.get(item.id)
+            if s is None or s.cursor <= cursor:
+                continue
+            indexes = []
+            for a in s.attachments:
+                indexes.append(len(attachments))
+                attachments.append([a.url, a.name, a.kind, a.thumb, a.poster])
+            cells.append(
+                {
+                    "i": item.id,
+                    "s": s.id,
+                    "st": s.status,
+                    "r": s.rejected_reason,
+                    "t": s.title,
+                    "b": s.content,
+                    "u": s.submitted_by_id,
+                    "n": s.submitted_by_name,
+                    "p": [[p.id, p.name] for p in s.participants],
+                    "a": indexes,
+                }
+            )
+        return {
+            "c": max(cursor, self.cursor),
+            "l": self.completed_lines,
+            "cells": cells,
+            "a": attachments,
+            "e": [item.id for item in self.items if item.id not in self.submissions],
+        }
+
+    def submission_summaries(self) -> dict[int, dict]:
+        """
+        보드 페이지에 심는 칸별 요약. 본문, 참가자, 첨부는 모달을 열 때 submission_detail 로 따로 받는다.
+        """
+        items_by_id = {item.id: item for item in self.items}
+        summaries = {}
+        for item_id, s in self.submissions.items():
+            item = items_by_id.get(item_id)
+            summaries[item_id] = {
+                "id": s.id,
+                "title": s.title,
+                "status": s.status,
+                "rejected_reason": s.rejected_reason,
+                "item_title": item.title if item else "",
+                "item_position": s.item_position,
+            }
+        return summaries
+
+    def submission_detail(self, submission_id: int) -> dict | None:
+        s = next((s for s in self.submissions.values() if s.id == submission_id), None)
+        if s is None:
+            return None
+        item = next((item for item in self.items if item.id == s.item_id), None)
+        return {
+            "id": s.id,
+            "title": s.title,
+            "content": s.content,
+            "status": s.status,
+            "rejected_reason": s.rejected_reason,
+            "participants": [p.name for p in s.participants],
+            "participant_ids": [p.id for p in s.participants],
+            "attachments": [
+                {"url": a.url, "name": a.name, "kind": a.kind, "thumb": a.thumb, "poster": a.poster}
+                for a in s.attachments
+            ],
+            "submitted_by": s.submitted_by_name,
+            "submitted_by_id": s.submitted_by_id,
+            "item_title": item.title if item else "",
+            "item_desc": item.description if item else "",
+            "item_position": s.item_position,
+        }
+
+
+def build_board_snapshot(team: str) -> BoardSnapshot:
+    items = tuple(
+        ItemState(id=pk, title=title, description=description or "", position=position)
+        for pk, title, description, position in BingoItem.objects.for_team(team)
+        .order_by("position")
+        .values_list("id", "title", "description", "position")
+    )
+    submissions = (
+        BingoSubmission.objects.for_team(team)
+        .select_related("bingo_item", "submitted_by")
+        .prefetch_related("participants", "attachments")
+    )
+    submission_states = {}
+    for s in submissions:
+        submission_states[s.bingo_item_id] = SubmissionState(
+            id=s.id,
+            item_id=s.bingo_item_id,
+            item_position=s.bingo_item.position,
+            title=s.title,
+            content=s.content,
+            status=s.status,
+            rejected_reason=s.rejected_reason,
+            submitted_by_id=s.submitted_by_id,
+            submitted_by_name=s.submitted_by.name,
+            participants=tuple(ParticipantState(id=p.id, name=p.name) for p in s.participants.all()),
+            attachments=tuple(
+                AttachmentState(
+                    url=a.url,
+                    name=a.filename,
+                    kind=a.kind,
+                    thumb=a.thumbnail_url,
+                    poster=a.poster_url,
+                )
+                for a in s.attachments.all()
+            ),
+            updated_at=s.updated_at,
+        )
+    team_members = tuple(
+        ParticipantState(id=pk, name=name)
+        for pk, name in Member.objects.for_team(team).order_by("name").values_list("id", "name")
+    )
+    progress = get_team_progress(team)
+    return BoardSnapshot(
+        team=team,
+        items=items,
+        submissions=submission_states,
+        team_members=team_members,
+        board_size=progress.board_size,
+        completed_lines=progress.completed_lines,
+    )
+
+
+# ---------------------------------------------------------------------------
+# 팀 버전 기반 스냅샷 캐시
+#
+# 팀 버전 키와 스냅샷 키를 get_many 한 번으로 읽고, 스냅샷에 기록된 버전이
+# 현재 버전과 같을 때만 캐시를 사용한다. 쓰기 경로는 bump_team_version 으로
+# 버전만 올리면 되고, 오래된 스냅샷은 만료 시간에 따라 자연스럽게 정리된다.
+# ---------------------------------------------------------------------------
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _board_cache():
+    return caches[getattr(settings, "BINGO_BOARD_CACHE_ALIAS", "default")]
+
+
+def board_cache_timeout() -> int | None:
+    """
+    스냅샷, 상세, 템플릿 조각의 캐시 수명. 버전 키를 올리는 시그널은 자기 프로세스의 캐시만
+    고치므로, 프로세스마다 따로인 LocMemCache 에서는 BINGO_LOCAL_BOARD_CACHE_TIMEOUT 초로
+    줄여 다른 워커의 쓰기가 그 안에 보이게 한다.
+    """
+    timeout = getattr(settings, "BINGO_BOARD_CACHE_TIMEOUT", 60 * 60)
+    if isinstance(_board_cache(), LocMemCache):
+        local = getattr(settings, "BINGO_LOCAL_BOARD_CACHE_TIMEOUT", 5)
+        timeout = local if timeout is None else min(timeout, local)
+    return timeout
+
+
+def _last_change_timeout() -> int:
+    return getattr(settings, "BINGO_LAST_CHANGE_TIMEOUT", 10)
+
+
+def _version_key(team: str) -> str:
+    return f"bingo:board:version:{team}"
+
+
+def _snapshot_key(team: str) -> str:
+    return f"bingo:board:snapshot:{team}"
+
+
+def _detail_key(team: str, submission_id: int) -> str:
+    return f"bingo:board:detail:{team}:{submission_id}"
+
+
+def _roster_version_key(team: str) -> str:
+    return f"bingo:board:roster:{team}"
+
+
+_CHANGED_AT_KEY = "bingo:board:changed-at"
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def board_cache_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_board_cache_stats() -> None:
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _initial_version() -> int:
+    # 버전 키가 축출되어도 이전 값으로 되돌아가지 않도록 시각 기반으로 시작한다.
+    return time.time_ns() // 1000
+
+
+def get_team_version(team: str) -> int:
+    return _get_version(_version_key(team))
+
+
+def _get_version(key: str) -> int:
+    cache = _board_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key: str) -> None:
+    cache = _board_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def bump_team_version(*teams: str) -> None:
+    for team in set(teams):
+        _bump_version(_version_key(team))
+    if teams:
+        _board_cache().set(_CHANGED_AT_KEY, timezone.now(), timeout=_last_change_timeout())
+
+
+def get_roster_version(team: str) -> int:
+    """
+    팀원 명단 버전. 제출이 바뀔 때마다 올라가는 팀 버전과 따로 두어, 제출 양식의 참가자
+    목록 조각은 팀원이 추가/수정/삭제될 때만 다시 그린다.
+    """
+    return _get_version(_roster_version_key(team))
+
+
+def bump_roster_version(*teams: str) -> None:
+    for team in set(teams):
+        _bump_version(_roster_version_key(team))
+
+
+def get_last_change():
+    """
+    마지막으로 제출 내역이 바뀐 시각. 캐시에 없을 때만 BingoSubmission.updated_at 의
+    최댓값을 읽어 채우므로, 평소에는 ORM 을 거치지 않는다.
+
+    bump_team_version 은 자기 프로세스의 캐시만 고치므로, 프로세스별 캐시에서도 다른 워커의
+    변경이 보이도록 BINGO_LAST_CHANGE_TIMEOUT 초마다 DB 에서 다시 읽는다.
+    """
+    cache = _board_cache()
+    changed_at = cache.get(_CHANGED_AT_KEY)
+    if changed_at is None:
+        changed_at = BingoSubmission.objects.aggregate(t=Max("updated_at"))["t"] or timezone.now()
+        cache.add(_CHANGED_AT_KEY, changed_at, timeout=_last_change_timeout())
+    return changed_at
+
+
+def get_board_snapshot(team: str) -> BoardSnapshot:
+    cache = _board_cache()
+    version_key, snapshot_key = _version_key(team), _snapshot_key(team)
+    cached = cache.get_many([version_key, snapshot_key])
+    version = cached.get(version_key)
+    entry = cached.get(snapshot_key)
+    if version is not None and entry is not None and entry[0] == version:
+        _count("hits")
+        return entry[1]
+
+    _count("misses")
+    if version is None:
+        version = get_team_version(team)
+    # 스냅샷을 만들기 전에 읽은 버전을 기록해 두므로, 생성 도중 쓰기가 일어나면
+    # 다음 조회에서 버전이 달라져 다시 만든다.
+    snapshot = replace(build_board_snapshot(team), version=version)
+    cache.set(snapshot_key, (version, snapshot), timeout=board_cache_timeout())
+    return snapshot
+
+
+def get_submission_detail(team: str, submission_id: int) -> dict | None:
+    """
+    모달 하나에 필요한 제출 상세. 스냅샷과 같은 팀 버전으로 제출마다 따로 캐시하므로,
+    캐시가 살아 있으면 팀 스냅샷 전체를 꺼내지 않고 작은 항목 하나만 읽는다.
+    팀이 다른 제출이면 None.
+    """
+    cache = _board_cache()
+    version_key, detail_key = _version_key(team), _detail_key(team, submission_id)
+    cached = cache.get_many([version_key, detail_key])
+    version = cached.get(version_key)
+    entry = cached.get(detail_key)
+    if version is not None and entry is not None and entry[0] == version:
+        return entry[1]
+
+    snapshot = get_board_snapshot(team)
+    detail = snapshot.submission_detail(submission_id)
+    if detail is not None:
+        cache.set(detail_key, (snapshot.version, detail), timeout=board_cache_timeout())
+    return detail
@@ -0,0 +1,116 @@
+"""
+팀 보드 변경 알림용 프로세스 내 pub/sub.
+
+동기 코드(시그널, admin 액션)에서 publish 하면 같은 프로세스의 SSE 연결들이 각자의
+asyncio 큐로 이벤트를 받는다. 브로커 구현은 BINGO_EVENT_BROKER 설정으로 바꿀 수 있다.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+EVENT_SUBMITTED = "submitted"
+EVENT_STATUS = "status"
+EVENT_CANCELLED = "cancelled"
+EVENT_MEDIA = "media"  # 썸네일/포스터가 새로 생김
+
+
+class Subscription:
+    def __init__(self, team: str, maxsize: int = 100):
+        self.team = team
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def _offer(self, event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 느린 클라이언트 때문에 메모리가 늘지 않도록 넘치는 이벤트는 버린다.
+            pass
+
+    def deliver(self, event) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:
+            # 연결이 이미 끝나 이벤트 루프가 닫힌 경우
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: dict[str, set[Subscription]] = {}
+
+    def subscribe(self, team: str) -> Subscription:
+        subscription = Subscription(team)
+        with self._lock:
+            self._subscriptions.setdefault(team, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.team)
+            if subscriptions:
+                subscriptions.discard(subscription)
+
+    def subscriber_count(self, team: str) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(team, ()))
+
+    def publish(self, team: str, event: dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(team, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def close(self) -> None:
+        """모든 구독자에게 종료(None)를 보낸다."""
+        with self._lock:
+            subscriptions = [s for group in self._subscriptions.values() for s in group]
+        for subscription in subscriptions:
+            subscription.deliver(None)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(settings, "BINGO_EVENT_BROKER", "members.events.LocalBroker"))()
+        return _broker
+
+
+def reset_broker() -> None:
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+@receiver(setting_changed)
+def _reset_broker_on_setting_change(setting, **kwargs):
+    if setting == "BINGO_EVENT_BROKER":
+        reset_broker()
+
+
+def publish_on_commit(team: str, event: dict) -> None:
+    broker = get_broker()
+    transaction.on_commit(lambda: broker.publish(team, event))
+
+
+def submission_event(event_type: str, submission_id: int, item_id: int, status: str = "", reason: str = "") -> dict:
+    event = {"type": event_type, "submission": submission_id, "item": item_id}
+    if status:
+        event["status"] = status
+    if reason:
+        event["reason"] = reason
+    return event
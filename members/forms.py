@@ -1,6 +1,7 @@
 from django import forms
 
 from .models import BingoSubmission, Member
+from .uploads import upload_content_type
 
 
 class MultiFileInput(forms.ClearableFileInput):
@@ -49,18 +50,30 @@ class BingoSubmissionForm(forms.ModelForm):
         fields = ["title", "content", "participants", "attachments"]
         widgets = {"participants": forms.CheckboxSelectMultiple()}
 
-    def __init__(self, *args, member: Member, existing_attachment_count: int = 0, **kwargs):
+    def __init__(
+        self,
+        *args,
+        member: Member,
+        existing_attachment_count: int = 0,
+        upload_errors=(),
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
-        self.fields["participants"].queryset = Member.objects.filter(team=member.team).exclude(
+        self.fields["participants"].queryset = Member.objects.for_team(member.team).exclude(
             id=member.id
         )
         self.member = member
         self.existing_attachment_count = existing_attachment_count
+        self.upload_errors = list(upload_errors)
 
     def clean(self):
         cleaned = super().clean()
+        if self.upload_errors:
+            # 크기 제한으로 업로드 도중 건너뛴 파일이 있으면 다른 검증보다 먼저 알려준다.
+            raise forms.ValidationError(self.upload_errors)
         participants = cleaned.get("participants")
-        participant_count = participants.count() if participants is not None else 0
+        # 필드 검증에서 이미 평가된 쿼리셋이므로 len 은 추가 쿼리를 만들지 않는다.
+        participant_count = len(participants) if participants is not None else 0
         total_people = participant_count + 1  # + submitter
         if total_people < 4:
             raise forms.ValidationError("본인을 포함해 최소 4명이 참여해야 합니다.")
@@ -77,7 +90,7 @@ class BingoSubmissionForm(forms.ModelForm):
             raise forms.ValidationError("첨부 파일은 최대 5개까지 가능합니다.")
 
         for f in files:
-            content_type = getattr(f, "content_type", "") or ""
+            content_type = upload_content_type(f)
             if not (content_type.startswith("image/") or content_type.startswith("video/")):
                 raise forms.ValidationError("사진 또는 동영상 파일만 첨부할 수 있습니다.")
         return cleaned
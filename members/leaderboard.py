@@ -0,0 +1,55 @@
+import hashlib
+
+from django.conf import settings
+
+from .board import get_last_change
+from .models import Event, Team
+from .progress import scoreboard
+
+
+def leaderboard_event_slug(request) -> str:
+    return request.GET.get("event") or settings.BINGO_DEFAULT_EVENT_SLUG
+
+
+def leaderboard_etag(request) -> str:
+    # 행사 조회 없이 캐시만으로 304 를 돌려줄 수 있도록 slug 문자열을 그대로 섞는다.
+    key = f"{leaderboard_event_slug(request)}:{get_last_change().isoformat()}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def leaderboard_last_modified(request):
+    return get_last_change()
+
+
+def build_leaderboard(event_slug: str) -> list[dict] | None:
+    """행사의 모든 팀을 승인 칸 수, 완성 줄 수, 최초 빙고 시각 순으로 정렬한다. 없는 행사면 None."""
+    event = Event.objects.filter(slug=event_slug).first()
+    if event is None:
+        return None
+    progress_by_team = {progress.team: progress for progress in scoreboard(event)}
+    rows = []
+    for team, label in Team.objects.filter(event=event).values_list("code", "name"):
+        progress = progress_by_team.get(team)
+        rows.append(
+            (
+                team,
+                label,
+                progress.approved_count if progress else 0,
+                progress.pending_count if progress else 0,
+                progress.completed_lines if progress else 0,
+                progress.first_bingo_at if progress else None,
+            )
+        )
+    rows.sort(key=lambda row: (-row[2], -row[4], row[5] is None, row[5] or 0))
+    return [
+        {
+            "rank": rank,
+            "team": team,
+            "name": label,
+            "approved": approved,
+            "pending": pending,
+            "lines": lines,
+            "first_bingo_at": first_bingo_at.isoformat() if first_bingo_at else None,
+        }
+        for rank, (team, label, approved, pending, lines, first_bingo_at) in enumerate(rows, start=1)
+    ]
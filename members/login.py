@@ -0,0 +1,118 @@
+"""
+로그인 확인과 시도 횟수 제한.
+
+토큰 버킷은 클라이언트 IP 와 학번별로 따로 두며, 상태는 BINGO_LOGIN_THROTTLE_CACHE_ALIAS
+캐시에 저장한다(기본 locmem 은 프로세스 단위). 비밀번호 확인은 (학번, 뒷자리 HMAC)
+인덱스만 읽는 한 번의 조회로 끝난다.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+
+from .models import Member, phone_last4_digest
+
+LOGIN_OK = "ok"
+LOGIN_UNKNOWN = "unknown"
+LOGIN_MISMATCH = "mismatch"
+LOGIN_THROTTLED = "throttled"
+
+# 범위별 (버킷 크기, 버킷이 가득 차는 데 걸리는 초). 추측을 막는 것은 학번 버킷이고,
+# IP 버킷은 행사장 와이파이처럼 한 주소(NAT) 뒤에서 모두가 동시에 로그인해도 걸리지 않을
+# 만큼 크게 두어 여러 학번을 훑는 스크립트만 막는다.
+DEFAULT_LOGIN_THROTTLE_RATES = {
+    "ip": (600, 60),
+    "student_id": (5, 300),
+}
+
+_lock = threading.Lock()
+_stats = {"rejected": 0, "throttled": 0}
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def login_stats() -> dict[str, int]:
+    with _lock:
+        return dict(_stats)
+
+
+def reset_login_stats() -> None:
+    with _lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+class TokenBucket:
+    def __init__(self, scope: str, capacity: int, period: float, cache_alias: str = "default"):
+        self.scope = scope
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.cache_alias = cache_alias
+
+    def _key(self, ident: str) -> str:
+        return f"bingo:throttle:{self.scope}:{ident}"
+
+    def consume(self, ident: str, now: float | None = None) -> bool:
+        """토큰 하나를 쓴다. 남은 토큰이 없으면 False."""
+        cache = caches[self.cache_alias]
+        # 공유 캐시는 여러 호스트가 함께 쓰므로 호스트마다 기준이 다른 monotonic 대신 벽시계를 쓴다.
+        now = time.time() if now is None else now
+        key = self._key(ident)
+        # 같은 프로세스 안의 동시 요청끼리는 락으로 읽기-쓰기를 묶는다.
+        with _lock:
+            tokens, updated = cache.get(key) or (self.capacity, now)
+            # 호스트 간 시계 차로 시간이 거꾸로 가도 토큰이 줄지는 않게 한다.
+            tokens = min(self.capacity, tokens + max(now - updated, 0) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            timeout = int((self.capacity - tokens) / self.rate) + 1
+            cache.set(key, (tokens, now), timeout)
+        return allowed
+
+
+def _buckets() -> list[TokenBucket]:
+    rates = getattr(settings, "BINGO_LOGIN_THROTTLE_RATES", DEFAULT_LOGIN_THROTTLE_RATES)
+    alias = getattr(settings, "BINGO_LOGIN_THROTTLE_CACHE_ALIAS", "default")
+    return [TokenBucket(scope, capacity, period, alias) for scope, (capacity, period) in rates.items()]
+
+
+def client_ip(request) -> str:
+    """
+    IP 버킷의 키. 리버스 프록시 뒤에서는 BINGO_CLIENT_IP_HEADER 를 지정해야 한다. 지정하지
+    않으면 REMOTE_ADDR 가 모두 프록시 주소가 되어 전체 사용자가 버킷 하나를 나눠 쓴다.
+
+    X-Forwarded-For 는 프록시마다 오른쪽 끝에 주소를 덧붙이고 클라이언트가 보낸 앞부분은
+    그대로 두므로, 오른쪽에서 BINGO_TRUSTED_PROXY_COUNT 번째 항목만 믿는다.
+    """
+    header = getattr(settings, "BINGO_CLIENT_IP_HEADER", "")
+    if header and request.META.get(header):
+        entries = [entry.strip() for entry in request.META[header].split(",") if entry.strip()]
+        if entries:
+            depth = max(int(getattr(settings, "BINGO_TRUSTED_PROXY_COUNT", 1)), 1)
+            return entries[-min(depth, len(entries))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def check_login(request, student_id: str, last4: str):
+    """(결과 코드, 회원 pk) 를 돌려준다. 성공이 아니면 pk 는 None."""
+    idents = {"ip": client_ip(request), "student_id": student_id}
+    for bucket in _buckets():
+        if not bucket.consume(idents.get(bucket.scope, "")):
+            _count("throttled")
+            return LOGIN_THROTTLED, None
+
+    row = Member.objects.filter(student_id=student_id).values_list("pk", "phone_last4_hash").first()
+    if row is None:
+        _count("rejected")
+        return LOGIN_UNKNOWN, None
+    pk, stored = row
+    if not constant_time_compare(stored, phone_last4_digest(student_id, last4)):
+        _count("rejected")
+        return LOGIN_MISMATCH, None
+    return LOGIN_OK, pk
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import BingoSubmissionAttachment
+from members.thumbnails import Image, generate_for_attachments
+
+
+class Command(BaseCommand):
+    help = "썸네일/포스터 프레임이 없는 기존 첨부 파일의 파생 파일을 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50, help="한 번에 처리할 첨부 수 (기본 50)")
+        parser.add_argument("--all", action="store_true", help="이미 썸네일이 있는 첨부도 다시 만듭니다.")
+
+    def handle(self, *args, **options):
+        if Image is None:
+            raise CommandError("Pillow 가 설치되어 있지 않아 썸네일을 만들 수 없습니다.")
+
+        attachments = BingoSubmissionAttachment.objects.order_by("id")
+        if options["all"]:
+            attachments.update(thumbnails={})
+        ids = list(attachments.filter(thumbnails={}).values_list("id", flat=True))
+        batch_size = max(options["batch_size"], 1)
+        done = 0
+        for start in range(0, len(ids), batch_size):
+            done += generate_for_attachments(ids[start : start + batch_size])
+            self.stdout.write(f"{min(start + batch_size, len(ids))}/{len(ids)}")
+        self.stdout.write(self.style.SUCCESS(f"{done}개 파일의 썸네일을 만들었습니다."))
@@ -0,0 +1,135 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members.benchmark import (
+    DEFAULT_MIX,
+    LATENCY_METRICS,
+    BenchmarkConfig,
+    compare_reports,
+    isolated_database,
+    parse_mix,
+    run_benchmark,
+)
+
+
+def _format_mix(mix: dict) -> str:
+    return ",".join(f"{name}={weight}" for name, weight in mix.items())
+
+
+class Command(BaseCommand):
+    help = (
+        "행사 당일 트래픽(로그인, 보드 새로고침, 제출/수정/취소, admin 일괄 승인)을 재생해 작업별 "
+        "p50/p95/p99 지연 시간, 처리량, 쿼리 수, SQLite 잠금 오류를 JSON 으로 기록합니다. "
+        "--compare 로 두 결과를 비교합니다. 실제 DB 가 아니라 새로 만든 테스트 DB 에서 실행합니다."
+    )
+
+    def add_arguments(self, parser):
+        defaults = BenchmarkConfig()
+        parser.add_argument("--teams", type=int, default=defaults.teams, help="팀 수")
+        parser.add_argument("--members", type=int, default=defaults.members_per_team, help="팀당 팀원 수")
+        parser.add_argument("--items", type=int, default=defaults.items_per_team, help="팀당 빙고 아이템 수")
+        parser.add_argument("--submissions", type=int, default=defaults.submissions_per_team, help="팀당 미리 만들 제출 수")
+        parser.add_argument(
+            "--attachments", type=int, default=defaults.attachments_per_submission, help="미리 만든 제출당 첨부 수"
+        )
+        parser.add_argument("--workers", type=int, default=defaults.workers, help="동시에 요청하는 스레드 수")
+        parser.add_argument("--requests", type=int, default=defaults.requests, help="측정할 전체 요청 수")
+        parser.add_argument("--warmup", type=int, default=defaults.warmup, help="측정 전에 버리는 요청 수")
+        parser.add_argument("--approve-batch", type=int, default=defaults.approve_batch, help="일괄 승인 한 번의 제출 수")
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument("--mix", default=_format_mix(DEFAULT_MIX), help="작업 비율 (기본: %(default)s)")
+        parser.add_argument("-o", "--output", help="결과 JSON 파일. 생략하면 표준 출력에 JSON 을 씁니다.")
+        parser.add_argument(
+            "--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 JSON 을 비교합니다(벤치마크는 실행하지 않음)."
+        )
+        parser.add_argument("--threshold", type=float, default=10.0, help="회귀로 볼 변화율(%%, 기본 10)")
+        parser.add_argument(
+            "--fail-on-regression", action="store_true", help="비교 결과 회귀가 있으면 오류로 끝냅니다."
+        )
+
+    def handle(self, *args, **options):
+        if options["compare"]:
+            return self._compare(options)
+        try:
+            config = BenchmarkConfig(
+                teams=options["teams"],
+                members_per_team=options["members"],
+                items_per_team=options["items"],
+                submissions_per_team=options["submissions"],
+                attachments_per_submission=options["attachments"],
+                workers=options["workers"],
+                requests=options["requests"],
+                warmup=options["warmup"],
+                approve_batch=options["approve_batch"],
+                seed=options["seed"],
+                mix=parse_mix(options["mix"]),
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        with isolated_database():
+            report = run_benchmark(config)
+        self._write(report, options["output"])
+        if options["output"]:
+            self._print_report(report)
+
+    def _write(self, data: dict, path: str | None) -> None:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write(text + "\n")
+        else:
+            self.stdout.write(text)
+
+    def _print_report(self, report: dict) -> None:
+        totals = report["totals"]
+        self.stdout.write(f"{'작업':<8} {'요청':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'쿼리':>6} {'잠금':>5}")
+        for name, view in report["views"].items():
+            latency = view["latency_ms"]
+            self.stdout.write(
+                f"{name:<8} {view['count']:>6} "
+                + " ".join(f"{latency[metric]:>7.1f}ms" for metric in LATENCY_METRICS)
+                + f" {view['queries']['mean']:>6.1f} {view['lock_errors']:>5}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{totals['requests']}개 요청 · {totals['seconds']}초 · {totals['throughput']} req/s · "
+                f"오류 {totals['errors']} · 잠금 오류 {totals['lock_errors']}"
+            )
+        )
+
+    def _compare(self, options) -> None:
+        reports = []
+        for path in options["compare"]:
+            try:
+                with open(path, encoding="utf-8") as fp:
+                    reports.append(json.load(fp))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"결과 파일을 읽을 수 없습니다: {path} ({exc})")
+        comparison = compare_reports(*reports, threshold=options["threshold"])
+        if options["output"]:
+            self._write(comparison, options["output"])
+
+        if comparison["config_diff"]:
+            self.stdout.write(self.style.WARNING(f"설정이 다릅니다: {', '.join(comparison['config_diff'])}"))
+        for name, row in comparison["views"].items():
+            if "only_in" in row:
+                self.stdout.write(f"{name:<8} ({row['only_in']} 에만 있음)")
+                continue
+            cells = [
+                f"{metric} {row[metric]['base']}→{row[metric]['new']}"
+                + (f" ({row[metric]['change_pct']:+.1f}%)" if row[metric]["change_pct"] is not None else "")
+                for metric in (*LATENCY_METRICS, "queries")
+            ]
+            self.stdout.write(f"{name:<8} " + " · ".join(cells))
+        throughput = comparison["totals"]["throughput"]
+        self.stdout.write(f"처리량 {throughput['base']}→{throughput['new']} req/s")
+
+        if comparison["regressions"]:
+            message = f"회귀: {', '.join(comparison['regressions'])}"
+            if options["fail_on_regression"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("회귀 없음"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from members.board import bump_team_version
+from members.models import Team
+from members.progress import rebuild_team_progress
+
+
+class Command(BaseCommand):
+    help = "제출 내역으로부터 팀 진행 상황(TeamProgress)을 처음부터 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--team",
+            action="append",
+            dest="teams",
+            help="다시 계산할 팀 코드. 여러 번 지정할 수 있으며 생략하면 모든 팀을 계산합니다.",
+        )
+
+    def handle(self, *args, **options):
+        valid_teams = list(Team.objects.values_list("code", flat=True))
+        teams = options["teams"] or valid_teams
+        unknown = sorted(set(teams) - set(valid_teams))
+        if unknown:
+            raise CommandError(f"알 수 없는 팀입니다: {', '.join(unknown)}")
+
+        for team in teams:
+            progress = rebuild_team_progress(team)
+            bump_team_version(team)
+            self.stdout.write(
+                f"{progress.get_team_display()}: 승인 {progress.approved_count} · 검토중 {progress.pending_count} · "
+                f"반려 {progress.rejected_count} · 완성 줄 {progress.completed_lines}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(teams)}개 팀의 진행 상황을 다시 계산했습니다."))
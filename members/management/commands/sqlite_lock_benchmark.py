@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from secant.sqlite import PROFILES, sqlite_options
+
+# Django 의 sqlite3 기본 잠금 대기 시간(초)
+DEFAULT_TIMEOUT = 5
+
+
+def _connect(path: str, profile: str):
+    options = sqlite_options(profile)
+    conn = sqlite3.connect(
+        path,
+        timeout=options.get("timeout", DEFAULT_TIMEOUT),
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    for statement in options.get("init_command", "").split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    return conn, f"BEGIN {options.get('transaction_mode') or 'DEFERRED'}"
+
+
+def run_lock_benchmark(profile: str, workers: int = 8, writes: int = 50) -> dict:
+    """
+    제출 뷰처럼 "먼저 읽고 나서 쓰는" 트랜잭션을 여러 스레드에서 동시에 실행하고
+    잠금 오류 수와 처리량을 돌려준다. 각 스레드는 자기 연결을 쓴다.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        setup, _ = _connect(path, profile)
+        setup.execute("CREATE TABLE submission (id INTEGER PRIMARY KEY, worker INTEGER, n INTEGER, body TEXT)")
+        setup.close()
+
+        lock = threading.Lock()
+        totals = {"committed": 0, "lock_errors": 0}
+        barrier = threading.Barrier(workers)
+
+        def worker(index: int):
+            conn, begin = _connect(path, profile)
+            barrier.wait()
+            committed = errors = 0
+            for n in range(writes):
+                try:
+                    conn.execute(begin)
+                    conn.execute("SELECT COUNT(*) FROM submission WHERE worker = ?", (index,)).fetchone()
+                    conn.execute(
+                        "INSERT INTO submission (worker, n, body) VALUES (?, ?, ?)", (index, n, "x" * 512)
+                    )
+                    conn.execute("COMMIT")
+                    committed += 1
+                except sqlite3.OperationalError as exc:
+                    if "locked" not in str(exc) and "busy" not in str(exc):
+                        raise
+                    errors += 1
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+            conn.close()
+            with lock:
+                totals["committed"] += committed
+                totals["lock_errors"] += errors
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    return {
+        "profile": profile,
+        "attempts": workers * writes,
+        **totals,
+        "seconds": round(elapsed, 3),
+        "writes_per_second": round(totals["committed"] / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = "SQLite 프로파일별로 동시 쓰기 시 'database is locked' 오류 수를 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="동시에 쓰는 스레드 수 (기본 8)")
+        parser.add_argument("--writes", type=int, default=50, help="스레드당 쓰기 트랜잭션 수 (기본 50)")
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            choices=PROFILES,
+            help="비교할 프로파일. 여러 번 지정할 수 있으며 생략하면 모두 비교합니다.",
+        )
+
+    def handle(self, *args, **options):
+        for profile in options["profiles"] or PROFILES:
+            result = run_lock_benchmark(profile, options["workers"], options["writes"])
+            self.stdout.write(
+                f"{profile:>8}: 커밋 {result['committed']}/{result['attempts']} · "
+                f"잠금 오류 {result['lock_errors']} · {result['seconds']}초 · "
+                f"{result['writes_per_second']} writes/s"
+            )
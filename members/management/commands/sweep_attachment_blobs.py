@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from members.storage import release_grace, sweep_attachment_files
+
+
+class Command(BaseCommand):
+    help = (
+        "어떤 첨부도 가리키지 않는 첨부 블롭과 썸네일을 지웁니다. 올리는 중인 요청과 겹치지 않도록 "
+        "최근에 쓰이거나 갱신된 블롭은 건너뜁니다. cron 등으로 주기적으로 실행하세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace",
+            type=float,
+            default=None,
+            help="이 시간(초) 안에 쓰인 블롭은 남깁니다 (기본 BINGO_ATTACHMENT_RELEASE_GRACE).",
+        )
+
+    def handle(self, *args, **options):
+        grace = release_grace() if options["grace"] is None else options["grace"]
+        released = sweep_attachment_files(grace)
+        self.stdout.write(self.style.SUCCESS(f"{len(released)}개 블롭을 지웠습니다."))
@@ -0,0 +1,129 @@
+"""
+첨부 파일 전송.
+
+팀원만 자기 팀 제출의 첨부를 받을 수 있고, 바이트 범위(Range) 요청과 ETag/Cache-Control 을
+지원한다. BINGO_MEDIA_ACCEL 을 "x-accel-redirect"(nginx) 또는 "x-sendfile"(Apache/lighttpd)로
+두면 권한 확인과 조건부 요청만 Django 가 처리하고 실제 전송은 앞단 서버에 맡긴다.
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+
+ACCEL_REDIRECT = "x-accel-redirect"
+ACCEL_SENDFILE = "x-sendfile"
+
+DEFAULT_MEDIA_MAX_AGE = 60 * 60 * 24
+_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int):
+    """
+    Range 헤더를 (시작, 끝) 으로 해석한다(끝 포함). 헤더가 없거나 지원하지 않는 형식(여러 구간 등)이면
+    None, 만족할 수 없는 범위면 ValueError.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N : 마지막 N 바이트
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _iter_range(fh, start: int, end: int):
+    try:
+        fh.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = fh.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _accel_mode() -> str:
+    return (getattr(settings, "BINGO_MEDIA_ACCEL", "") or "").lower()
+
+
+def _offload(response, storage, name: str) -> HttpResponse:
+    mode = _accel_mode()
+    if mode == ACCEL_REDIRECT:
+        prefix = getattr(settings, "BINGO_MEDIA_ACCEL_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name)
+    else:
+        response["X-Sendfile"] = storage.path(name)
+    # 앞단 서버가 Range 를 직접 처리한다.
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def serve_file(request, storage, name: str, *, etag: str, content_type: str = "", filename: str = ""):
+    """
+    저장소의 파일 하나를 조건부 요청/Range 를 지원하며 돌려준다.
+    etag 는 따옴표 없는 값(예: SHA-256)이다.
+    """
+    etag = quote_etag(etag)
+    content_type = content_type or mimetypes.guess_type(filename or name)[0] or "application/octet-stream"
+    max_age = getattr(settings, "BINGO_MEDIA_MAX_AGE", DEFAULT_MEDIA_MAX_AGE)
+
+    def headers(response):
+        response["ETag"] = etag
+        response["Cache-Control"] = f"private, max-age={max_age}"
+        if filename:
+            response["Content-Disposition"] = content_disposition_header(False, filename)
+        return response
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+        return headers(HttpResponse(status=304))
+
+    if _accel_mode() in (ACCEL_REDIRECT, ACCEL_SENDFILE):
+        return headers(_offload(HttpResponse(content_type=content_type), storage, name))
+
+    size = storage.size(name)
+    byte_range = None
+    range_header = request.headers.get("Range", "")
+    if_range = request.headers.get("If-Range")
+    # If-Range 가 현재 ETag 와 다르면 범위를 무시하고 전체를 보낸다.
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = headers(HttpResponse(status=416))
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if request.method == "HEAD":
+        response = headers(HttpResponse(content_type=content_type))
+        response["Content-Length"] = str(size)
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    fh = storage.open(name, "rb")
+    if byte_range is None:
+        response = FileResponse(fh, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_iter_range(fh, start, end), status=206, content_type=content_type)
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return headers(response)
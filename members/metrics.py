@@ -0,0 +1,328 @@
+"""
+요청 단위 계측과 프로세스 내 지표 저장소.
+
+InstrumentationMiddleware 가 요청마다 RequestMetrics 를 contextvar 에 두면, 모든 DB 연결에
+걸린 실행 래퍼가 쿼리 수/DB 시간/같은 SQL 반복(N+1)을 세고, phase() 로 감싼 구간(템플릿
+렌더, JSON 직렬화, 파일 입출력)의 시간을 더한다. 요청이 끝나면 뷰 이름별로 registry 에 모아
+/metrics/ 에서 Prometheus 텍스트 형식으로 내보내고, 느린 요청은 로그로 남긴다.
+
+쿼리 문자열과 파라미터는 보관하지 않고 SQL 문장별 횟수만 세므로 운영에서 켜 두어도 된다.
+지표는 프로세스마다 따로 모이므로 여러 워커를 띄우면 수집기가 워커별로 긁어야 한다.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+slow_logger = logging.getLogger("members.metrics.slow")
+
+DEFAULT_SLOW_REQUEST_MS = 500
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+BYTES_BUCKETS = (1024, 16 * 1024, 256 * 1024, 1024**2, 16 * 1024**2, 256 * 1024**2)
+
+
+# ---------------------------------------------------------------------------
+# 지표 저장소
+# ---------------------------------------------------------------------------
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else f"{int(value)}.0"
+    return str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels → [버킷별 개수..., +Inf 개수, 합계]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    def count(self, *labels) -> int:
+        row = self._values.get(labels)
+        return sum(row[:-1]) if row else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, list(row)) for labels, row in self._values.items())
+        for labels, row in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), row[:-1]):
+                cumulative += n
+                le = 'le="' + (bound if bound == "+Inf" else _number(float(bound))) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(float(row[-1]))}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=SECONDS_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식(0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter("bingo_requests_total", "처리한 요청 수", ("view", "method", "status"))
+REQUEST_SECONDS = registry.histogram("bingo_request_duration_seconds", "요청 처리 시간", ("view",))
+PHASE_SECONDS = registry.histogram("bingo_phase_duration_seconds", "요청 안 구간별 시간", ("view", "phase"))
+DB_QUERIES = registry.histogram("bingo_db_queries", "요청당 쿼리 수", ("view",), COUNT_BUCKETS)
+DB_SECONDS = registry.histogram("bingo_db_duration_seconds", "요청당 DB 시간", ("view",))
+DUPLICATE_QUERIES = registry.counter(
+    "bingo_db_duplicate_queries_total", "한 요청 안에서 같은 SQL 문장을 다시 실행한 횟수", ("view",)
+)
+REQUEST_BYTES = registry.histogram("bingo_request_bytes", "요청 본문(업로드) 크기", ("view",), BYTES_BUCKETS)
+RESPONSE_BYTES = registry.histogram("bingo_response_bytes", "응답 본문 크기", ("view",), BYTES_BUCKETS)
+SLOW_REQUESTS = registry.counter("bingo_slow_requests_total", "느린 요청 수", ("view",))
+
+
+# ---------------------------------------------------------------------------
+# 요청 단위 계측
+# ---------------------------------------------------------------------------
+
+
+class RequestMetrics:
+    __slots__ = ("started", "queries", "db_seconds", "statements", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = _Tally()
+        self.phases = {}
+
+    @property
+    def duplicate_queries(self) -> int:
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def top_duplicate(self) -> tuple[str, int] | None:
+        sql, n = max(self.statements.items(), key=lambda item: item[1], default=("", 0))
+        return (sql, n) if n > 1 else None
+
+
+_current = contextvars.ContextVar("bingo_request_metrics", default=None)
+
+
+def current_metrics() -> RequestMetrics | None:
+    return _current.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_seconds += time.perf_counter() - started
+        metrics.queries += 1
+        metrics.statements[sql] += 1
+
+
+def instrument_connection(connection) -> None:
+    """connection_created 수신자가 부른다. 계측 중인 요청이 없으면 래퍼는 바로 넘긴다."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@contextmanager
+def measure():
+    """요청 밖(관리 명령, 테스트)에서 같은 방식으로 쿼리와 구간을 잰다."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    """현재 요청의 name 구간 시간을 더한다. 계측 중이 아니면 아무 일도 하지 않는다."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[name] = metrics.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or "unnamed"
+
+
+def _response_bytes(response) -> int:
+    if response.has_header("Content-Length"):
+        try:
+            return int(response["Content-Length"])
+        except ValueError:
+            return 0
+    return 0 if response.streaming else len(response.content)
+
+
+def _request_bytes(request) -> int:
+    try:
+        return int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return 0
+
+
+def _server_timing(metrics: RequestMetrics, total: float) -> str:
+    parts = [f"db;dur={metrics.db_seconds * 1000:.1f};desc=\"{metrics.queries} queries\""]
+    parts += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in metrics.phases.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class InstrumentationMiddleware(MiddlewareMixin):
+    """
+    요청 시간, 쿼리 수, DB 시간, 반복 쿼리, 구간 시간, 업로드/응답 바이트를 기록한다.
+    가장 바깥에 두어야 다른 미들웨어 시간까지 잰다. BINGO_SERVER_TIMING 을 켜면
+    같은 값을 Server-Timing 헤더로도 돌려준다(브라우저 개발자 도구에서 보인다).
+    """
+
+    def process_request(self, request):
+        if not getattr(settings, "BINGO_METRICS_ENABLED", True):
+            return None
+        request._metrics = RequestMetrics()
+        _current.set(request._metrics)
+        return None
+
+    def process_response(self, request, response):
+        metrics = getattr(request, "_metrics", None)
+        if metrics is None:
+            return response
+        total = time.perf_counter() - metrics.started
+        # ASGI 에서는 process_request/process_response 가 서로 다른 컨텍스트에서 돌 수 있어
+        # 토큰으로 되돌리지 않고 비운다.
+        _current.set(None)
+
+        view = _view_name(request)
+        REQUESTS.inc(view, request.method, str(response.status_code))
+        REQUEST_SECONDS.observe(total, view)
+        DB_QUERIES.observe(metrics.queries, view)
+        DB_SECONDS.observe(metrics.db_seconds, view)
+        for name, seconds in metrics.phases.items():
+            PHASE_SECONDS.observe(seconds, view, name)
+        duplicates = metrics.duplicate_queries
+        if duplicates:
+            DUPLICATE_QUERIES.inc(view, amount=duplicates)
+        uploaded = _request_bytes(request)
+        if uploaded:
+            REQUEST_BYTES.observe(uploaded, view)
+        RESPONSE_BYTES.observe(_response_bytes(response), view)
+
+        if total * 1000 >= getattr(settings, "BINGO_SLOW_REQUEST_MS", DEFAULT_SLOW_REQUEST_MS):
+            SLOW_REQUESTS.inc(view)
+            top = metrics.top_duplicate()
+            slow_logger.warning(
+                "느린 요청 %s %s (%s) %d %.0fms · 쿼리 %d개 %.0fms · 반복 %d%s · %s",
+                request.method,
+                request.path,
+                view,
+                response.status_code,
+                total * 1000,
+                metrics.queries,
+                metrics.db_seconds * 1000,
+                duplicates,
+                f" (최다 {top[1]}회: {top[0][:200]})" if top else "",
+                ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in metrics.phases.items()) or "-",
+            )
+        if getattr(settings, "BINGO_SERVER_TIMING", False):
+            response["Server-Timing"] = _server_timing(metrics, total)
+        return response
@@ -0,0 +1,91 @@
+"""
+요청의 로그인 회원(request.member) 해석.
+
+세션에는 member_id 만 두고, 작은 Member 레코드는 캐시에 넣어 두어 매 요청마다 DB 를
+읽지 않는다. 회원 행이 바뀌거나 지워지면 시그널이 캐시 항목을 지운다.
+
+시그널은 자기 프로세스에서 보이는 캐시만 지울 수 있다. 기본 LocMemCache 는 프로세스마다
+따로라서 다른 워커가 팀 이동을 저장하면 이 워커의 항목은 그대로 남으므로, 캐시 수명을
+몇 초(BINGO_MEMBER_CACHE_TIMEOUT)로 짧게 두어 그동안만 옛 값을 보게 한다. 공용 캐시(Redis 등)를
+BINGO_MEMBER_CACHE_ALIAS 로 지정하면 시그널 무효화가 모든 워커에 적용되므로 길게 잡아도 된다.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .models import Member
+
+SESSION_KEY = "member_id"
+DEFAULT_MEMBER_CACHE_TIMEOUT = 30
+_MISSING = object()
+
+
+def _member_cache():
+    return caches[getattr(settings, "BINGO_MEMBER_CACHE_ALIAS", "default")]
+
+
+def member_cache_key(member_id) -> str:
+    return f"bingo:member:{member_id}"
+
+
+def _cache_timeout() -> int:
+    return getattr(settings, "BINGO_MEMBER_CACHE_TIMEOUT", DEFAULT_MEMBER_CACHE_TIMEOUT)
+
+
+def forget_member(member_id) -> None:
+    _member_cache().delete(member_cache_key(member_id))
+
+
+def get_member(request):
+    """세션의 회원을 돌려준다. 없으면 None. 한 요청 안에서는 한 번만 해석한다."""
+    cached = getattr(request, "_cached_member", _MISSING)
+    if cached is not _MISSING:
+        return cached
+    member = None
+    member_id = request.session.get(SESSION_KEY)
+    if member_id:
+        key = member_cache_key(member_id)
+        member = _member_cache().get(key)
+        if member is None:
+            member = Member.objects.filter(pk=member_id).first()
+            if member is None:
+                request.session.pop(SESSION_KEY, None)
+            else:
+                _member_cache().set(key, member, _cache_timeout())
+    request._cached_member = member
+    return member
+
+
+async def aget_member(request):
+    cached = getattr(request, "_cached_member", _MISSING)
+    if cached is not _MISSING:
+        return cached
+    member = None
+    member_id = await request.session.aget(SESSION_KEY)
+    if member_id:
+        key = member_cache_key(member_id)
+        member = await _member_cache().aget(key)
+        if member is None:
+            member = await Member.objects.filter(pk=member_id).afirst()
+            if member is not None:
+                await _member_cache().aset(key, member, _cache_timeout())
+    request._cached_member = member
+    return member
+
+
+def login_member(request, member) -> None:
+    request.session.cycle_key()
+    request.session[SESSION_KEY] = member.id
+    request._cached_member = member
+    _member_cache().set(member_cache_key(member.id), member, _cache_timeout())
+
+
+class MemberMiddleware(MiddlewareMixin):
+    """SessionMiddleware 뒤에 두어 request.member / request.amember() 를 제공한다."""
+
+    def process_request(self, request):
+        request.member = SimpleLazyObject(lambda: get_member(request))
+        request.amember = partial(aget_member, request)
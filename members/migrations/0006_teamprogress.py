@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0005_bingosubmission_rejected_reason_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(choices=[('activity', '액티비티조'), ('culture', '문화탐방조'), ('food', '맛집탐방조')], max_length=20, unique=True)),
+                ('board_size', models.PositiveSmallIntegerField(default=3)),
+                ('approved_mask', models.TextField(default='0')),
+                ('completed_lines', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['team'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='bingoitem',
+            name='position',
+            field=models.PositiveIntegerField(help_text='빙고판 순서를 위해 1부터 차례로 사용하세요. (3×3은 1~9, 5×5는 1~25) 숫자가 낮을수록 위쪽/왼쪽에 배치됩니다.'),
+        ),
+    ]
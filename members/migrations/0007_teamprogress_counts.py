@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:54
+
+from django.db import migrations, models
+
+
+def clear_team_progress(apps, schema_editor):
+    # 집계 열이 추가되었으므로 기존 행은 지우고, 처음 조회할 때 다시 계산하게 한다.
+    apps.get_model("members", "TeamProgress").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0006_teamprogress'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='teamprogress',
+            options={'ordering': ['-approved_count', '-completed_lines', 'first_bingo_at']},
+        ),
+        migrations.AddField(
+            model_name='teamprogress',
+            name='approved_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamprogress',
+            name='first_bingo_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teamprogress',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamprogress',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='teamprogress',
+            index=models.Index(fields=['-approved_count', '-completed_lines', 'first_bingo_at'], name='teamprogress_rank_idx'),
+        ),
+        migrations.RunPython(clear_team_progress, migrations.RunPython.noop),
+    ]
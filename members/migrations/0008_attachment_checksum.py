@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0007_teamprogress_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bingosubmissionattachment',
+            name='content_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='bingosubmissionattachment',
+            name='sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='bingosubmissionattachment',
+            name='size',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
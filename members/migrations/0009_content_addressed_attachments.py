@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:59
+
+import members.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0008_attachment_checksum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bingosubmissionattachment',
+            name='original_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='bingosubmissionattachment',
+            name='file',
+            field=models.FileField(db_index=True, storage=members.storage.attachment_storage, upload_to='bingo_attachments/'),
+        ),
+    ]
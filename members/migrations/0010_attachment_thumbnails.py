@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0009_content_addressed_attachments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bingosubmissionattachment',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:10
+
+from django.db import migrations, models
+from django.utils.crypto import salted_hmac
+
+
+def fill_phone_last4_hash(apps, schema_editor):
+    Member = apps.get_model("members", "Member")
+    members = list(Member.objects.only("id", "student_id", "phone_number"))
+    for member in members:
+        member.phone_last4_hash = salted_hmac(
+            "members.Member.phone_last4",
+            f"{member.student_id}:{member.phone_number[-4:]}",
+            algorithm="sha256",
+        ).hexdigest()
+    Member.objects.bulk_update(members, ["phone_last4_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0010_attachment_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='phone_last4_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(fill_phone_last4_hash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['student_id', 'phone_last4_hash'], name='member_login_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0011_member_phone_last4_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(choices=[('activity', '액티비티조'), ('culture', '문화탐방조'), ('food', '맛집탐방조')], max_length=20)),
+                ('item_position', models.PositiveIntegerField()),
+                ('from_status', models.CharField(choices=[('pending', '검토중'), ('approved', '승인'), ('rejected', '반려')], max_length=20)),
+                ('to_status', models.CharField(choices=[('pending', '검토중'), ('approved', '승인'), ('rejected', '반려')], max_length=20)),
+                ('reason', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('submission', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_events', to='members.bingosubmission')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['submission', 'created_at'], name='statusevent_submission_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0012_submission_status_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bingosubmission',
+            index=models.Index(fields=['team', 'status'], name='submission_team_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bingosubmission',
+            index=models.Index(fields=['submitted_by', 'status'], name='submission_submitter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bingosubmission',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at', 'id'], name='submission_pending_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['team', 'name'], name='member_team_name_idx'),
+        ),
+    ]
@@ -0,0 +1,166 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 지금까지 Member.TEAM_CHOICES 로 고정되어 있던 팀
+LEGACY_TEAMS = [
+    ("activity", "액티비티조"),
+    ("culture", "문화탐방조"),
+    ("food", "맛집탐방조"),
+]
+TENANT_MODELS = ["Member", "BingoItem", "BingoSubmission", "TeamProgress"]
+
+
+def move_to_default_event(apps, schema_editor):
+    Event = apps.get_model("members", "Event")
+    Team = apps.get_model("members", "Team")
+    event, _ = Event.objects.get_or_create(slug="default", defaults={"name": "기본 행사"})
+
+    names = dict(LEGACY_TEAMS)
+    codes = [code for code, _ in LEGACY_TEAMS]
+    for model_name in TENANT_MODELS:
+        model = apps.get_model("members", model_name)
+        # 선택지 밖의 값이 저장되어 있었다면 같은 이름의 팀으로 옮긴다.
+        for code in model.objects.order_by().values_list("team", flat=True).distinct():
+            if code and code not in codes:
+                codes.append(code)
+    for position, code in enumerate(codes):
+        Team.objects.get_or_create(code=code, defaults={"event": event, "name": names.get(code, code), "position": position})
+
+    for model_name in TENANT_MODELS:
+        apps.get_model("members", model_name).objects.update(event=event)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0013_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.SlugField(help_text='다른 행사의 팀과도 겹치지 않아야 합니다. 만든 뒤에는 바꿀 수 없습니다.', max_length=20, unique=True)),
+                ('name', models.CharField(max_length=50)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teams', to='members.event')),
+            ],
+            options={
+                'ordering': ['event', 'position', 'code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.AddField(
+            model_name='bingoitem',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.AddField(
+            model_name='bingosubmission',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.AddField(
+            model_name='teamprogress',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.RunPython(move_to_default_event, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='member',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.AlterField(
+            model_name='bingoitem',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.AlterField(
+            model_name='bingosubmission',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.AlterField(
+            model_name='teamprogress',
+            name='event',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, to='members.event'),
+        ),
+        migrations.AlterField(
+            model_name='member',
+            name='team',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='bingoitem',
+            name='team',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='bingosubmission',
+            name='team',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='submissionstatusevent',
+            name='team',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='teamprogress',
+            name='team',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.RemoveConstraint(
+            model_name='bingoitem',
+            name='unique_position_per_team',
+        ),
+        migrations.AddConstraint(
+            model_name='bingoitem',
+            constraint=models.UniqueConstraint(fields=('event', 'team', 'position'), name='unique_position_per_team'),
+        ),
+        migrations.RemoveIndex(
+            model_name='member',
+            name='member_team_name_idx',
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['event', 'team', 'name'], name='member_team_name_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='bingosubmission',
+            name='submission_team_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='bingosubmission',
+            index=models.Index(fields=['event', 'team', 'status'], name='submission_team_status_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='teamprogress',
+            name='teamprogress_rank_idx',
+        ),
+        migrations.AddIndex(
+            model_name='teamprogress',
+            index=models.Index(fields=['event', '-approved_count', '-completed_lines', 'first_bingo_at'], name='teamprogress_rank_idx'),
+        ),
+    ]
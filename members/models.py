@@ -1,59 +1,106 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
 
+from .storage import attachment_storage
+from .tenants import TeamLabelMixin, TenantModel
 
-class Member(models.Model):
+
+def phone_last4_digest(student_id: str, last4: str) -> str:
+    """
+    학번을 솔트로 쓴 전화번호 뒷자리 HMAC. 로그인 시 이 값으로 바로 조회한다.
+    SECRET_KEY 로 서명하므로 키를 바꾸면 회원을 모두 다시 저장해야 한다.
+    """
+    return salted_hmac("members.Member.phone_last4", f"{student_id}:{last4}", algorithm="sha256").hexdigest()
+
+
+class Event(models.Model):
+    """빙고 행사. 한 배포에서 여러 행사를 함께 운영한다."""
+
+    slug = models.SlugField(max_length=50, unique=True)
+    name = models.CharField(max_length=100)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Team(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="teams")
+    code = models.SlugField(
+        max_length=20,
+        unique=True,
+        help_text="다른 행사의 팀과도 겹치지 않아야 합니다. 만든 뒤에는 바꿀 수 없습니다.",
+    )
+    name = models.CharField(max_length=50)
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["event", "position", "code"]
+
+    def __str__(self) -> str:
+        return f"{self.event.name} · {self.name}"
+
+
+class Member(TenantModel):
+    # 기본 행사(마이그레이션 0014 가 만든 "default")의 팀 코드
     TEAM_ACTIVITY = "activity"
     TEAM_CULTURE = "culture"
     TEAM_FOOD = "food"
 
-    TEAM_CHOICES = [
-        (TEAM_ACTIVITY, "액티비티조"),
-        (TEAM_CULTURE, "문화탐방조"),
-        (TEAM_FOOD, "맛집탐방조"),
-    ]
-
     name = models.CharField(max_length=50)
     student_id = models.CharField(max_length=20, unique=True)
     phone_number = models.CharField(
         max_length=20,
         help_text="대시 없이 숫자만 입력하세요.",
     )
-    team = models.CharField(
-        max_length=20,
-        choices=TEAM_CHOICES,
-        default=TEAM_ACTIVITY,
-    )
+    team = models.CharField(max_length=20)
+    phone_last4_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # 로그인 확인이 테이블을 읽지 않고 이 인덱스 하나로 끝나도록 한다.
+            models.Index(fields=["student_id", "phone_last4_hash"], name="member_login_idx"),
+            # 팀원 목록(팀별, 이름순)
+            models.Index(fields=["event", "team", "name"], name="member_team_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.student_id})"
 
+    def save(self, *args, **kwargs):
+        self.phone_last4_hash = phone_last4_digest(self.student_id, self.phone_last4)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"student_id", "phone_number"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "phone_last4_hash"}
+        super().save(*args, **kwargs)
+
     @property
     def phone_last4(self) -> str:
         return self.phone_number[-4:]
 
 
-class BingoItem(models.Model):
-    TEAM_CHOICES = Member.TEAM_CHOICES
-
+class BingoItem(TenantModel):
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     position = models.PositiveIntegerField(
-        help_text="빙고판 순서를 위해 1~9 값을 사용하세요. 숫자가 낮을수록 위쪽/왼쪽에 배치됩니다.",
-    )
-    team = models.CharField(
-        max_length=20,
-        choices=TEAM_CHOICES,
-        default=Member.TEAM_ACTIVITY,
+        help_text="빙고판 순서를 위해 1부터 차례로 사용하세요. (3×3은 1~9, 5×5는 1~25) "
+        "숫자가 낮을수록 위쪽/왼쪽에 배치됩니다.",
     )
+    team = models.CharField(max_length=20)
 
     class Meta:
         ordering = ["team", "position"]
         constraints = [
             models.UniqueConstraint(
-                fields=["team", "position"],
+                fields=["event", "team", "position"],
                 name="unique_position_per_team",
             )
         ]
@@ -62,7 +109,7 @@ class BingoItem(models.Model):
         return f"{self.get_team_display()} #{self.position}: {self.title}"
 
 
-class BingoSubmission(models.Model):
+class BingoSubmission(TenantModel):
     STATUS_PENDING = "pending"
     STATUS_APPROVED = "approved"
     STATUS_REJECTED = "rejected"
@@ -72,11 +119,7 @@ class BingoSubmission(models.Model):
         (STATUS_REJECTED, "반려"),
     ]
 
-    team = models.CharField(
-        max_length=20,
-        choices=Member.TEAM_CHOICES,
-        default=Member.TEAM_ACTIVITY,
-    )
+    team = models.CharField(max_length=20)
     bingo_item = models.ForeignKey(
         BingoItem,
         on_delete=models.CASCADE,
@@ -112,12 +155,33 @@ class BingoSubmission(models.Model):
                 name="unique_submission_per_team_item",
             )
         ]
+        indexes = [
+            # 팀별 상태 집계(진행 상황 재계산, 승인 칸 조회)
+            models.Index(fields=["event", "team", "status"], name="submission_team_status_idx"),
+            # 본인 제출 수정/취소(submitted_by + status__in)
+            models.Index(fields=["submitted_by", "status"], name="submission_submitter_idx"),
+            # admin 검토 대기열: 검토중 제출만 담는 부분 인덱스로 (created_at, id) 키셋 페이지네이션
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status="pending"),
+                name="submission_pending_queue_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 상태 전이(검토중 → 승인 등)를 저장 시점에 알 수 있도록 불러온 값을 기억한다.
+        instance._loaded_status = instance.__dict__.get("status")
+        instance._loaded_rejected_reason = instance.__dict__.get("rejected_reason")
+        return instance
 
     def clean(self):
+        super().clean()
         if self.team and self.bingo_item and self.team != self.bingo_item.team:
-            raise models.ValidationError("빙고 아이템의 팀과 제출 팀이 일치해야 합니다.")
+            raise ValidationError("빙고 아이템의 팀과 제출 팀이 일치해야 합니다.")
         if self.submitted_by and self.team and self.submitted_by.team != self.team:
-            raise models.ValidationError("제출자의 팀과 제출 팀이 일치해야 합니다.")
+            raise ValidationError("제출자의 팀과 제출 팀이 일치해야 합니다.")
 
     def __str__(self) -> str:
         return f"{self.get_team_display()} - {self.bingo_item.title} ({self.get_status_display()})"
@@ -129,21 +193,125 @@ class BingoSubmissionAttachment(models.Model):
         on_delete=models.CASCADE,
         related_name="attachments",
     )
-    file = models.FileField(upload_to="bingo_attachments/")
+    file = models.FileField(upload_to="bingo_attachments/", storage=attachment_storage, db_index=True)
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    size = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    # 썸네일 너비("320" 등)/"poster" → 저장된 파생 파일 이름
+    thumbnails = models.JSONField(default=dict, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self) -> str:
         return f"{self.submission_id} - {self.filename}"
 
+    @property
+    def url(self) -> str:
+        """권한을 확인하는 전송 뷰의 URL. 저장소 URL(file.url)은 직접 노출하지 않는다."""
+        return reverse("attachment_media", args=[self.pk])
+
+    @property
+    def thumbnail_url(self) -> str:
+        """가장 작은 썸네일 URL. 아직 만들어지지 않았으면 빈 문자열."""
+        widths = sorted(int(key) for key in self.thumbnails if key.isdigit())
+        return reverse("attachment_media_variant", args=[self.pk, str(widths[0])]) if widths else ""
+
+    @property
+    def poster_url(self) -> str:
+        if not self.thumbnails.get("poster"):
+            return ""
+        return reverse("attachment_media_variant", args=[self.pk, "poster"])
+
     @property
     def filename(self) -> str:
-        return self.file.name.split("/")[-1]
+        return self.original_name or self.file.name.split("/")[-1]
 
     @property
     def kind(self) -> str:
+        if self.content_type.startswith("image/"):
+            return "image"
+        if self.content_type.startswith("video/"):
+            return "video"
         name = self.filename.lower()
         if any(name.endswith(ext) for ext in [".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".heic", ".heif"]):
             return "image"
         if any(name.endswith(ext) for ext in [".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v"]):
             return "video"
         return "other"
+
+
+class SubmissionStatusEvent(TeamLabelMixin, models.Model):
+    """
+    제출 상태 변경 이력. 추가만 하고 고치거나 지우지 않는다.
+    제출이 취소되어 지워져도 이력은 남도록 팀/아이템 위치를 함께 기록한다.
+    """
+
+    submission = models.ForeignKey(
+        BingoSubmission,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="status_events",
+    )
+    team = models.CharField(max_length=20)
+    item_position = models.PositiveIntegerField()
+    from_status = models.CharField(max_length=20, choices=BingoSubmission.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=BingoSubmission.STATUS_CHOICES)
+    reason = models.TextField(blank=True, default="")
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [models.Index(fields=["submission", "created_at"], name="statusevent_submission_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.get_team_display()} #{self.item_position}: {self.from_status} → {self.to_status}"
+
+
+class TeamProgress(TenantModel):
+    team = models.CharField(max_length=20, unique=True)
+    board_size = models.PositiveSmallIntegerField(default=3)
+    # 승인된 칸의 비트마스크(16진수). position p 는 비트 p-1 에 대응한다.
+    approved_mask = models.TextField(default="0")
+    completed_lines = models.PositiveIntegerField(default=0)
+    approved_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    first_bingo_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    STATUS_COUNT_FIELDS = {
+        BingoSubmission.STATUS_PENDING: "pending_count",
+        BingoSubmission.STATUS_APPROVED: "approved_count",
+        BingoSubmission.STATUS_REJECTED: "rejected_count",
+    }
+
+    class Meta:
+        ordering = ["-approved_count", "-completed_lines", "first_bingo_at"]
+        indexes = [
+            models.Index(
+                fields=["event", "-approved_count", "-completed_lines", "first_bingo_at"],
+                name="teamprogress_rank_idx",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_team_display()} ({self.completed_lines}줄)"
+
+    @property
+    def mask(self) -> int:
+        return int(self.approved_mask or "0", 16)
+
+    @mask.setter
+    def mask(self, value: int) -> None:
+        self.approved_mask = format(value, "x")
+
+    @property
+    def bingo_line_completed(self) -> bool:
+        return self.completed_lines > 0
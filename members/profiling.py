@@ -0,0 +1,319 @@
+"""
+요청 단위 프로파일링.
+
+운영 중 가끔 나오는 느린 요청을 실제 데이터로 재현하기 위해, 스태프가 admin 에서 받은 서명
+토큰을 ?_profile=<토큰> 또는 X-Bingo-Profile 헤더로 보내거나 BINGO_PROFILE_SAMPLE_RATE 로
+무작위 표본을 고르면 그 요청 하나만 프로파일한다.
+
+- sampling(기본): 별도 스레드가 BINGO_PROFILE_INTERVAL 마다 요청 스레드의 스택을 읽어
+  flamegraph.pl/speedscope 에 바로 넣을 수 있는 접힌 스택(.collapsed) 으로 센다. 부하가 적다.
+- cprofile: cProfile 로 모든 함수 호출을 재고 pstats 파일(.prof)로 남긴다. 정확하지만 느려진다.
+
+결과는 BINGO_PROFILE_DIR 에 파일 이름에 메타데이터(시각, 뷰, 상태, 시간)를 담아 저장하고,
+BINGO_PROFILE_MAX_FILES 개를 넘으면 오래된 것부터 지운다.
+
+ASGI 에서도 동기 미들웨어 훅과 동기 뷰는 요청마다 정해진 한 스레드(ThreadSensitiveContext)에서
+차례로 실행되므로, process_request 에서 시작한 프로파일러가 그 스레드를 그대로 잰다.
+이벤트 루프에서 도는 비동기 뷰(SSE)만 process_view 에서 프로파일러를 멈추고 건너뛴다.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+QUERY_PARAM = "_profile"
+HEADER = "HTTP_X_BINGO_PROFILE"
+TOKEN_SALT = "members.profiling"
+PROFILERS = ("sampling", "cprofile")
+DEFAULT_MAX_FILES = 50
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOKEN_MAX_AGE = 60 * 60
+EXTENSIONS = {"sampling": ".collapsed", "cprofile": ".prof"}
+_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+_NAME_RE = re.compile(
+    r"^(?P<timestamp>\d{8}-\d{6}-\d{6})_(?P<view>[\w.-]+)_(?P<method>[A-Z]+)_(?P<status>\d{3})_"
+    r"(?P<ms>\d+)ms_(?P<trigger>token|sample)(?P<ext>\.collapsed|\.prof)$"
+)
+
+
+def profile_dir() -> str:
+    return str(getattr(settings, "BINGO_PROFILE_DIR", "") or os.path.join(tempfile.gettempdir(), "secant-profiles"))
+
+
+# ---------------------------------------------------------------------------
+# 토큰
+# ---------------------------------------------------------------------------
+
+
+def make_profile_token(user) -> str:
+    """스태프에게 내주는 서명 토큰. BINGO_PROFILE_TOKEN_MAX_AGE 초 동안 유효하다."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def check_profile_token(token: str) -> bool:
+    if not token:
+        return False
+    max_age = getattr(settings, "BINGO_PROFILE_TOKEN_MAX_AGE", DEFAULT_TOKEN_MAX_AGE)
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# 프로파일러
+# ---------------------------------------------------------------------------
+
+
+class StackSampler:
+    """대상 스레드의 스택을 interval 초마다 읽어 접힌 스택별 표본 수를 센다."""
+
+    extension = EXTENSIONS["sampling"]
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bingo-profiler", daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        # flamegraph 형식에서 ';' 는 구분자이므로 이름에서 뺀다.
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fp:
+            for stack, count in self.stacks.most_common():
+                fp.write(f"{stack} {count}\n")
+
+
+class CallProfiler:
+    extension = EXTENSIONS["cprofile"]
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+
+    def dump(self, path: str) -> None:
+        self.profile.dump_stats(path)
+
+
+def make_profiler(kind: str):
+    if kind == "cprofile":
+        return CallProfiler()
+    if kind == "sampling":
+        return StackSampler(getattr(settings, "BINGO_PROFILE_INTERVAL", DEFAULT_INTERVAL))
+    raise ValueError(f"알 수 없는 프로파일러입니다: {kind} (가능한 값: {', '.join(PROFILERS)})")
+
+
+# ---------------------------------------------------------------------------
+# 저장과 목록
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ProfileFile:
+    name: str
+    created_at: datetime
+    view: str
+    method: str
+    status: int
+    duration_ms: int
+    trigger: str
+    kind: str
+    size: int
+
+
+def _parse(name: str, size: int = 0) -> ProfileFile | None:
+    match = _NAME_RE.match(name)
+    if not match:
+        return None
+    created_at = datetime.strptime(match["timestamp"], _TIMESTAMP_FORMAT).replace(tzinfo=dt_timezone.utc)
+    return ProfileFile(
+        name=name,
+        created_at=created_at,
+        view=match["view"],
+        method=match["method"],
+        status=int(match["status"]),
+        duration_ms=int(match["ms"]),
+        trigger=match["trigger"],
+        kind="cprofile" if match["ext"] == ".prof" else "sampling",
+        size=size,
+    )
+
+
+def list_profiles() -> list[ProfileFile]:
+    """최근 것부터."""
+    directory = profile_dir()
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return []
+    profiles = [_parse(entry.name, entry.stat().st_size) for entry in entries if entry.is_file()]
+    return sorted((p for p in profiles if p), key=lambda p: p.name, reverse=True)
+
+
+def profile_path(name: str) -> str | None:
+    """목록에 나올 수 있는 이름일 때만 경로를 돌려준다(경로 조작 방지)."""
+    if not _NAME_RE.match(name):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+def _rotate(directory: str, keep: int) -> None:
+    names = sorted(name for name in os.listdir(directory) if _NAME_RE.match(name))
+    for name in names[: max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+def save_profile(profiler, *, view: str, method: str, status: int, duration_ms: int, trigger: str) -> str:
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    view = re.sub(r"[^\w.-]+", ".", view) or "unmatched"
+    name = (
+        f"{timezone.now():{_TIMESTAMP_FORMAT}}_{view}_{method}_{status}_{duration_ms}ms_{trigger}"
+        f"{profiler.extension}"
+    )
+    # 다 쓴 뒤에 이름을 바꿔 목록에 반쯤 쓴 파일이 보이지 않게 한다.
+    partial = os.path.join(directory, f".{name}.tmp")
+    profiler.dump(partial)
+    os.replace(partial, os.path.join(directory, name))
+    _rotate(directory, getattr(settings, "BINGO_PROFILE_MAX_FILES", DEFAULT_MAX_FILES))
+    return name
+
+
+def summarize_profile(name: str, limit: int = 40) -> str:
+    """admin 에서 바로 볼 요약. .prof 는 누적 시간 상위 함수, .collapsed 는 표본이 많은 함수."""
+    path = profile_path(name)
+    if path is None:
+        return ""
+    if name.endswith(".prof"):
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+    inclusive = Counter()
+    total = 0
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            total += int(count)
+            for label in set(stack.split(";")):
+                inclusive[label] += int(count)
+    lines = [f"표본 {total}개 (함수별 포함 비율)"]
+    for label, count in inclusive.most_common(limit):
+        lines.append(f"{count / total:6.1%}  {count:6d}  {label}")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# 미들웨어
+# ---------------------------------------------------------------------------
+
+
+def _trigger(request) -> str:
+    token = request.GET.get(QUERY_PARAM) or request.META.get(HEADER, "")
+    if token and check_profile_token(token):
+        return "token"
+    rate = getattr(settings, "BINGO_PROFILE_SAMPLE_RATE", 0.0)
+    if rate and random.random() < rate:
+        return "sample"
+    return ""
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """
+    토큰이 있거나 표본으로 뽑힌 요청만 프로파일한다. 토큰으로 켠 요청에는 저장된 파일 이름을
+    X-Bingo-Profile 응답 헤더로 알려준다.
+    """
+
+    def process_request(self, request):
+        trigger = _trigger(request)
+        if not trigger:
+            return None
+        profiler = make_profiler(getattr(settings, "BINGO_PROFILER", "sampling"))
+        try:
+            profiler.start()
+        except ValueError as exc:  # 다른 프로파일러가 이미 켜져 있는 경우
+            logger.warning("프로파일러를 시작하지 못했습니다: %s", exc)
+            return None
+        request._profiler = (profiler, trigger, time.perf_counter())
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = getattr(request, "_profiler", None)
+        if state is not None and iscoroutinefunction(view_func):
+            # 비동기 뷰는 이 스레드가 아닌 이벤트 루프에서 돌아 표본에 잡히지 않는다.
+            state[0].stop()
+            del request._profiler
+        return None
+
+    def process_response(self, request, response):
+        state = getattr(request, "_profiler", None)
+        if state is None:
+            return response
+        profiler, trigger, started = state
+        profiler.stop()
+        del request._profiler
+        match = getattr(request, "resolver_match", None)
+        try:
+            name = save_profile(
+                profiler,
+                view=(match.view_name if match else "") or "unmatched",
+                method=request.method,
+                status=response.status_code,
+                duration_ms=round((time.perf_counter() - started) * 1000),
+                trigger=trigger,
+            )
+        except OSError as exc:
+            logger.warning("프로파일을 저장하지 못했습니다: %s", exc)
+            return response
+        if trigger == "token":
+            response["X-Bingo-Profile"] = name
+        return response
@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import bingo
+from .models import BingoItem, BingoSubmission, Team, TeamProgress
+
+
+def _board_size(team: str) -> int:
+    max_position = BingoItem.objects.for_team(team).aggregate(m=Max("position"))["m"] or 0
+    return bingo.board_size_for(max_position)
+
+
+def rebuild_team_progress(team: str) -> TeamProgress:
+    size = _board_size(team)
+    submissions = BingoSubmission.objects.for_team(team)
+    positions = submissions.filter(status=BingoSubmission.STATUS_APPROVED).values_list(
+        "bingo_item__position", flat=True
+    )
+    mask = bingo.positions_to_mask(p for p in positions if 1 <= p <= size * size)
+    counts = dict(submissions.order_by().values_list("status").annotate(n=Count("id")))
+    with transaction.atomic():
+        progress, _ = TeamProgress.objects.select_for_update().for_team(team).get_or_create(team=team)
+        progress.board_size = size
+        progress.mask = mask
+        progress.completed_lines = bingo.count_completed_lines(mask, size)
+        for status, field_name in TeamProgress.STATUS_COUNT_FIELDS.items():
+            setattr(progress, field_name, counts.get(status, 0))
+        if not progress.completed_lines:
+            progress.first_bingo_at = None
+        elif progress.first_bingo_at is None:
+            # 이력이 없으므로 마지막 승인 시각을 최초 빙고 시각으로 추정한다.
+            progress.first_bingo_at = (
+                submissions.filter(status=BingoSubmission.STATUS_APPROVED).aggregate(t=Max("updated_at"))["t"]
+            )
+        progress.save()
+    return progress
+
+
+def rebuild_all_team_progress() -> list[TeamProgress]:
+    return [rebuild_team_progress(team) for team in Team.objects.values_list("code", flat=True)]
+
+
+def get_team_progress(team: str) -> TeamProgress:
+    progress = TeamProgress.objects.for_team(team).first()
+    if progress is None:
+        progress = rebuild_team_progress(team)
+    return progress
+
+
+def scoreboard(event=None) -> list[TeamProgress]:
+    """승인 칸 수, 완성 줄 수, 최초 빙고 시각 순으로 정렬된 팀 진행 상황. 행사를 주면 그 행사만."""
+    queryset = TeamProgress.objects.all()
+    if event is not None:
+        queryset = queryset.for_event(event)
+    return list(queryset)
+
+
+def _apply_change(progress: TeamProgress, position: int, old_status: str | None, new_status: str | None) -> None:
+    old_field = TeamProgress.STATUS_COUNT_FIELDS.get(old_status)
+    new_field = TeamProgress.STATUS_COUNT_FIELDS.get(new_status)
+    if old_field:
+        setattr(progress, old_field, max(getattr(progress, old_field) - 1, 0))
+    if new_field:
+        setattr(progress, new_field, getattr(progress, new_field) + 1)
+
+    was_approved = old_status == BingoSubmission.STATUS_APPROVED
+    is_approved = new_status == BingoSubmission.STATUS_APPROVED
+    if was_approved != is_approved:
+        mask, delta = bingo.set_cell(progress.mask, progress.board_size, position, is_approved)
+        progress.mask = mask
+        progress.completed_lines += delta
+        if not progress.completed_lines:
+            progress.first_bingo_at = None
+        elif progress.first_bingo_at is None:
+            progress.first_bingo_at = timezone.now()
+
+
+def record_status_changes(team: str, changes) -> None:
+    """
+    한 팀의 (position, old_status, new_status) 상태 전이 목록을 한 트랜잭션에서 반영한다.
+    old_status 가 None 이면 새 제출, new_status 가 None 이면 삭제를 뜻한다.
+    """
+    changes = [change for change in changes if change[1] != change[2]]
+    if not changes:
+        return
+    with transaction.atomic():
+        progress = TeamProgress.objects.select_for_update().for_team(team).first()
+        if progress is None:
+            # 아직 진행 상황이 없다면 이미 저장된 현재 상태로부터 만든다.
+            rebuild_team_progress(team)
+            return
+        for position, old_status, new_status in changes:
+            _apply_change(progress, position, old_status, new_status)
+        progress.save()
+
+
+def record_status_change(team: str, position: int, old_status: str | None, new_status: str | None) -> None:
+    record_status_changes(team, [(position, old_status, new_status)])
+
+
+def record_bulk_status_change(rows, new_status: str) -> None:
+    """(team, position, old_status) 목록을 팀별로 묶어 반영한다. admin 일괄 처리용."""
+    by_team = {}
+    for team, position, old_status in rows:
+        by_team.setdefault(team, []).append((position, old_status, new_status))
+    for team, changes in by_team.items():
+        record_status_changes(team, changes)
@@ -0,0 +1,152 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import events, metrics
+from .board import bump_roster_version, bump_team_version
+from .middleware import forget_member
+from .models import BingoItem, BingoSubmission, BingoSubmissionAttachment, Member, Team
+from .progress import rebuild_team_progress, record_bulk_status_change, record_status_change
+from .tenants import forget_teams
+from .transitions import submissions_transitioned
+
+_UNKNOWN = object()
+
+
+def _bump_on_commit(team: str) -> None:
+    # 커밋 전에 버전을 올리면 다른 요청이 이전 데이터로 스냅샷을 다시 채울 수 있으므로
+    # 커밋 직후에도 한 번 더 올린다.
+    bump_team_version(team)
+    transaction.on_commit(lambda: bump_team_version(team))
+
+
+def _submission_position(instance) -> int | None:
+    if BingoSubmission.bingo_item.is_cached(instance):
+        return instance.bingo_item.position
+    return BingoItem.objects.filter(pk=instance.bingo_item_id).values_list("position", flat=True).first()
+
+
+def _visible_reason(instance) -> str:
+    return instance.rejected_reason if instance.status == BingoSubmission.STATUS_REJECTED else ""
+
+
+# 진행 상황 갱신은 보드 캐시 무효화보다 먼저 연결해 둔다(수신자는 연결 순서대로 호출된다).
+@receiver(post_save, sender=BingoSubmission)
+def track_submission_change(sender, instance, created, **kwargs):
+    old_status = None if created else getattr(instance, "_loaded_status", _UNKNOWN)
+    old_reason = "" if created else getattr(instance, "_loaded_rejected_reason", _UNKNOWN)
+    instance._loaded_status = instance.status
+    instance._loaded_rejected_reason = instance.rejected_reason
+
+    if old_status is _UNKNOWN:
+        rebuild_team_progress(instance.team)
+    elif old_status != instance.status:
+        position = _submission_position(instance)
+        if position is not None:
+            record_status_change(instance.team, position, old_status, instance.status)
+
+    if created:
+        event_type = events.EVENT_SUBMITTED
+    elif old_status != instance.status or old_reason != instance.rejected_reason:
+        event_type = events.EVENT_STATUS
+    else:
+        return
+    events.publish_on_commit(
+        instance.team,
+        events.submission_event(
+            event_type, instance.id, instance.bingo_item_id, instance.status, _visible_reason(instance)
+        ),
+    )
+
+
+@receiver(post_delete, sender=BingoSubmission)
+def untrack_submission(sender, instance, **kwargs):
+    events.publish_on_commit(
+        instance.team,
+        events.submission_event(events.EVENT_CANCELLED, instance.id, instance.bingo_item_id),
+    )
+    old_status = getattr(instance, "_loaded_status", instance.status)
+    position = _submission_position(instance)
+    if position is None:
+        # 아이템과 함께 삭제되는 경우: 아이템 수신자가 다시 계산한다.
+        return
+    record_status_change(instance.team, position, old_status, None)
+
+
+@receiver(submissions_transitioned, sender=BingoSubmission)
+def track_bulk_transition(sender, transitions, teams, status, reason, **kwargs):
+    # UPDATE 한 번으로 바뀐 행들: 진행 상황은 팀별로 묶어 반영하고, 캐시는 팀마다 한 번만 무효화한다.
+    record_bulk_status_change([(t.team, t.item_position, t.from_status) for t in transitions], status)
+    for t in transitions:
+        events.publish_on_commit(
+            t.team, events.submission_event(events.EVENT_STATUS, t.submission_id, t.item_id, status, reason)
+        )
+    for team in teams:
+        _bump_on_commit(team)
+
+
+@receiver(post_save, sender=BingoItem)
+@receiver(post_delete, sender=BingoItem)
+def rebuild_progress_on_item_change(sender, instance, **kwargs):
+    rebuild_team_progress(instance.team)
+
+
+@receiver(post_save, sender=BingoSubmission)
+@receiver(post_delete, sender=BingoSubmission)
+@receiver(post_save, sender=BingoItem)
+@receiver(post_delete, sender=BingoItem)
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_team_board(sender, instance, **kwargs):
+    _bump_on_commit(instance.team)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def forget_cached_member(sender, instance, **kwargs):
+    # 다른 요청이 커밋 전 값을 다시 캐시에 넣을 수 있으므로 커밋 후에도 지운다.
+    member_id = instance.pk
+    forget_member(member_id)
+    transaction.on_commit(lambda: forget_member(member_id))
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_team_roster(sender, instance, **kwargs):
+    team = instance.team
+    bump_roster_version(team)
+    transaction.on_commit(lambda: bump_roster_version(team))
+
+
+@receiver(post_save, sender=BingoSubmissionAttachment)
+@receiver(post_delete, sender=BingoSubmissionAttachment)
+def invalidate_attachment_board(sender, instance, **kwargs):
+    # 대부분의 쓰기 경로는 submission 을 이미 들고 있으므로 추가 쿼리를 피한다.
+    if BingoSubmissionAttachment.submission.is_cached(instance):
+        team = instance.submission.team
+    else:
+        team = (
+            BingoSubmission.objects.filter(pk=instance.submission_id).values_list("team", flat=True).first()
+        )
+    if team:
+        _bump_on_commit(team)
+
+
+@receiver(m2m_changed, sender=BingoSubmission.participants.through)
+def invalidate_participants_board(sender, instance, action, **kwargs):
+    # 제출과 팀원 모두 team 값을 가지며, 참가자는 같은 팀에서만 고를 수 있다.
+    if action.startswith("post_"):
+        _bump_on_commit(instance.team)
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def forget_team_directory(sender, instance, **kwargs):
+    forget_teams()
+    transaction.on_commit(forget_teams)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    metrics.instrument_connection(connection)
@@ -0,0 +1,50 @@
+// 검토 대기열: 승인/반려를 페이지 이동 없이 한 건씩 처리한다.
+(function() {
+    document.addEventListener("DOMContentLoaded", function() {
+        const list = document.querySelector(".review-list");
+        if (!list) return;
+        const decideUrl = list.dataset.decideUrl;
+        const csrfToken = document.querySelector("input[name=csrfmiddlewaretoken]").value;
+
+        list.addEventListener("click", async function(event) {
+            const button = event.target.closest("button[data-decision]");
+            if (!button) return;
+            const card = button.closest(".review-card");
+            const status = card.querySelector(".review-status");
+            const reasonInput = card.querySelector("input[name=reason]");
+            const decision = button.dataset.decision;
+            if (decision === "reject" && !reasonInput.value.trim()) {
+                status.textContent = "반려 사유를 입력해주세요.";
+                reasonInput.focus();
+                return;
+            }
+
+            const body = new FormData();
+            body.append("decision", decision);
+            body.append("reason", reasonInput.value.trim());
+            card.querySelectorAll("button").forEach((b) => { b.disabled = true; });
+            try {
+                const res = await fetch(decideUrl.replace("/0/", `/${card.dataset.id}/`), {
+                    method: "POST",
+                    body,
+                    credentials: "same-origin",
+                    headers: { "X-CSRFToken": csrfToken },
+                });
+                const data = await res.json();
+                if (res.ok) {
+                    status.textContent = data.status === "approved" ? "승인됨" : `반려됨: ${data.reason}`;
+                    card.classList.add("is-done");
+                    return;
+                }
+                status.textContent = data.error || "처리하지 못했습니다.";
+                if (res.status === 409) {
+                    card.classList.add("is-done");
+                    return;
+                }
+            } catch (err) {
+                status.textContent = "네트워크 오류가 발생했습니다.";
+            }
+            card.querySelectorAll("button").forEach((b) => { b.disabled = false; });
+        });
+    });
+})();
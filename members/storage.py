@@ -0,0 +1,174 @@
+"""
+첨부 파일용 내용 주소(content-addressed) 저장소.
+
+파일은 SHA-256 해시로 이름을 정해 한 번만 저장한다. 같은 사진을 여러 칸에 올려도
+디스크에는 하나만 남고, 같은 파일을 다시 보내면 쓰기 없이 기존 이름을 돌려준다.
+블롭의 참조 수는 그 파일을 가리키는 첨부 행의 수이며, 마지막 참조가 사라질 때만
+release_attachment_files 가 실제 파일을 지운다.
+
+블롭은 첨부 행을 커밋하기 전에 저장하므로, 다른 요청이 같은 내용을 막 올려 아직 행을
+커밋하지 않았을 수 있다. 그래서 save 는 이미 있는 블롭의 수정 시각을 갱신하고, 지울 때는
+최근 BINGO_ATTACHMENT_RELEASE_GRACE 초 안에 쓰이거나 갱신된 블롭을 건너뛴다. 건너뛴 블롭은
+sweep_attachment_files(관리 명령 sweep_attachment_blobs)가 나중에 정리한다.
+"""
+import hashlib
+import os
+import posixpath
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.functional import LazyObject
+
+
+def content_sha256(content) -> str:
+    # 업로드 핸들러가 미리 계산해 둔 값이 있으면 다시 읽지 않는다.
+    checksum = getattr(content, "sha256", "")
+    if checksum:
+        return checksum
+    hasher = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def content_name(self, name: str, content) -> str:
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        digest = content_sha256(content)
+        return posixpath.join(directory, digest[:2], digest[2:4], f"{digest}{ext}")
+
+    def save(self, name, content, max_length=None):
+        return self.store(name, content, max_length=max_length)[0]
+
+    def store(self, name, content, max_length=None) -> tuple[str, int | None]:
+        """
+        save 와 같지만 (이름, 새로 썼으면 그때의 수정 시각) 을 돌려준다. 이미 있던 블롭이면
+        수정 시각은 None 이다. 새로 쓴 요청은 실패했을 때 이 값으로 블롭을 바로 지울 수 있다.
+        """
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self._touch(name):
+            return name, None
+        # 동시에 같은 블롭을 쓰는 드문 경우에는 FileSystemStorage 가 다른 이름을 고르므로
+        # 사본이 하나 더 생길 뿐 내용은 그대로다.
+        name = super().save(name, content, max_length=max_length)
+        return name, os.stat(self.path(name)).st_mtime_ns
+
+    def _touch(self, name: str) -> bool:
+        """있는 블롭이면 수정 시각을 지금으로 바꿔 지우는 쪽이 건너뛰게 한다. 없으면 False."""
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete_if_idle(self, name: str, grace: float, written_ns: int | None = None) -> bool:
+        """
+        grace 초 동안 쓰이지 않은 블롭만 지운다. written_ns 를 주면(이 요청이 새로 쓴 블롭) 그 뒤로
+        아무도 갱신하지 않았을 때 바로 지운다. 먼저 이름을 바꿔 save 의 _touch 가 실패하게 한 뒤
+        수정 시각을 다시 보고, 그 사이에 갱신되었으면 되돌린다.
+        """
+        path = self.path(name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if written_ns is not None:
+            if mtime != written_ns:
+                return False
+        elif time.time_ns() - mtime < grace * 1_000_000_000:
+            return False
+        doomed = f"{path}.deleting"
+        try:
+            os.replace(path, doomed)
+        except FileNotFoundError:
+            return False
+        if os.stat(doomed).st_mtime_ns != mtime:
+            os.replace(doomed, path)
+            return False
+        os.remove(doomed)
+        return True
+
+
+class _AttachmentStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = ContentAddressedStorage()
+
+
+default_attachment_storage = _AttachmentStorage()
+
+
+def attachment_storage():
+    return default_attachment_storage
+
+
+DEFAULT_RELEASE_GRACE = 15 * 60
+
+
+def release_grace() -> float:
+    return getattr(settings, "BINGO_ATTACHMENT_RELEASE_GRACE", DEFAULT_RELEASE_GRACE)
+
+
+def release_attachment_files(names, grace: float | None = None, written: dict | None = None) -> list[str]:
+    """
+    더 이상 어떤 첨부도 가리키지 않고 grace 초 동안 쓰이지 않은 블롭만 지우고, 지운 이름을
+    돌려준다. written 은 이 요청이 새로 쓴 블롭의 {이름: 수정 시각} 이다.
+    참조 여부는 한 번의 쿼리로 확인한다.
+    """
+    from .models import BingoSubmissionAttachment
+    from .thumbnails import delete_derived_files
+
+    written = written or {}
+    names = {name for name in names if name} | set(written)
+    if not names:
+        return []
+    grace = release_grace() if grace is None else grace
+    still_used = set(BingoSubmissionAttachment.objects.filter(file__in=names).values_list("file", flat=True))
+    released = [
+        name
+        for name in sorted(names - still_used)
+        if default_attachment_storage.delete_if_idle(name, grace, written.get(name))
+    ]
+    delete_derived_files(released)
+    return released
+
+
+def sweep_attachment_files(grace: float | None = None) -> list[str]:
+    """
+    저장소 전체에서 참조가 없는 블롭을 찾아 release_attachment_files 와 같은 규칙으로 지운다.
+    커밋 직후 정리에서 유예 기간 때문에 남은 블롭을 주기적으로 치운다.
+    """
+    from .models import BingoSubmissionAttachment
+
+    field = BingoSubmissionAttachment._meta.get_field("file")
+    directory = posixpath.dirname(field.generate_filename(None, "x"))
+    root = default_attachment_storage.path(directory)
+    names = []
+    for current, _, files in os.walk(root):
+        for filename in files:
+            if filename.endswith(".deleting"):
+                continue
+            relative = os.path.relpath(os.path.join(current, filename), default_attachment_storage.location)
+            names.append(relative.replace(os.sep, "/"))
+    released = []
+    # SQLite 의 변수 개수 제한을 넘지 않게 나눠서 확인한다.
+    for start in range(0, len(names), 500):
+        released += release_attachment_files(names[start : start + 500], grace)
+    return released
+
+
+def release_attachment_files_on_commit(names) -> None:
+    names = list(names)
+    if names:
+        transaction.on_commit(lambda: release_attachment_files(names))
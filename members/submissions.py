@@ -0,0 +1,87 @@
+"""
+제출 생성/수정 쓰기 경로.
+
+첨부 블롭은 트랜잭션을 열기 전에 저장하고, 제출 행, 참가자, 첨부 행만 짧은 트랜잭션 안에서
+묶음 쿼리로 저장한다. 참가자와 첨부는 bulk_create 로 넣으므로 행 단위 시그널 대신 커밋 후
+팀 보드 버전을 한 번 올린다.
+"""
+from django.db import transaction
+
+from .board import bump_team_version
+from .models import BingoSubmission
+from .storage import release_attachment_files, release_attachment_files_on_commit
+from .thumbnails import schedule_thumbnails
+from .uploads import add_attachments, replace_attachments, store_uploads, upload_blob_name
+
+
+def set_participants(submission, members, *, replace: bool = True) -> None:
+    """참가자 목록을 DELETE 한 번과 INSERT 한 번으로 바꾼다. 새 제출이면 replace=False."""
+    through = BingoSubmission.participants.through
+    if replace:
+        through.objects.filter(bingosubmission_id=submission.pk).delete()
+    through.objects.bulk_create(
+        [through(bingosubmission_id=submission.pk, member_id=member.pk) for member in members]
+    )
+    team = submission.team
+    transaction.on_commit(lambda: bump_team_version(team))
+
+
+def _release_uploads(uploads) -> None:
+    # 저장 중 실패했거나 트랜잭션이 롤백되었으므로 이번 요청이 쓴 블롭 중 다른 첨부가 참조하지 않는 것만 지운다.
+    # 새로 쓴 블롭은 그 뒤로 다른 업로드가 다시 쓰지 않았으면 바로 지우고, 나머지는 유예 기간을 따른다.
+    written = {
+        upload.blob_name: upload.blob_written_ns for upload in uploads if getattr(upload, "blob_written_ns", None)
+    }
+    release_attachment_files((upload_blob_name(upload) for upload in uploads), written=written)
+
+
+def create_submission(form, member, bingo_item, uploads) -> BingoSubmission:
+    """
+    제출·참가자·첨부 행을 한 트랜잭션으로 저장한다(tuned 프로파일에서는 BEGIN IMMEDIATE).
+    블롭은 그 전에 저장한다. 중복 여부는 미리 조회하지 않고 유니크 제약에 맡긴다.
+    """
+    try:
+        store_uploads(uploads)
+        with transaction.atomic():
+            submission: BingoSubmission = form.save(commit=False)
+            submission.bingo_item = bingo_item
+            submission.team = member.team
+            submission.submitted_by = member
+            submission.status = BingoSubmission.STATUS_PENDING
+            submission.save()
+            set_participants(submission, form.cleaned_data["participants"], replace=False)
+            attachments = add_attachments(submission, uploads)
+            schedule_thumbnails(a.id for a in attachments)
+    except Exception:
+        _release_uploads(uploads)
+        raise
+    return submission
+
+
+def edit_submission(submission, form, uploads, existing_attachments=None) -> BingoSubmission:
+    """
+    제목·내용·참가자를 고치고, 새 파일이 있으면 첨부를 바꾼다. 부분 갱신 API 가 updated_at 만
+    보고 칸을 가져가므로 첨부까지 한 번에 커밋한다.
+    """
+    try:
+        store_uploads(uploads)
+        with transaction.atomic():
+            submission.title = form.cleaned_data["title"]
+            submission.content = form.cleaned_data["content"]
+            update_fields = ["title", "content", "updated_at"]
+            if uploads and submission.photo:
+                submission.photo.delete(save=False)
+                submission.photo = None
+                update_fields.append("photo")
+            submission.save(update_fields=update_fields)
+            set_participants(submission, form.cleaned_data["participants"])
+            if uploads:
+                # 내용이 같은 파일은 그대로 두고, 마지막 참조가 사라진 블롭만 커밋 후 지운다.
+                created, stale_names = replace_attachments(submission, uploads, existing_attachments)
+                release_attachment_files_on_commit(stale_names)
+                schedule_thumbnails(a.id for a in created)
+    except Exception:
+        if uploads:
+            _release_uploads(uploads)
+        raise
+    return submission
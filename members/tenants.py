@@ -0,0 +1,102 @@
+"""
+행사(Event)별 조회 범위.
+
+팀 코드는 모든 행사를 통틀어 유일하므로 보드 캐시, 실시간 알림 채널, 진행 상황은 지금처럼
+팀 문자열 하나로 구분한다. 대신 팀에 속한 행을 읽는 조회는 TenantQuerySet.for_team 을 거쳐
+항상 (event, team, ...) 인덱스 앞부분에 행사 키를 건다.
+
+팀 코드 → (행사 id, 이름) 표는 프로세스마다 한 번 읽어 둔다. 팀의 행사는 바뀌지 않으므로
+모르는 코드가 나올 때만 다시 읽고, 이 프로세스에서 팀을 저장/삭제하면 비운다.
+"""
+from django.core.exceptions import ValidationError
+from django.db import models
+
+_teams: dict[str, tuple[int, str]] | None = None
+
+
+def _load_teams() -> dict[str, tuple[int, str]]:
+    from .models import Team
+
+    global _teams
+    _teams = {code: (event_id, name) for code, event_id, name in Team.objects.values_list("code", "event_id", "name")}
+    return _teams
+
+
+def _team(code: str) -> tuple[int, str] | None:
+    teams = _teams if _teams is not None else _load_teams()
+    if code not in teams:
+        teams = _load_teams()
+    return teams.get(code)
+
+
+def forget_teams() -> None:
+    global _teams
+    _teams = None
+
+
+def team_event_id(code: str) -> int | None:
+    team = _team(code) if code else None
+    return team[0] if team else None
+
+
+def team_name(code: str) -> str:
+    team = _team(code) if code else None
+    return team[1] if team else code
+
+
+def team_choices() -> list:
+    """admin 선택 상자용. 행사별로 묶은 (행사 이름, [(팀 코드, 팀 이름)]) 목록."""
+    from .models import Team
+
+    teams = Team.objects.select_related("event")
+    grouped = {}
+    for team in teams:
+        grouped.setdefault(team.event.name, []).append((team.code, team.name))
+    return list(grouped.items())
+
+
+class TenantQuerySet(models.QuerySet):
+    def for_event(self, event):
+        return self.filter(event=event)
+
+    def for_team(self, team: str):
+        """
+        팀 하나의 행. 알 수 없는 팀이면 event IS NULL 이 되어 아무 행도 읽지 않는다.
+        """
+        return self.filter(event_id=team_event_id(team), team=team)
+
+
+TenantManager = models.Manager.from_queryset(TenantQuerySet)
+
+
+class TeamLabelMixin:
+    """choices 대신 Team 표에서 팀 이름을 찾는다. 템플릿의 get_team_display 를 그대로 쓴다."""
+
+    def get_team_display(self) -> str:
+        return team_name(self.team)
+
+
+class TenantModel(TeamLabelMixin, models.Model):
+    """
+    행사에 속한 행. event 는 team 으로부터 저장할 때마다 다시 채우므로 직접 고치지 않는다.
+    행사 키는 (event, team, ...) 복합 인덱스의 앞부분으로 쓰므로 외래 키 단독 인덱스는 만들지 않는다.
+    """
+
+    event = models.ForeignKey("members.Event", on_delete=models.PROTECT, db_index=False, editable=False)
+
+    objects = TenantManager()
+
+    class Meta:
+        abstract = True
+
+    def clean(self):
+        super().clean()
+        if self.team and team_event_id(self.team) is None:
+            raise ValidationError({"team": "등록되지 않은 팀입니다."})
+
+    def save(self, *args, **kwargs):
+        self.event_id = team_event_id(self.team)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "team" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "event"}
+        super().save(*args, **kwargs)
@@ -1,3 +1,1765 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin import AdminSite
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import Q
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from secant.sqlite import sqlite_options
+
+from . import bingo, events
+from .admin import BingoSubmissionAdmin
+from .benchmark import BenchmarkConfig, compare_reports, parse_mix, percentile, run_benchmark
+from .board import (
+    BOARD_QUERY_BUDGET,
+    board_cache_stats,
+    board_cache_timeout,
+    build_board_snapshot,
+    get_board_snapshot,
+    get_team_version,
+    reset_board_cache_stats,
+    to_cursor,
+)
+from .management.commands.sqlite_lock_benchmark import run_lock_benchmark
+from .metrics import DB_QUERIES, PHASE_SECONDS, REQUEST_BYTES, REQUESTS, SLOW_REQUESTS, measure, registry
+from .login import TokenBucket, client_ip, login_stats, reset_login_stats
+from .models import (
+    BingoItem,
+    BingoSubmission,
+    BingoSubmissionAttachment,
+    Event,
+    Member,
+    SubmissionStatusEvent,
+    Team,
+    TeamProgress,
+    phone_last4_digest,
+)
+from .profiling import list_profiles, make_profile_token
+from .progress import rebuild_team_progress, scoreboard
+from .storage import ContentAddressedStorage, release_attachment_files, sweep_attachment_files
+from .thumbnails import generate_for_attachments
+from .transitions import submissions_transitioned, transition_submissions
+from .uploads import store_uploads
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="secant-test-media-")
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def image_bytes(width=1200, height=800, color=(30, 120, 200), fmt="PNG"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def png_bytes(**kwargs):
+    return image_bytes(**kwargs)
+
+
+JPEG_BYTES = image_bytes(width=8, height=8, fmt="JPEG")
+MP4_BYTES = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 60
+
+
+def upload(name, content, content_type="image/jpeg"):
+    return SimpleUploadedFile(name, content, content_type=content_type)
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    FILE_UPLOAD_TEMP_DIR=os.path.join(MEDIA_ROOT, ".incoming"),
+    BINGO_THUMBNAILS_SYNC=True,
+)
+class BingoTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.members = [
+            Member.objects.create(
+                name=f"팀원{i}",
+                student_id=f"2024{i:04d}",
+                phone_number=f"0101234{i:04d}",
+                team=Member.TEAM_ACTIVITY,
+            )
+            for i in range(8)
+        ]
+        cls.member = cls.members[0]
+        cls.items = [
+            BingoItem.objects.create(title=f"미션 {pos}", position=pos, team=Member.TEAM_ACTIVITY)
+            for pos in range(1, 10)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        reset_board_cache_stats()
+
+    def login(self, member=None):
+        session = self.client.session
+        session["member_id"] = (member or self.member).id
+        session.save()
+
+    def submit(self, item, files, participants=None, **extra):
+        data = {
+            "title": "인증합니다",
+            "content": "다같이 했어요",
+            "participants": [m.id for m in (participants or self.members[1:4])],
+            "attachments": files,
+        }
+        data.update(extra)
+        return self.client.post(reverse("submit_bingo_item", args=[item.id]), data)
+
+    def make_submission(self, item, status=BingoSubmission.STATUS_PENDING, attachments=2, **kwargs):
+        submission = BingoSubmission.objects.create(
+            team=item.team,
+            bingo_item=item,
+            submitted_by=kwargs.pop("submitted_by", self.member),
+            title=f"{item.title} 인증",
+            content="다같이 다녀왔어요",
+            status=status,
+            **kwargs,
+        )
+        submission.participants.set(self.members[1:4])
+        for i in range(attachments):
+            BingoSubmissionAttachment.objects.create(
+                submission=submission,
+                file=SimpleUploadedFile(f"photo{i}.jpg", b"\xff\xd8\xff\xe0 fake", content_type="image/jpeg"),
+            )
+        return submission
+
+
+class BoardSnapshotTests(BingoTestCase):
+    def test_snapshot_collects_team_board(self):
+        self.make_submission(self.items[0], status=BingoSubmission.STATUS_APPROVED)
+        self.make_submission(self.items[4], status=BingoSubmission.STATUS_REJECTED, rejected_reason="흐림")
+
+        snapshot = build_board_snapshot(Member.TEAM_ACTIVITY)
+
+        self.assertEqual([item.position for item in snapshot.items], list(range(1, 10)))
+        self.assertEqual(snapshot.approved_positions, frozenset({1}))
+        self.assertEqual([s.item_position for s in snapshot.rejected_submissions], [5])
+        self.assertEqual(len(snapshot.team_members), len(self.members))
+        detail = snapshot.submission_detail(snapshot.submissions[self.items[0].id].id)
+        self.assertEqual(detail["participant_ids"], [m.id for m in self.members[1:4]])
+        self.assertEqual(len(detail["attachments"]), 2)
+        self.assertEqual(detail["item_position"], 1)
+
+    def test_snapshot_ignores_other_teams(self):
+        other = BingoItem.objects.create(title="다른 팀", position=1, team=Member.TEAM_FOOD)
+        snapshot = build_board_snapshot(Member.TEAM_ACTIVITY)
+        self.assertNotIn(other.id, [item.id for item in snapshot.items])
+
+    def test_snapshot_query_budget_is_fixed(self):
+        for item in self.items[:6]:
+            self.make_submission(item, attachments=3)
+        with self.assertNumQueries(BOARD_QUERY_BUDGET):
+            build_board_snapshot(Member.TEAM_ACTIVITY)
+
+
+class BoardViewQueryBudgetTests(BingoTestCase):
+    # 세션은 캐시에서 읽고, 회원은 캐시가 비어 있을 때만 1번 조회한다.
+    REQUEST_OVERHEAD = 1
+
+    def test_board_render_stays_within_budget(self):
+        for item in self.items:
+            self.make_submission(item, attachments=5)
+        self.login()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("board"))
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(ctx.captured_queries), BOARD_QUERY_BUDGET + self.REQUEST_OVERHEAD)
+
+    def test_failed_submit_renders_board_within_budget(self):
+        self.login()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                reverse("submit_bingo_item", args=[self.items[0].id]),
+                {"title": "제목", "content": "내용"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "최소 4명")
+        # 아이템 조회 1 + 참가자 검증 1 (중복 제출은 유니크 제약으로 막으므로 미리 조회하지 않는다)
+        self.assertLessEqual(len(ctx.captured_queries), BOARD_QUERY_BUDGET + self.REQUEST_OVERHEAD + 2)
+
+
+class MemberMiddlewareTests(BingoTestCase):
+    def test_member_is_cached_between_requests(self):
+        self.login()
+        self.client.get(reverse("board_cells"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("board_cells"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_member_change_invalidates_cache(self):
+        self.login()
+        self.client.get(reverse("board_cells"))
+        self.member.team = Member.TEAM_FOOD
+        self.member.save()
+        response = self.client.get(reverse("board_cells"))
+        self.assertEqual(response.json()["cells"], [])
+
+        self.member.delete()
+        response = self.client.get(reverse("board_cells"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_team_reassignment_elsewhere_is_seen_after_the_short_ttl(self):
+        # 다른 워커에서 저장한 팀 이동은 이 프로세스의 캐시를 지우지 못한다(시그널 없는 update 로 흉내).
+        self.make_submission(self.items[0])
+        self.login()
+        self.client.get(reverse("board_cells"))
+        Member.objects.filter(pk=self.member.pk).update(team=Member.TEAM_FOOD)
+        self.assertTrue(self.client.get(reverse("board_cells")).json()["cells"])
+
+        later = time.time() + settings.BINGO_MEMBER_CACHE_TIMEOUT + 1
+        with patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            response = self.client.get(reverse("board_cells"))
+        self.assertEqual(response.json()["cells"], [])
+        self.assertLessEqual(settings.BINGO_MEMBER_CACHE_TIMEOUT, 60)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookie_sessions_need_no_session_table(self):
+        response = self.client.post(
+            reverse("login"), {"student_id": self.member.student_id, "phone_last4": self.member.phone_last4}
+        )
+        self.assertRedirects(response, reverse("board"), fetch_redirect_response=False)
+        self.client.get(reverse("board_cells"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("board_cells"))
+        self.assertEqual(response.status_code, 200)
+
+
+class LoginTests(BingoTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_login_stats()
+
+    def attempt(self, last4, student_id=None, ip="10.0.0.1", **extra):
+        return self.client.post(
+            reverse("login"),
+            {"student_id": student_id or self.member.student_id, "phone_last4": last4},
+            REMOTE_ADDR=ip,
+            **extra,
+        )
+
+    def test_credentials_are_checked_with_one_indexed_lookup(self):
+        self.assertEqual(self.member.phone_last4_hash, phone_last4_digest(self.member.student_id, "0000"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.attempt("9999")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "일치하지 않아요")
+        lookups = [q["sql"] for q in ctx.captured_queries if "members_member" in q["sql"]]
+        self.assertEqual(len(lookups), 1)
+        self.assertIn("phone_last4_hash", lookups[0])
+        self.assertNotIn("phone_number", lookups[0])
+
+        self.assertRedirects(self.attempt("0000"), reverse("board"), fetch_redirect_response=False)
+        self.assertEqual(login_stats(), {"rejected": 1, "throttled": 0})
+
+    def test_phone_change_updates_hash(self):
+        self.member.phone_number = "01055554321"
+        self.member.save(update_fields=["phone_number"])
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.phone_last4_hash, phone_last4_digest(self.member.student_id, "4321"))
+
+    @override_settings(BINGO_LOGIN_THROTTLE_RATES={"ip": (100, 60), "student_id": (3, 300)})
+    def test_student_id_is_throttled(self):
+        for _ in range(3):
+            self.assertEqual(self.attempt("9999").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.attempt("0000", ip="10.0.0.2")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(login_stats(), {"rejected": 3, "throttled": 1})
+
+        other = self.attempt(self.members[1].phone_last4, student_id=self.members[1].student_id)
+        self.assertEqual(other.status_code, 302)
+
+    @override_settings(BINGO_LOGIN_THROTTLE_RATES={"ip": (2, 60)})
+    def test_ip_is_throttled_and_refills(self):
+        self.attempt("9999", student_id="nobody-1")
+        self.attempt("9999", student_id="nobody-2")
+        self.assertEqual(self.attempt("0000").status_code, 429)
+        self.assertEqual(self.attempt("0000", ip="10.0.0.9").status_code, 302)
+
+        bucket = TokenBucket("ip", 2, 60)
+        self.assertFalse(bucket.consume("10.0.0.1", now=time.time()))
+        self.assertTrue(bucket.consume("10.0.0.1", now=time.time() + 30))
+        # 다른 호스트의 시계가 조금 늦어도 남은 토큰이 음수로 줄지 않는다.
+        self.assertFalse(bucket.consume("10.0.0.1", now=time.time() - 5))
+        self.assertTrue(bucket.consume("10.0.0.1", now=time.time() + 60))
+
+    def test_default_ip_bucket_lets_a_shared_address_log_everyone_in(self):
+        # 행사장 NAT 뒤의 참가자 전원이 같은 주소에서 한꺼번에 로그인한다.
+        for i in range(100):
+            self.assertEqual(self.attempt("9999", student_id=f"nat-{i}").status_code, 200)
+        self.assertEqual(login_stats()["throttled"], 0)
+
+    @override_settings(BINGO_CLIENT_IP_HEADER="HTTP_X_FORWARDED_FOR", BINGO_LOGIN_THROTTLE_RATES={"ip": (1, 60)})
+    def test_client_ip_header_separates_clients_behind_a_proxy(self):
+        # 프록시는 실제 주소를 오른쪽 끝에 덧붙이고, 앞부분은 클라이언트가 보낸 값 그대로다.
+        self.attempt("9999", student_id="nobody", HTTP_X_FORWARDED_FOR="203.0.113.1")
+        forged = self.attempt("0000", HTTP_X_FORWARDED_FOR="198.51.100.7, 203.0.113.1")
+        self.assertEqual(forged.status_code, 429)
+        self.assertEqual(self.attempt("0000", HTTP_X_FORWARDED_FOR="203.0.113.2").status_code, 302)
+
+    @override_settings(BINGO_CLIENT_IP_HEADER="HTTP_X_FORWARDED_FOR", BINGO_TRUSTED_PROXY_COUNT=2)
+    def test_trusted_proxy_count_picks_the_entry_added_by_the_outer_proxy(self):
+        request = RequestFactory().post("/", HTTP_X_FORWARDED_FOR="198.51.100.7, 203.0.113.1, 10.0.0.1")
+        self.assertEqual(client_ip(request), "203.0.113.1")
+
+
+class BoardCacheTests(BingoTestCase):
+    def test_write_in_another_worker_shows_after_the_local_timeout(self):
+        submission = self.make_submission(self.items[0], attachments=0)
+        self.login()
+        self.client.get(reverse("board_cells"))
+        # 다른 워커의 승인은 이 프로세스의 버전 키를 올리지 못한다(시그널 없는 update 로 흉내).
+        BingoSubmission.objects.filter(pk=submission.pk).update(status=BingoSubmission.STATUS_APPROVED)
+        self.assertEqual(self.client.get(reverse("board_cells")).json()["cells"][0]["st"], "pending")
+
+        self.assertLessEqual(board_cache_timeout(), settings.BINGO_LOCAL_BOARD_CACHE_TIMEOUT)
+        later = time.time() + settings.BINGO_LOCAL_BOARD_CACHE_TIMEOUT + 1
+        with patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            cells = self.client.get(reverse("board_cells")).json()["cells"]
+        self.assertEqual(cells[0]["st"], "approved")
+
+    def test_second_read_is_a_cache_hit_without_queries(self):
+        get_board_snapshot(Member.TEAM_ACTIVITY)
+        with self.assertNumQueries(0):
+            get_board_snapshot(Member.TEAM_ACTIVITY)
+        self.assertEqual(board_cache_stats(), {"hits": 1, "misses": 1})
+
+    def test_submission_write_invalidates_team_only(self):
+        get_board_snapshot(Member.TEAM_ACTIVITY)
+        get_board_snapshot(Member.TEAM_FOOD)
+        self.make_submission(self.items[0])
+
+        snapshot = get_board_snapshot(Member.TEAM_ACTIVITY)
+        self.assertIn(self.items[0].id, snapshot.submissions)
+        self.assertEqual(len(snapshot.submissions[self.items[0].id].attachments), 2)
+        with self.assertNumQueries(0):
+            get_board_snapshot(Member.TEAM_FOOD)
+
+    def test_attachment_delete_invalidates(self):
+        submission = self.make_submission(self.items[0])
+        get_board_snapshot(Member.TEAM_ACTIVITY)
+        submission.attachments.first().delete()
+        snapshot = get_board_snapshot(Member.TEAM_ACTIVITY)
+        self.assertEqual(len(snapshot.submissions[self.items[0].id].attachments), 1)
+
+    def test_admin_bulk_actions_invalidate(self):
+        submission = self.make_submission(self.items[0])
+        get_board_snapshot(Member.TEAM_ACTIVITY)
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin_user)
+        response = self.client.post(
+            reverse("admin:members_bingosubmission_changelist"),
+            {"action": "approve_selected", "_selected_action": [submission.id]},
+        )
+        self.assertEqual(response.status_code, 302)
+        snapshot = get_board_snapshot(Member.TEAM_ACTIVITY)
+        self.assertEqual(snapshot.approved_positions, frozenset({1}))
+
+    def test_file_based_backend(self):
+        location = tempfile.mkdtemp(prefix="secant-test-cache-")
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        file_cache = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": location,
+            }
+        }
+        with self.settings(CACHES=file_cache):
+            self.make_submission(self.items[0])
+            first = get_board_snapshot(Member.TEAM_ACTIVITY)
+            with self.assertNumQueries(0):
+                self.assertEqual(get_board_snapshot(Member.TEAM_ACTIVITY), first)
+            BingoSubmission.objects.filter(pk=first.submissions[self.items[0].id].id).get().delete()
+            self.assertEqual(get_board_snapshot(Member.TEAM_ACTIVITY).submissions, {})
+
+
+class BoardFragmentCacheTests(BingoTestCase):
+    def test_cells_are_reused_until_team_version_changes(self):
+        submission = self.make_submission(self.items[0])
+        self.login()
+        self.client.get(reverse("board"))
+        # 시그널을 거치지 않는 UPDATE 는 팀 버전을 올리지 않으므로 캐시된 칸이 그대로 나온다.
+        BingoItem.objects.filter(pk=self.items[1].pk).update(title="바뀐 미션")
+        self.assertNotContains(self.client.get(reverse("board")), "바뀐 미션")
+
+        submission.status = BingoSubmission.STATUS_REJECTED
+        submission.rejected_reason = "흐림"
+        submission.save()
+        response = self.client.get(reverse("board"))
+        self.assertContains(response, "사유: 흐림")
+        self.assertContains(response, "바뀐 미션")
+
+    def test_participants_follow_roster_not_submissions(self):
+        self.login()
+        self.client.get(reverse("board"))
+        Member.objects.filter(pk=self.members[1].pk).update(name="새이름")
+        self.make_submission(self.items[0])
+        self.assertNotContains(self.client.get(reverse("board")), "<span>새이름</span>")
+
+        Member.objects.create(name="신입", student_id="20249999", phone_number="01099999999", team=Member.TEAM_ACTIVITY)
+        response = self.client.get(reverse("board"))
+        self.assertContains(response, "<span>신입</span>")
+        self.assertContains(response, "<span>새이름</span>")
+
+    def test_uncached_snapshot_is_rendered_directly(self):
+        self.login()
+        self.client.get(reverse("board"))
+        BingoItem.objects.filter(pk=self.items[1].pk).update(title="바뀐 미션")
+        # 제출 실패 화면은 캐시를 거치지 않은 스냅샷으로 그리므로 칸 조각도 새로 그린다.
+        response = self.client.post(
+            reverse("submit_bingo_item", args=[self.items[0].id]), {"title": "제목", "content": "내용"}
+        )
+        self.assertContains(response, "바뀐 미션")
+
+
+class SubmissionDetailTests(BingoTestCase):
+    def test_board_embeds_only_summaries(self):
+        submission = self.make_submission(self.items[0])
+        self.login()
+        response = self.client.get(reverse("board"))
+        self.assertNotContains(response, submission.content)
+        self.assertNotContains(response, submission.attachments.first().url)
+        summary = json.loads(re.search(r'id="submission-data"[^>]*>(.*?)</script>', response.content.decode())[1])
+        self.assertEqual(summary[str(self.items[0].id)]["status"], BingoSubmission.STATUS_PENDING)
+        # 이력 목록의 본문은 제출마다 상세를 받지 않고 since=0 부분 갱신 한 번으로 채운다.
+        self.assertNotIn("content", summary[str(self.items[0].id)])
+        self.assertNotContains(response, "loadDetail(item.id)")
+        self.assertContains(response, "?since=0")
+        second = self.make_submission(self.items[1])
+        cells = self.client.get(reverse("board_cells"), {"since": 0}).json()["cells"]
+        self.assertEqual(
+            {cell["s"]: cell["b"] for cell in cells}, {submission.id: submission.content, second.id: second.content}
+        )
+
+    def test_detail_is_loaded_and_cached_per_submission(self):
+        submission = self.make_submission(self.items[0])
+        self.login()
+        url = reverse("submission_detail", args=[submission.id])
+        detail = self.client.get(url).json()
+        self.assertEqual(detail["content"], submission.content)
+        self.assertEqual(detail["participant_ids"], [m.id for m in self.members[1:4]])
+        self.assertEqual(len(detail["attachments"]), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json(), detail)
+
+        submission.status = BingoSubmission.STATUS_REJECTED
+        submission.rejected_reason = "흐림"
+        submission.save()
+        self.assertEqual(self.client.get(url).json()["rejected_reason"], "흐림")
+
+    def test_detail_is_limited_to_own_team(self):
+        other_item = BingoItem.objects.create(title="다른 팀", position=1, team=Member.TEAM_FOOD)
+        other_member = Member.objects.create(
+            name="다른팀원", student_id="20249999", phone_number="01099999999", team=Member.TEAM_FOOD
+        )
+        other = self.make_submission(other_item, submitted_by=other_member)
+        url = reverse("submission_detail", args=[other.id])
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.login()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class BingoEngineTests(TestCase):
+    def test_line_masks_per_size(self):
+        self.assertEqual(len(bingo.line_masks(3)), 8)
+        self.assertEqual(len(bingo.line_masks(5)), 12)
+        self.assertEqual(len(bingo.line_masks(7)), 16)
+        self.assertIs(bingo.line_masks(5), bingo.line_masks(5))
+
+    def test_board_size_for(self):
+        self.assertEqual(bingo.board_size_for(9), 3)
+        self.assertEqual(bingo.board_size_for(10), 4)
+        self.assertEqual(bingo.board_size_for(25), 5)
+        self.assertEqual(bingo.board_size_for(0), bingo.DEFAULT_BOARD_SIZE)
+
+    def test_count_completed_lines(self):
+        mask = bingo.positions_to_mask([1, 2, 3, 5, 9])
+        self.assertEqual(bingo.count_completed_lines(mask, 3), 2)
+        self.assertTrue(bingo.has_bingo(mask, 3))
+        self.assertFalse(bingo.has_bingo(bingo.positions_to_mask([1, 2, 4]), 3))
+
+    def test_set_cell_matches_full_recount(self):
+        size = 7
+        order = [(p * 17) % (size * size) + 1 for p in range(size * size)]
+        mask, lines = 0, 0
+        for position in order:
+            mask, delta = bingo.set_cell(mask, size, position, True)
+            lines += delta
+            self.assertEqual(lines, bingo.count_completed_lines(mask, size))
+        self.assertEqual(lines, 2 * size + 2)
+        for position in order[::3]:
+            mask, delta = bingo.set_cell(mask, size, position, False)
+            lines += delta
+            self.assertEqual(lines, bingo.count_completed_lines(mask, size))
+
+
+class TeamProgressTests(BingoTestCase):
+    def progress(self):
+        return TeamProgress.objects.get(team=Member.TEAM_ACTIVITY)
+
+    def test_approvals_update_completed_lines(self):
+        submissions = [self.make_submission(item, attachments=0) for item in self.items[:3]]
+        self.assertEqual(self.progress().completed_lines, 0)
+        for submission in submissions:
+            submission.status = BingoSubmission.STATUS_APPROVED
+            submission.save()
+        self.assertEqual(self.progress().completed_lines, 1)
+
+        submissions[1].status = BingoSubmission.STATUS_REJECTED
+        submissions[1].save()
+        self.assertEqual(self.progress().completed_lines, 0)
+
+    def test_deleting_approved_submission_clears_cell(self):
+        for item in self.items[:3]:
+            self.make_submission(item, status=BingoSubmission.STATUS_APPROVED, attachments=0)
+        self.assertEqual(self.progress().completed_lines, 1)
+        BingoSubmission.objects.get(bingo_item=self.items[0]).delete()
+        self.assertEqual(self.progress().completed_lines, 0)
+        self.assertEqual(self.progress().mask, bingo.positions_to_mask([2, 3]))
+
+    def test_admin_bulk_approve_updates_progress(self):
+        submissions = [self.make_submission(item, attachments=0) for item in self.items[::4]]
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin_user)
+        self.client.post(
+            reverse("admin:members_bingosubmission_changelist"),
+            {"action": "approve_selected", "_selected_action": [s.id for s in submissions]},
+        )
+        self.assertEqual(self.progress().completed_lines, 1)
+
+    def test_larger_board_size_follows_items(self):
+        for pos in range(10, 26):
+            BingoItem.objects.create(title=f"미션 {pos}", position=pos, team=Member.TEAM_ACTIVITY)
+        self.assertEqual(self.progress().board_size, 5)
+        for pos in range(1, 6):
+            self.make_submission(
+                BingoItem.objects.get(team=Member.TEAM_ACTIVITY, position=pos),
+                status=BingoSubmission.STATUS_APPROVED,
+                attachments=0,
+            )
+        self.assertEqual(self.progress().completed_lines, 1)
+        self.assertEqual(rebuild_team_progress(Member.TEAM_ACTIVITY).completed_lines, 1)
+
+    def test_counts_follow_status_changes(self):
+        pending = self.make_submission(self.items[0], attachments=0)
+        rejected = self.make_submission(self.items[1], attachments=0)
+        rejected.status = BingoSubmission.STATUS_REJECTED
+        rejected.save()
+        progress = self.progress()
+        self.assertEqual((progress.approved_count, progress.pending_count, progress.rejected_count), (0, 1, 1))
+
+        pending.delete()
+        progress = self.progress()
+        self.assertEqual((progress.approved_count, progress.pending_count, progress.rejected_count), (0, 0, 1))
+
+    def test_first_bingo_timestamp(self):
+        submissions = [self.make_submission(item, attachments=0) for item in self.items[:3]]
+        self.assertIsNone(self.progress().first_bingo_at)
+        for submission in submissions:
+            submission.status = BingoSubmission.STATUS_APPROVED
+            submission.save()
+        first_bingo_at = self.progress().first_bingo_at
+        self.assertIsNotNone(first_bingo_at)
+
+        self.make_submission(self.items[3], status=BingoSubmission.STATUS_APPROVED, attachments=0)
+        self.assertEqual(self.progress().first_bingo_at, first_bingo_at)
+
+    def test_rebuild_command_matches_incremental_state(self):
+        for item in self.items[:4]:
+            self.make_submission(item, status=BingoSubmission.STATUS_APPROVED, attachments=0)
+        self.make_submission(self.items[6], attachments=0)
+        expected = self.progress()
+        TeamProgress.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_team_progress", stdout=out)
+        rebuilt = self.progress()
+        self.assertEqual(
+            (rebuilt.approved_count, rebuilt.pending_count, rebuilt.completed_lines, rebuilt.mask),
+            (expected.approved_count, expected.pending_count, expected.completed_lines, expected.mask),
+        )
+        self.assertEqual(TeamProgress.objects.count(), Team.objects.count())
+
+    def test_scoreboard_is_a_single_query(self):
+        for item in self.items[:3]:
+            self.make_submission(item, status=BingoSubmission.STATUS_APPROVED, attachments=0)
+        food_item = BingoItem.objects.create(title="맛집", position=1, team=Member.TEAM_FOOD)
+        food_member = Member.objects.create(
+            name="맛집러", student_id="20249999", phone_number="01000000000", team=Member.TEAM_FOOD
+        )
+        self.make_submission(food_item, status=BingoSubmission.STATUS_APPROVED, attachments=0, submitted_by=food_member)
+        with self.assertNumQueries(1):
+            teams = [progress.team for progress in scoreboard()]
+        self.assertEqual(teams[:2], [Member.TEAM_ACTIVITY, Member.TEAM_FOOD])
+
+    def test_board_view_reads_stored_result(self):
+        for item in self.items[:3]:
+            self.make_submission(item, status=BingoSubmission.STATUS_APPROVED, attachments=0)
+        self.login()
+        response = self.client.get(reverse("board"))
+        self.assertTrue(response.context["bingo_line_completed"])
+
+
+class LeaderboardTests(BingoTestCase):
+    def test_ranks_every_team(self):
+        for item in self.items[:3]:
+            self.make_submission(item, status=BingoSubmission.STATUS_APPROVED, attachments=0)
+        response = self.client.get(reverse("leaderboard"))
+        self.assertEqual(response.status_code, 200)
+        teams = response.json()["teams"]
+        self.assertEqual([t["team"] for t in teams][0], Member.TEAM_ACTIVITY)
+        self.assertEqual(len(teams), Team.objects.filter(event__slug="default").count())
+        self.assertEqual(teams[0]["lines"], 1)
+        self.assertEqual(teams[0]["approved"], 3)
+        self.assertIsNotNone(teams[0]["first_bingo_at"])
+        self.assertEqual([t["rank"] for t in teams], [1, 2, 3])
+
+    def test_conditional_get_returns_304_without_queries(self):
+        self.make_submission(self.items[0], attachments=0)
+        first = self.client.get(reverse("leaderboard"))
+        etag = first["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        self.assertIn("Last-Modified", first)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("leaderboard"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_write(self):
+        submission = self.make_submission(self.items[0], attachments=0)
+        etag = self.client.get(reverse("leaderboard"))["ETag"]
+        submission.status = BingoSubmission.STATUS_APPROVED
+        submission.save()
+        response = self.client.get(reverse("leaderboard"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_write_in_another_worker_ends_304_after_the_timeout(self):
+        submission = self.make_submission(self.items[0], attachments=0)
+        etag = self.client.get(reverse("leaderboard"))["ETag"]
+        # 다른 워커의 승인은 이 프로세스의 캐시를 건드리지 못한다(시그널 없는 update 로 흉내).
+        BingoSubmission.objects.filter(pk=submission.pk).update(
+            status=BingoSubmission.STATUS_APPROVED, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(self.client.get(reverse("leaderboard"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        later = time.time() + settings.BINGO_LAST_CHANGE_TIMEOUT + 1
+        with patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            response = self.client.get(reverse("leaderboard"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class RecordingBroker(events.LocalBroker):
+    """테스트용 브로커: 발행된 이벤트를 기록해 둔다."""
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, team, event):
+        self.published.append((team, event))
+        super().publish(team, event)
+
+
+@override_settings(BINGO_EVENT_BROKER="members.tests.RecordingBroker")
+class BoardEventTests(BingoTestCase):
+    def setUp(self):
+        super().setUp()
+        events.reset_broker()
+
+    def published(self):
+        return [(team, event["type"], event.get("status"), event.get("reason")) for team, event in events.get_broker().published]
+
+    def test_submission_lifecycle_publishes_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            submission = self.make_submission(self.items[0], attachments=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            submission.status = BingoSubmission.STATUS_REJECTED
+            submission.rejected_reason = "사진이 흐려요"
+            submission.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            submission.delete()
+        self.assertEqual(
+            self.published(),
+            [
+                (Member.TEAM_ACTIVITY, "submitted", "pending", None),
+                (Member.TEAM_ACTIVITY, "status", "rejected", "사진이 흐려요"),
+                (Member.TEAM_ACTIVITY, "cancelled", None, None),
+            ],
+        )
+
+    def test_unchanged_save_publishes_nothing(self):
+        submission = self.make_submission(self.items[0], attachments=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            BingoSubmission.objects.get(pk=submission.pk).save()
+        self.assertEqual(self.published(), [])
+
+    def test_admin_bulk_action_publishes_per_row(self):
+        submissions = [self.make_submission(item, attachments=0) for item in self.items[:2]]
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("admin:members_bingosubmission_changelist"),
+                {"action": "approve_selected", "_selected_action": [s.id for s in submissions]},
+            )
+        self.assertEqual(self.published(), [(Member.TEAM_ACTIVITY, "status", "approved", None)] * 2)
+
+    @override_settings(BINGO_EVENTS_ENABLED=True)
+    async def test_stream_delivers_team_events(self):
+        session = SessionStore()
+        session["member_id"] = self.member.id
+        await session.asave()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+        response = await self.async_client.get(reverse("board_events"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+
+        broker = events.get_broker()
+        broker.publish(Member.TEAM_FOOD, {"type": "status", "item": 0})
+        broker.publish(Member.TEAM_ACTIVITY, {"type": "status", "item": self.items[0].id})
+        chunk = await asyncio.wait_for(anext(stream), timeout=1)
+        self.assertIn(b"event: status", chunk)
+        self.assertIn(str(self.items[0].id).encode(), chunk)
+
+        broker.close()
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(stream), timeout=1)
+        self.assertEqual(broker.subscriber_count(Member.TEAM_ACTIVITY), 0)
+
+    @override_settings(BINGO_EVENTS_ENABLED=True)
+    async def test_stream_requires_login(self):
+        response = await self.async_client.get(reverse("board_events"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_is_off_by_default_and_board_polls(self):
+        self.login()
+        self.assertEqual(self.client.get(reverse("board_events")).status_code, 404)
+        response = self.client.get(reverse("board"))
+        self.assertNotContains(response, "new EventSource")
+        self.assertContains(response, "setInterval(refreshCells")
+        with self.settings(BINGO_EVENTS_ENABLED=True):
+            self.assertContains(self.client.get(reverse("board")), "new EventSource")
+
+
+class BoardCellsApiTests(BingoTestCase):
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(reverse("board_cells")).status_code, 401)
+
+    def test_returns_only_cells_newer_than_cursor(self):
+        first = self.make_submission(self.items[0], attachments=2)
+        self.login()
+        data = self.client.get(reverse("board_cells")).json()
+        self.assertEqual([cell["i"] for cell in data["cells"]], [self.items[0].id])
+        self.assertEqual(data["cells"][0]["a"], [0, 1])
+        self.assertEqual(len(data["a"]), 2)
+        self.assertEqual(len(data["e"]), 8)
+
+        cursor = data["c"]
+        self.assertEqual(self.client.get(reverse("board_cells"), {"since": cursor}).json()["cells"], [])
+
+        self.make_submission(self.items[1], attachments=1)
+        data = self.client.get(reverse("board_cells"), {"since": cursor}).json()
+        self.assertEqual([cell["i"] for cell in data["cells"]], [self.items[1].id])
+        self.assertEqual(data["a"][0][2], "image")
+        self.assertGreater(data["c"], cursor)
+
+        first.delete()
+        data = self.client.get(reverse("board_cells"), {"since": data["c"]}).json()
+        self.assertIn(self.items[0].id, data["e"])
+
+    def test_invalid_cursor(self):
+        self.login()
+        self.assertEqual(self.client.get(reverse("board_cells"), {"since": "abc"}).status_code, 400)
+
+    def test_board_page_embeds_cursor(self):
+        submission = self.make_submission(self.items[0], attachments=0)
+        self.login()
+        response = self.client.get(reverse("board"))
+        submission.refresh_from_db()
+        self.assertEqual(response.context["board_cursor"], to_cursor(submission.updated_at))
+
+
+class AttachmentUploadTests(BingoTestCase):
+    def test_upload_records_size_checksum_and_detected_type(self):
+        self.login()
+        # 브라우저가 보낸 타입과 달라도 실제 내용으로 판정한다.
+        response = self.submit(self.items[0], [upload("clip.bin", MP4_BYTES, "application/octet-stream")])
+        self.assertEqual(response.status_code, 302)
+        attachment = BingoSubmissionAttachment.objects.get()
+        self.assertEqual(attachment.size, len(MP4_BYTES))
+        self.assertEqual(attachment.sha256, hashlib.sha256(MP4_BYTES).hexdigest())
+        self.assertEqual(attachment.content_type, "video/mp4")
+        self.assertEqual(attachment.kind, "video")
+
+    def test_rejects_content_that_is_not_media(self):
+        self.login()
+        response = self.submit(self.items[0], [upload("fake.jpg", b"MZ not an image", "image/jpeg")])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(BingoSubmission.objects.exists())
+
+    def test_blobs_are_written_before_the_write_transaction(self):
+        # 큰 파일을 쓰는 동안 SQLite 쓰기 잠금(BEGIN IMMEDIATE)을 붙잡지 않는다.
+        depths = []
+        store = ContentAddressedStorage.store
+
+        def recording_store(storage, *args, **kwargs):
+            depths.append(len(connection.atomic_blocks))
+            return store(storage, *args, **kwargs)
+
+        self.login()
+        baseline = len(connection.atomic_blocks)
+        with patch.object(ContentAddressedStorage, "store", recording_store):
+            response = self.submit(self.items[0], [upload("a.jpg", JPEG_BYTES + b"a"), upload("b.jpg", JPEG_BYTES + b"b")])
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(depths, [baseline, baseline])
+        for attachment in BingoSubmissionAttachment.objects.all():
+            self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, attachment.file.name)))
+
+    @override_settings(BINGO_MAX_ATTACHMENT_BYTES=1024)
+    def test_per_file_limit_skips_file_during_upload(self):
+        self.login()
+        response = self.submit(self.items[0], [upload("big.jpg", JPEG_BYTES + b"\x00" * 4096)])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "파일 하나는 최대")
+        self.assertFalse(BingoSubmission.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(MEDIA_ROOT, ".incoming")), [])
+
+    @override_settings(BINGO_MAX_SUBMISSION_BYTES=200 * 1024)
+    def test_per_submission_limit(self):
+        self.login()
+        files = [upload(f"p{i}.jpg", JPEG_BYTES + bytes([i]) * 90 * 1024) for i in range(3)]
+        response = self.submit(self.items[0], files)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "모두 합쳐")
+        self.assertFalse(BingoSubmission.objects.exists())
+
+
+class ContentAddressedStorageTests(BingoTestCase):
+    def blob_path(self, attachment):
+        return os.path.join(MEDIA_ROOT, attachment.file.name)
+
+    @override_settings(BINGO_ATTACHMENT_RELEASE_GRACE=0)
+    def test_same_photo_is_stored_once_and_released_with_last_reference(self):
+        self.login()
+        photo = JPEG_BYTES + b"group-photo"
+        self.submit(self.items[0], [upload("a.jpg", photo)])
+        self.submit(self.items[1], [upload("b.jpg", photo)])
+        first, second = BingoSubmissionAttachment.objects.order_by("id")
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertIn(hashlib.sha256(photo).hexdigest(), first.file.name)
+        self.assertEqual((first.filename, second.filename), ("a.jpg", "b.jpg"))
+        path = self.blob_path(first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("cancel_submission", args=[first.submission_id]))
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("cancel_submission", args=[second.submission_id]))
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(BINGO_ATTACHMENT_RELEASE_GRACE=0)
+    def test_update_keeps_unchanged_files(self):
+        self.login()
+        keep, drop, new = JPEG_BYTES + b"keep", JPEG_BYTES + b"drop", JPEG_BYTES + b"new"
+        self.submit(self.items[0], [upload("keep.jpg", keep), upload("drop.jpg", drop)])
+        submission = BingoSubmission.objects.get()
+        kept = submission.attachments.get(original_name="keep.jpg")
+        dropped = submission.attachments.get(original_name="drop.jpg")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("update_submission", args=[submission.id]),
+                {
+                    "title": "수정",
+                    "content": "수정했어요",
+                    "participants": [m.id for m in self.members[1:4]],
+                    "attachments": [upload("keep-again.jpg", keep), upload("new.jpg", new)],
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(submission.attachments.filter(id=kept.id).exists())
+        self.assertEqual(
+            sorted(submission.attachments.values_list("sha256", flat=True)),
+            sorted(hashlib.sha256(b).hexdigest() for b in (keep, new)),
+        )
+        self.assertTrue(os.path.exists(self.blob_path(kept)))
+        self.assertFalse(os.path.exists(self.blob_path(dropped)))
+
+    def test_release_skips_blob_reused_by_uncommitted_upload(self):
+        self.login()
+        photo = JPEG_BYTES + b"shared"
+        self.submit(self.items[0], [upload("a.jpg", photo)])
+        first = BingoSubmissionAttachment.objects.get()
+        path = self.blob_path(first)
+        old = time.time() - 3600
+        os.utime(path, (old, old))
+
+        # 요청 A: 같은 내용을 트랜잭션 전에 저장했지만 아직 첨부 행을 커밋하지 않았다.
+        pending = upload("b.jpg", photo)
+        store_uploads([pending])
+        self.assertEqual(pending.blob_name, first.file.name)
+        # 요청 B: 마지막 참조를 지우고 커밋 후 정리를 실행한다.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("cancel_submission", args=[first.submission_id]))
+        self.assertTrue(os.path.exists(path))
+
+        # A 가 커밋하면 행이 가리키는 블롭이 그대로 있다.
+        self.submit(self.items[1], [pending])
+        second = BingoSubmissionAttachment.objects.get()
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertTrue(os.path.exists(path))
+
+    def test_touch_during_release_keeps_blob(self):
+        self.login()
+        self.submit(self.items[0], [upload("a.jpg", JPEG_BYTES + b"race")])
+        attachment = BingoSubmissionAttachment.objects.get()
+        path = self.blob_path(attachment)
+        old = time.time() - 3600
+        os.utime(path, (old, old))
+        attachment.delete()
+        replace = os.replace
+
+        def touching_replace(src, dst):
+            # 지우는 쪽이 수정 시각을 본 뒤, 이름을 바꾸기 직전에 다른 업로드가 블롭을 다시 쓴다.
+            os.utime(src)
+            replace(src, dst)
+
+        with patch("members.storage.os.replace", side_effect=touching_replace):
+            self.assertEqual(release_attachment_files([attachment.file.name]), [])
+        self.assertTrue(os.path.exists(path))
+        self.assertFalse(os.path.exists(path + ".deleting"))
+
+    def test_sweep_removes_idle_orphans(self):
+        self.login()
+        self.submit(self.items[0], [upload("keep.jpg", JPEG_BYTES + b"keep"), upload("gone.jpg", JPEG_BYTES + b"gone")])
+        kept, gone = BingoSubmissionAttachment.objects.order_by("-original_name")
+        gone.delete()
+        self.assertEqual(sweep_attachment_files(), [])
+        old = time.time() - 3600
+        for attachment in (kept, gone):
+            os.utime(self.blob_path(attachment), (old, old))
+        out = StringIO()
+        call_command("sweep_attachment_blobs", stdout=out)
+        self.assertIn("1개", out.getvalue())
+        self.assertTrue(os.path.exists(self.blob_path(kept)))
+        self.assertFalse(os.path.exists(self.blob_path(gone)))
+
+
+class ThumbnailTests(BingoTestCase):
+    def test_thumbnails_are_generated_after_commit(self):
+        self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submit(self.items[0], [upload("big.png", png_bytes(), "image/png")])
+        attachment = BingoSubmissionAttachment.objects.get()
+        self.assertEqual(set(attachment.thumbnails), {"320", "960"})
+        for name in attachment.thumbnails.values():
+            self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, name)))
+
+        snapshot = get_board_snapshot(Member.TEAM_ACTIVITY)
+        state = snapshot.submissions[self.items[0].id].attachments[0]
+        self.assertEqual(state.thumb, reverse("attachment_media_variant", args=[attachment.id, "320"]))
+        self.assertEqual(state.url, reverse("attachment_media", args=[attachment.id]))
+        response = self.client.get(state.thumb)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], f'"{attachment.sha256}-320"')
+
+    @override_settings(BINGO_ATTACHMENT_RELEASE_GRACE=0)
+    def test_thumbnails_are_shared_and_released_with_blob(self):
+        self.login()
+        photo = png_bytes(color=(200, 10, 10))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submit(self.items[0], [upload("a.png", photo, "image/png")])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submit(self.items[1], [upload("b.png", photo, "image/png")])
+        first, second = BingoSubmissionAttachment.objects.order_by("id")
+        self.assertEqual(first.thumbnails, second.thumbnails)
+
+        paths = [os.path.join(MEDIA_ROOT, name) for name in first.thumbnails.values()]
+        for submission_id in (first.submission_id, second.submission_id):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse("cancel_submission", args=[submission_id]))
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+    @override_settings(BINGO_EVENT_BROKER="members.tests.RecordingBroker")
+    def test_new_thumbnails_reach_board_cells_clients(self):
+        self.login()
+        self.submit(self.items[0], [upload("late.png", png_bytes(), "image/png")])
+        attachment = BingoSubmissionAttachment.objects.get()
+        cells = self.client.get(reverse("board_cells")).json()
+        self.assertFalse(cells["a"][0][3])
+
+        events.reset_broker()
+        self.addCleanup(events.reset_broker)
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_for_attachments([attachment.id])
+        delta = self.client.get(reverse("board_cells"), {"since": cells["c"]}).json()
+        self.assertEqual([cell["s"] for cell in delta["cells"]], [attachment.submission_id])
+        self.assertEqual(delta["a"][0][3], reverse("attachment_media_variant", args=[attachment.id, "320"]))
+        self.assertEqual(
+            [(team, event["type"]) for team, event in events.get_broker().published],
+            [(Member.TEAM_ACTIVITY, events.EVENT_MEDIA)],
+        )
+
+    def test_backfill_command(self):
+        submission = self.make_submission(self.items[0], attachments=0)
+        attachment = BingoSubmissionAttachment.objects.create(
+            submission=submission, file=upload("old.png", png_bytes(), "image/png")
+        )
+        self.assertEqual(attachment.thumbnails, {})
+        call_command("backfill_thumbnails", stdout=StringIO())
+        attachment.refresh_from_db()
+        self.assertEqual(set(attachment.thumbnails), {"320", "960"})
+
+
+class AttachmentMediaTests(BingoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = bytes(range(256)) * 40
+        submission = self.make_submission(self.items[0], attachments=0)
+        self.attachment = BingoSubmissionAttachment.objects.create(
+            submission=submission,
+            file=upload("clip.mp4", MP4_BYTES + self.data, "video/mp4"),
+            original_name="clip.mp4",
+            sha256=hashlib.sha256(MP4_BYTES + self.data).hexdigest(),
+            content_type="video/mp4",
+        )
+        self.url = reverse("attachment_media", args=[self.attachment.id])
+        self.body = MP4_BYTES + self.data
+
+    def test_requires_team_member(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        outsider = Member.objects.create(
+            name="외부", student_id="20249999", phone_number="01099999999", team=Member.TEAM_FOOD
+        )
+        self.login(outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_not_under_public_media_prefix(self):
+        # 앞단 서버의 /media/ 별칭에 걸리면 권한 확인 없이 나간다.
+        self.assertFalse(self.url.startswith(settings.MEDIA_URL))
+        self.assertFalse(reverse("attachment_media_variant", args=[self.attachment.id, "poster"]).startswith(settings.MEDIA_URL))
+
+    def test_full_response_has_caching_headers(self):
+        self.login()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.body)
+        self.assertEqual(response["ETag"], f'"{self.attachment.sha256}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertIn("private", response["Cache-Control"])
+
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_byte_ranges(self):
+        self.login()
+        size = len(self.body)
+        cases = {
+            "bytes=0-99": (0, 99),
+            "bytes=100-": (100, size - 1),
+            "bytes=-10": (size - 10, size - 1),
+            f"bytes=10-{size * 2}": (10, size - 1),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+                self.assertEqual(int(response["Content-Length"]), end - start + 1)
+                self.assertEqual(b"".join(response.streaming_content), self.body[start : end + 1])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={size}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{size}")
+
+        stale = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"')
+        self.assertEqual(stale.status_code, 200)
+
+    @override_settings(BINGO_MEDIA_ACCEL="x-accel-redirect", BINGO_MEDIA_ACCEL_PREFIX="/protected-media/")
+    def test_offload_to_front_server(self):
+        self.login()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/" + self.attachment.file.name)
+        self.assertEqual(response["ETag"], f'"{self.attachment.sha256}"')
+
+        with override_settings(BINGO_MEDIA_ACCEL="x-sendfile"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], os.path.join(MEDIA_ROOT, self.attachment.file.name))
+
+
+class SqliteProfileTests(TestCase):
+    def test_tuned_profile_options(self):
+        options = sqlite_options("tuned", busy_timeout_ms=1500)
+        self.assertEqual(options["transaction_mode"], "IMMEDIATE")
+        self.assertEqual(options["timeout"], 1.5)
+        self.assertIn("PRAGMA journal_mode=WAL", options["init_command"])
+        self.assertIn("PRAGMA busy_timeout=1500", options["init_command"])
+        self.assertEqual(sqlite_options("default"), {})
+        with self.assertRaises(ValueError):
+            sqlite_options("fast")
+
+    def test_connection_uses_profile(self):
+        if settings.BINGO_SQLITE_PROFILE != "tuned":
+            self.skipTest("tuned 프로파일에서만 확인")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+    def test_tuned_profile_has_no_lock_errors_under_concurrent_writes(self):
+        result = run_lock_benchmark("tuned", workers=4, writes=20)
+        self.assertEqual(result["lock_errors"], 0)
+        self.assertEqual(result["committed"], 80)
+
+
+class DuplicateSubmissionTests(BingoTestCase):
+    def test_duplicate_submit_is_reported_and_leaves_no_blob(self):
+        self.login()
+        self.make_submission(self.items[0], attachments=0)
+        photo = JPEG_BYTES + b"late"
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.submit(self.items[0], [upload("late.jpg", photo)])
+        self.assertRedirects(response, reverse("board"), fetch_redirect_response=False)
+        self.assertEqual(BingoSubmission.objects.filter(bingo_item=self.items[0]).count(), 1)
+        self.assertFalse(BingoSubmissionAttachment.objects.exists())
+        digest = hashlib.sha256(photo).hexdigest()
+        blobs = [name for _, _, files in os.walk(MEDIA_ROOT) for name in files]
+        self.assertFalse([name for name in blobs if name.startswith(digest)])
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    FILE_UPLOAD_TEMP_DIR=os.path.join(MEDIA_ROOT, ".incoming"),
+    BINGO_THUMBNAILS_SYNC=True,
+)
+class ConcurrentSubmissionTests(TransactionTestCase):
+    WORKERS = 4
+    # 마이그레이션이 만든 기본 행사와 팀을 테스트 뒤에도 되살린다.
+    serialized_rollback = True
+
+    def setUp(self):
+        cache.clear()
+        self.members = [
+            Member.objects.create(
+                name=f"팀원{i}", student_id=f"2025{i:04d}", phone_number=f"0105678{i:04d}", team=Member.TEAM_ACTIVITY
+            )
+            for i in range(self.WORKERS + 3)
+        ]
+        self.item = BingoItem.objects.create(title="동시 제출", position=1, team=Member.TEAM_ACTIVITY)
+
+    def test_exactly_one_concurrent_submit_wins(self):
+        barrier = threading.Barrier(self.WORKERS)
+        results = [None] * self.WORKERS
+        participants = [m.id for m in self.members[-3:]]
+
+        clients = []
+        for member in self.members[: self.WORKERS]:
+            client = Client()
+            session = client.session
+            session["member_id"] = member.id
+            session.save()
+            clients.append(client)
+
+        def post(index):
+            data = {
+                "title": f"{index}번 제출",
+                "content": "동시에",
+                "participants": participants,
+                "attachments": [upload(f"{index}.jpg", JPEG_BYTES + str(index).encode())],
+            }
+            try:
+                barrier.wait(timeout=10)
+                response = clients[index].post(reverse("submit_bingo_item", args=[self.item.id]), data)
+                results[index] = [str(m) for m in get_messages(response.wsgi_request)]
+            except Exception as exc:  # 스레드 안의 예외를 테스트 스레드로 넘긴다.
+                results[index] = exc
+            finally:
+                connections.close_all()
+
+        media_root = tempfile.mkdtemp(dir=MEDIA_ROOT)
+        threads = [threading.Thread(target=post, args=(i,)) for i in range(self.WORKERS)]
+        with self.settings(MEDIA_ROOT=media_root):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        self.assertEqual(errors, [])
+        winners = [r for r in results if any("제출이 완료" in m for m in r)]
+        losers = [r for r in results if any("이미 제출된" in m for m in r)]
+        self.assertEqual((len(winners), len(losers)), (1, self.WORKERS - 1))
+
+        submission = BingoSubmission.objects.get(bingo_item=self.item)
+        attachment = submission.attachments.get()
+        self.assertEqual(submission.participants.count(), 3)
+        blobs = [name for _, _, files in os.walk(os.path.join(media_root, "bingo_attachments")) for name in files]
+        self.assertEqual(blobs, [os.path.basename(attachment.file.name)])
+
+
+class SubmissionWriteQueryTests(BingoTestCase):
+    # 요청마다 고정된 쿼리 수. 첨부·참가자 수와 무관해야 한다(테스트에서는 트랜잭션이 SAVEPOINT 로 잡힌다).
+    SUBMIT_QUERIES = 11
+    UPDATE_QUERIES = 12
+
+    def files(self, count, salt=0):
+        return [upload(f"{i}.jpg", JPEG_BYTES + bytes([salt, i])) for i in range(count)]
+
+    def test_submit_cost_does_not_grow_with_files_or_participants(self):
+        self.login()
+        self.client.get(reverse("board_cells"))
+        for item, files, participants in (
+            (self.items[0], 1, self.members[1:4]),
+            (self.items[1], 5, self.members[1:8]),
+        ):
+            with self.subTest(files=files, participants=len(participants)):
+                with self.assertNumQueries(self.SUBMIT_QUERIES):
+                    response = self.submit(item, self.files(files, salt=item.position), participants=participants)
+                self.assertRedirects(response, reverse("board"), fetch_redirect_response=False)
+        submission = BingoSubmission.objects.get(bingo_item=self.items[1])
+        self.assertEqual(submission.attachments.count(), 5)
+        self.assertEqual(submission.participants.count(), 7)
+
+    def test_update_replaces_attachments_and_participants_in_fixed_queries(self):
+        self.login()
+        self.client.get(reverse("board_cells"))
+        self.submit(self.items[0], self.files(5), participants=self.members[1:8])
+        submission = BingoSubmission.objects.get()
+        snapshot_version = get_team_version(Member.TEAM_ACTIVITY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(self.UPDATE_QUERIES):
+                response = self.client.post(
+                    reverse("update_submission", args=[submission.id]),
+                    {
+                        "title": "다시",
+                        "content": "바꿨어요",
+                        "participants": [m.id for m in self.members[2:8]],
+                        "attachments": self.files(4, salt=99),
+                    },
+                )
+        self.assertRedirects(response, reverse("board"), fetch_redirect_response=False)
+        self.assertEqual(submission.attachments.count(), 4)
+        self.assertEqual(
+            set(submission.participants.values_list("id", flat=True)), {m.id for m in self.members[2:8]}
+        )
+        self.assertGreater(get_team_version(Member.TEAM_ACTIVITY), snapshot_version)
+        self.assertEqual(
+            len(get_board_snapshot(Member.TEAM_ACTIVITY).submissions[self.items[0].id].attachments), 4
+        )
+
+
+class ReviewQueueTests(BingoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(self.admin_user)
+        self.url = reverse("admin:members_bingosubmission_review")
+
+    def test_queue_is_oldest_first_with_keyset_pages(self):
+        submissions = [self.make_submission(item, attachments=2) for item in self.items[:5]]
+        self.make_submission(self.items[5], status=BingoSubmission.STATUS_APPROVED)
+        # 같은 시각에 들어온 제출도 id 로 순서가 정해진다.
+        BingoSubmission.objects.filter(pk__in=[s.pk for s in submissions[1:3]]).update(
+            created_at=submissions[1].created_at
+        )
+        with patch.object(BingoSubmissionAdmin, "REVIEW_PAGE_SIZE", 2):
+            seen = []
+            url = self.url
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                seen += [s.id for s in response.context["submissions"]]
+                cursor = response.context["next_cursor"]
+                url = f"{self.url}?after={cursor}" if cursor else None
+        self.assertEqual(seen, [s.id for s in submissions])
+
+    def test_page_queries_do_not_grow_with_rows(self):
+        def count_queries():
+            self.client.get(self.url)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries)
+
+        self.make_submission(self.items[0], attachments=1)
+        few = count_queries()
+        for item in self.items[1:]:
+            self.make_submission(item, attachments=5)
+        self.assertEqual(count_queries(), few)
+
+    def test_ajax_approve_and_reject(self):
+        first = self.make_submission(self.items[0])
+        second = self.make_submission(self.items[1])
+
+        def decide(submission, **data):
+            return self.client.post(reverse("admin:members_bingosubmission_review_decide", args=[submission.id]), data)
+
+        response = decide(first, decision="approve")
+        self.assertEqual(response.json(), {"id": first.id, "status": "approved", "reason": ""})
+        self.assertEqual(decide(first, decision="approve").status_code, 409)
+
+        self.assertEqual(decide(second, decision="reject").status_code, 400)
+        response = decide(second, decision="reject", reason="사진이 흐려요")
+        self.assertEqual(response.status_code, 200)
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.rejected_reason), ("rejected", "사진이 흐려요"))
+        self.assertEqual(get_board_snapshot(Member.TEAM_ACTIVITY).approved_positions, frozenset({1}))
+        self.assertEqual(TeamProgress.objects.get(team=Member.TEAM_ACTIVITY).rejected_count, 1)
+
+    def test_requires_staff(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+
+class StatusTransitionTests(BingoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def test_bulk_transition_updates_once_and_audits_each_row(self):
+        submissions = [self.make_submission(item, attachments=0) for item in self.items[:3]]
+        BingoSubmission.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        received = []
+
+        def handler(sender, **kwargs):
+            received.append(kwargs)
+
+        submissions_transitioned.connect(handler)
+        self.addCleanup(submissions_transitioned.disconnect, handler)
+        queryset = BingoSubmission.objects.filter(pk__in=[s.pk for s in submissions])
+        with CaptureQueriesContext(connection) as ctx:
+            changed = transition_submissions(queryset, BingoSubmission.STATUS_APPROVED, actor=self.admin_user)
+
+        self.assertEqual(len(changed), 3)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "members_bingosubmission"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]["teams"], [Member.TEAM_ACTIVITY])
+
+        history = SubmissionStatusEvent.objects.order_by("item_position")
+        self.assertEqual(
+            [(e.submission_id, e.from_status, e.to_status, e.actor) for e in history],
+            [(s.id, "pending", "approved", self.admin_user) for s in submissions],
+        )
+        self.assertFalse(
+            BingoSubmission.objects.filter(updated_at__lt=timezone.now() - timedelta(minutes=1)).exists()
+        )
+        progress = TeamProgress.objects.get(team=Member.TEAM_ACTIVITY)
+        self.assertEqual((progress.approved_count, progress.completed_lines), (3, 1))
+
+    def test_repeated_transition_writes_no_events(self):
+        approved = self.make_submission(self.items[0], attachments=0)
+        pending = self.make_submission(self.items[1], attachments=0)
+        queryset = BingoSubmission.objects.filter(pk__in=[approved.pk, pending.pk])
+        transition_submissions(queryset.filter(pk=approved.pk), BingoSubmission.STATUS_APPROVED)
+        stamp = BingoSubmission.objects.get(pk=approved.pk).updated_at
+        self.assertEqual(SubmissionStatusEvent.objects.count(), 1)
+
+        changed = transition_submissions(queryset, BingoSubmission.STATUS_APPROVED)
+        self.assertEqual([t.submission_id for t in changed], [pending.pk])
+        self.assertEqual(SubmissionStatusEvent.objects.filter(submission=approved).count(), 1)
+        self.assertEqual(BingoSubmission.objects.get(pk=approved.pk).updated_at, stamp)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(transition_submissions(queryset, BingoSubmission.STATUS_APPROVED), [])
+        self.assertEqual(SubmissionStatusEvent.objects.count(), 2)
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith(("UPDATE", "INSERT"))])
+
+    def test_query_count_does_not_depend_on_row_count(self):
+        def cost(items):
+            ids = [self.make_submission(item, attachments=0).pk for item in items]
+            with CaptureQueriesContext(connection) as ctx:
+                transition_submissions(
+                    BingoSubmission.objects.filter(pk__in=ids), BingoSubmission.STATUS_REJECTED, "다시"
+                )
+            return len(ctx.captured_queries)
+
+        self.assertEqual(cost(self.items[:1]), cost(self.items[1:7]))
+
+    def test_admin_actions_and_change_form_are_audited(self):
+        first = self.make_submission(self.items[0])
+        second = self.make_submission(self.items[1])
+        self.client.force_login(self.admin_user)
+        self.client.post(
+            reverse("admin:members_bingosubmission_changelist"),
+            {"action": "reject_selected", "_selected_action": [first.id], "rejection_reason": "흐림"},
+        )
+        event = SubmissionStatusEvent.objects.get(submission=first)
+        self.assertEqual((event.to_status, event.reason, event.actor), ("rejected", "흐림", self.admin_user))
+
+        second.status = BingoSubmission.STATUS_APPROVED
+        request = RequestFactory().post("/")
+        request.user = self.admin_user
+        site_admin = BingoSubmissionAdmin(BingoSubmission, AdminSite())
+        site_admin.save_model(request, second, form=None, change=True)
+        event = SubmissionStatusEvent.objects.get(submission=second)
+        self.assertEqual((event.from_status, event.to_status), ("pending", "approved"))
+
+        # 제출이 취소되어도 이력은 남는다.
+        first.delete()
+        self.assertEqual(SubmissionStatusEvent.objects.filter(submission__isnull=True).count(), 1)
+
+
+class QueryPlanTests(BingoTestCase):
+    """자주 쓰는 조회가 인덱스를 타는지 EXPLAIN QUERY PLAN 으로 확인한다."""
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return [row[3] for row in cursor.fetchall()]
+
+    def assertNoFullScan(self, queryset):
+        plan = self.plan(queryset)
+        # "SCAN 테이블 USING INDEX ..." 는 인덱스 순서대로 읽는 것이라 허용하고, 맨 테이블 스캔만 막는다.
+        scans = [line for line in plan if re.fullmatch(r"SCAN members_\w+", line)]
+        self.assertEqual(scans, [], plan)
+        return plan
+
+    def test_board_and_progress_queries(self):
+        team = Member.TEAM_ACTIVITY
+        self.assertNoFullScan(
+            BingoSubmission.objects.for_team(team).select_related("bingo_item", "submitted_by")
+        )
+        self.assertNoFullScan(
+            BingoSubmission.objects.for_team(team)
+            .filter(status=BingoSubmission.STATUS_APPROVED)
+            .values_list("bingo_item__position", flat=True)
+        )
+        self.assertNoFullScan(BingoSubmission.objects.for_team(team).order_by().values_list("status"))
+        self.assertNoFullScan(BingoItem.objects.for_team(team))
+        self.assertNoFullScan(TeamProgress.objects.for_team(team))
+        plan = self.assertNoFullScan(Member.objects.for_team(team).order_by("name").values_list("id", "name"))
+        self.assertIn("member_team_name_idx", " ".join(plan))
+
+    def test_own_submission_lookup(self):
+        self.assertNoFullScan(
+            BingoSubmission.objects.filter(
+                submitted_by=self.member,
+                status__in=[BingoSubmission.STATUS_PENDING, BingoSubmission.STATUS_REJECTED],
+            )
+        )
+
+    def test_review_queue_uses_partial_index(self):
+        site_admin = BingoSubmissionAdmin(BingoSubmission, AdminSite())
+        queryset = site_admin.review_queryset(RequestFactory().get("/"))
+        plan = self.assertNoFullScan(queryset)
+        self.assertIn("submission_pending_queue_idx", " ".join(plan))
+
+        after = timezone.now()
+        plan = self.assertNoFullScan(
+            queryset.filter(Q(created_at__gt=after) | Q(created_at=after, id__gt=10))
+        )
+        self.assertIn("submission_pending_queue_idx", " ".join(plan))
+
+        self.assertNoFullScan(site_admin.review_queryset(RequestFactory().get("/", {"team": Member.TEAM_FOOD})))
+
+
+class EventTenancyTests(BingoTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_event = Event.objects.create(slug="autumn", name="가을 행사")
+        Team.objects.create(event=cls.other_event, code="autumn-a", name="가을 A조")
+        cls.other_member = Member.objects.create(
+            name="가을팀원", student_id="20259999", phone_number="01099999999", team="autumn-a"
+        )
+        cls.other_items = [
+            BingoItem.objects.create(title=f"가을 {pos}", position=pos, team="autumn-a") for pos in range(1, 10)
+        ]
+
+    def test_legacy_teams_live_in_default_event(self):
+        default = Event.objects.get(slug="default")
+        self.assertEqual(
+            list(default.teams.values_list("code", flat=True)),
+            [Member.TEAM_ACTIVITY, Member.TEAM_CULTURE, Member.TEAM_FOOD],
+        )
+        self.assertEqual(self.member.event, default)
+        self.assertEqual(self.items[0].event, default)
+        self.assertEqual(self.member.get_team_display(), "액티비티조")
+
+    def test_event_follows_team(self):
+        self.assertEqual(self.other_member.event, self.other_event)
+        member = Member.objects.get(pk=self.members[7].pk)
+        member.team = "autumn-a"
+        member.save(update_fields=["team"])
+        member.refresh_from_db()
+        self.assertEqual(member.event_id, self.other_event.pk)
+
+    def test_unknown_team_is_rejected(self):
+        member = Member(name="유령", student_id="20250000", phone_number="01000000000", team="nowhere")
+        with self.assertRaises(ValidationError):
+            member.full_clean()
+        self.assertFalse(Member.objects.for_team("nowhere").exists())
+
+    def test_scoped_queries_filter_on_event_key(self):
+        sql = str(BingoSubmission.objects.for_team("autumn-a").query)
+        self.assertIn('"event_id" = %d' % self.other_event.pk, sql)
+
+    def test_board_and_leaderboard_only_see_their_event(self):
+        self.make_submission(self.items[0], status=BingoSubmission.STATUS_APPROVED, attachments=0)
+        BingoSubmission.objects.create(
+            team="autumn-a",
+            bingo_item=self.other_items[0],
+            submitted_by=self.other_member,
+            title="가을 인증",
+            content="다녀왔어요",
+        )
+        snapshot = build_board_snapshot("autumn-a")
+        self.assertEqual([item.title for item in snapshot.items][:1], ["가을 1"])
+        self.assertEqual(len(snapshot.submissions), 1)
+        self.assertEqual([m.name for m in snapshot.team_members], ["가을팀원"])
+
+        teams = self.client.get(reverse("leaderboard"), {"event": "autumn"}).json()["teams"]
+        self.assertEqual([(t["team"], t["pending"]) for t in teams], [("autumn-a", 1)])
+        default_teams = self.client.get(reverse("leaderboard")).json()["teams"]
+        self.assertNotIn("autumn-a", [t["team"] for t in default_teams])
+        self.assertEqual(self.client.get(reverse("leaderboard"), {"event": "nope"}).status_code, 404)
+
+    def test_cannot_submit_other_events_item(self):
+        self.login()
+        response = self.submit(self.other_items[0], [upload("a.jpg", JPEG_BYTES)])
+        self.assertEqual(response.status_code, 404)
+
+    def test_admin_changelists_show_team_names(self):
+        self.make_submission(self.items[0], attachments=0)
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "pw"))
+        for name in ("member", "bingoitem", "bingosubmission"):
+            url = reverse(f"admin:members_{name}_changelist")
+            page = self.client.get(url).content.decode()
+            labels = set(re.findall(r'class="field-team_label">(?:<a [^>]*>)?([^<]*)<', page))
+            self.assertIn("액티비티조", labels)
+            self.assertNotIn(Member.TEAM_ACTIVITY, labels)
+            self.assertIn("가을 행사 · 가을 A조", page)  # 팀 필터 항목
+
+            page = self.client.get(url, {"team": "autumn-a"}).content.decode()
+            self.assertNotIn("액티비티조", re.findall(r'class="field-team_label">(?:<a [^>]*>)?([^<]*)<', page))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BINGO_THUMBNAILS_SYNC=True)
+class BenchmarkTests(TransactionTestCase):
+    serialized_rollback = True
+
+    def test_run_reports_every_operation(self):
+        cache.clear()
+        config = BenchmarkConfig(
+            teams=2, members_per_team=4, submissions_per_team=3, attachments_per_submission=1,
+            workers=2, requests=60, warmup=0, approve_batch=2,
+        )
+        report = run_benchmark(config)
+        json.dumps(report)
+        self.assertEqual(report["totals"]["requests"], 60)
+        self.assertEqual((report["totals"]["errors"], report["totals"]["lock_errors"]), (0, 0))
+        self.assertIn("board", report["views"])
+        for name, view in report["views"].items():
+            latency = view["latency_ms"]
+            self.assertLessEqual(latency["p50"], latency["p95"], name)
+            self.assertLessEqual(latency["p95"], latency["p99"], name)
+            self.assertGreater(view["queries"]["mean"], 0, name)
+
+    def test_compare_flags_regressions(self):
+        def report(p95, queries, lock_errors=0, throughput=100.0):
+            view = {
+                "latency_ms": {"p50": 10.0, "p95": p95, "p99": p95},
+                "queries": {"mean": queries},
+                "throughput": throughput,
+                "lock_errors": lock_errors,
+            }
+            totals = {"throughput": throughput, "errors": lock_errors, "lock_errors": lock_errors}
+            return {"config": {"workers": 4}, "totals": totals, "views": {"board": view}}
+
+        same = compare_reports(report(50.0, 3), report(52.0, 3))
+        self.assertEqual(same["regressions"], [])
+        self.assertEqual(same["views"]["board"]["p95"]["change_pct"], 4.0)
+        worse = compare_reports(report(50.0, 3), report(80.0, 6, lock_errors=2, throughput=50.0))
+        self.assertEqual(
+            worse["regressions"],
+            ["board.p95", "board.p99", "board.queries", "board.lock_errors", "totals.throughput", "totals.lock_errors"],
+        )
+
+    def test_helpers(self):
+        self.assertEqual(parse_mix("board=5, submit=1"), {"board": 5, "submit": 1})
+        self.assertEqual([percentile(range(1, 101), p) for p in (50, 95, 99)], [50, 95, 99])
+        with self.assertRaises(ValueError):
+            BenchmarkConfig(mix={"dance": 1})
+
+
+class InstrumentationTests(BingoTestCase):
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+
+    def test_board_request_records_phases_and_queries(self):
+        self.make_submission(self.items[0])
+        self.login()
+        with self.settings(BINGO_SERVER_TIMING=True):
+            response = self.client.get(reverse("board"))
+        self.assertEqual(REQUESTS.value("board", "GET", "200"), 1)
+        self.assertEqual(DB_QUERIES.count("board"), 1)
+        for name in ("snapshot", "serialize", "render"):
+            self.assertEqual(PHASE_SECONDS.count("board", name), 1, name)
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertContains(response, 'id="submission-data"')
+
+    def test_upload_bytes_and_storage_phase(self):
+        self.login()
+        self.submit(self.items[0], [upload("a.jpg", JPEG_BYTES)])
+        self.assertEqual(REQUEST_BYTES.count("submit_bingo_item"), 1)
+        self.assertEqual(PHASE_SECONDS.count("submit_bingo_item", "upload"), 1)
+        self.assertEqual(PHASE_SECONDS.count("submit_bingo_item", "storage"), 1)
+
+    def test_repeated_statements_are_counted(self):
+        with measure() as metrics:
+            Member.objects.get(pk=self.members[0].pk)
+            Member.objects.get(pk=self.members[1].pk)
+            Member.objects.count()
+        self.assertEqual((metrics.queries, metrics.duplicate_queries), (3, 1))
+        self.assertIn("members_member", metrics.top_duplicate()[0])
+        self.assertGreater(metrics.db_seconds, 0)
+
+    def test_slow_requests_are_logged(self):
+        with self.settings(BINGO_SLOW_REQUEST_MS=0), self.assertLogs("members.metrics.slow", "WARNING") as logs:
+            self.client.get(reverse("leaderboard"))
+        self.assertIn("leaderboard", logs.output[0])
+        self.assertEqual(SLOW_REQUESTS.value("leaderboard"), 1)
+
+    def test_prometheus_endpoint_requires_token_or_staff(self):
+        self.client.get(reverse("leaderboard"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        with self.settings(BINGO_METRICS_TOKEN="s3cret"):
+            self.assertEqual(
+                self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code, 403
+            )
+            response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE bingo_request_duration_seconds histogram", body)
+        self.assertIn('bingo_requests_total{view="leaderboard",method="GET",status="200"} 1', body)
+        self.assertIn('bingo_request_duration_seconds_bucket{view="leaderboard",le="+Inf"} 1', body)
+
+    def test_can_be_disabled(self):
+        with self.settings(BINGO_METRICS_ENABLED=False):
+            self.client.get(reverse("leaderboard"))
+        self.assertEqual(REQUESTS.value("leaderboard", "GET", "200"), 0)
+
+
+class ProfilingTests(BingoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+        override = self.settings(BINGO_PROFILE_DIR=self.profile_dir, BINGO_PROFILE_SAMPLE_RATE=0.0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.token = make_profile_token(self.admin_user)
+
+    def test_requests_are_not_profiled_without_token(self):
+        response = self.client.get(reverse("leaderboard"), {"_profile": "forged:token"})
+        self.assertFalse(response.has_header("X-Bingo-Profile"))
+        self.assertEqual(list_profiles(), [])
+
+    def test_signed_token_writes_collapsed_stacks(self):
+        with self.settings(BINGO_PROFILE_INTERVAL=0.001):
+            response = self.client.get(reverse("leaderboard"), {"_profile": self.token})
+        name = response["X-Bingo-Profile"]
+        (profile,) = list_profiles()
+        self.assertEqual((profile.name, profile.view, profile.method, profile.status), (name, "leaderboard", "GET", 200))
+        self.assertEqual((profile.trigger, profile.kind), ("token", "sampling"))
+        with open(os.path.join(self.profile_dir, name), encoding="utf-8") as fp:
+            for line in fp:
+                self.assertRegex(line, r"^\S.* \d+$")
+
+    def test_header_token_with_cprofile(self):
+        import pstats
+
+        with self.settings(BINGO_PROFILER="cprofile"):
+            response = self.client.get(reverse("leaderboard"), HTTP_X_BINGO_PROFILE=self.token)
+        name = response["X-Bingo-Profile"]
+        self.assertTrue(name.endswith(".prof"))
+        stats = pstats.Stats(os.path.join(self.profile_dir, name))
+        self.assertTrue(any(func[2] == "leaderboard_view" for func in stats.stats))
+
+    async def test_sync_views_are_profiled_under_asgi(self):
+        response = await self.async_client.get(reverse("leaderboard"), {"_profile": self.token})
+        self.assertEqual(response.status_code, 200)
+        (profile,) = await asyncio.to_thread(list_profiles)
+        self.assertEqual((profile.name, profile.view), (response["X-Bingo-Profile"], "leaderboard"))
+
+    @override_settings(BINGO_EVENTS_ENABLED=True)
+    async def test_async_views_are_skipped(self):
+        response = await self.async_client.get(reverse("board_events"), {"_profile": self.token})
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.has_header("X-Bingo-Profile"))
+        self.assertEqual(await asyncio.to_thread(list_profiles), [])
+
+    def test_expired_token_is_ignored(self):
+        with self.settings(BINGO_PROFILE_TOKEN_MAX_AGE=-1):
+            response = self.client.get(reverse("leaderboard"), {"_profile": self.token})
+        self.assertFalse(response.has_header("X-Bingo-Profile"))
+
+    def test_random_sampling_and_rotation(self):
+        with self.settings(BINGO_PROFILE_SAMPLE_RATE=1.0, BINGO_PROFILE_MAX_FILES=2):
+            for _ in range(4):
+                response = self.client.get(reverse("leaderboard"))
+                self.assertFalse(response.has_header("X-Bingo-Profile"))
+        profiles = list_profiles()
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual({profile.trigger for profile in profiles}, {"sample"})
+        self.assertEqual(len(os.listdir(self.profile_dir)), 2)
+
+    def test_admin_lists_and_serves_profiles(self):
+        name = self.client.get(reverse("leaderboard"), {"_profile": self.token})["X-Bingo-Profile"]
+        self.assertEqual(self.client.get(reverse("admin_profiles")).status_code, 302)
+
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse("admin_profiles"))
+        self.assertContains(response, reverse("admin_profile_download", args=[name]))
+        response = self.client.post(reverse("admin_profiles"))
+        self.assertContains(response, "X-Bingo-Profile: ")
+
+        self.assertContains(self.client.get(reverse("admin_profile_detail", args=[name])), "표본")
+        response = self.client.get(reverse("admin_profile_download", args=[name]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(name, response["Content-Disposition"])
+        with open(os.path.join(self.profile_dir, name), "rb") as fp:
+            self.assertEqual(b"".join(response.streaming_content), fp.read())
+        for bad in ("..%2Fsecret", "settings.py", name.replace("_token", "_sample")):
+            self.assertEqual(self.client.get(f"/admin/profiles/{bad}/download/").status_code, 404, bad)
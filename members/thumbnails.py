@@ -0,0 +1,206 @@
+"""
+첨부 파일 썸네일/포스터 프레임 생성.
+
+업로드가 커밋된 뒤 로컬 스레드 풀에서 이미지 첨부는 고정 너비의 WebP(불가하면 JPEG)
+썸네일로, 동영상 첨부는 ffmpeg 가 있으면 첫 부분의 포스터 프레임으로 만든다.
+파생 파일 이름은 원본 블롭 이름에서 정해지므로 같은 블롭은 한 번만 만든다.
+"""
+import logging
+import os
+import posixpath
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import events
+from .board import bump_team_version
+from .models import BingoSubmission, BingoSubmissionAttachment
+from .storage import default_attachment_storage
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow 가 없으면 썸네일 없이 원본만 사용한다.
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THUMBNAIL_WIDTHS = (320, 960)
+THUMBNAIL_DIR = "bingo_thumbnails"
+POSTER_KEY = "poster"
+
+
+def thumbnail_widths() -> tuple[int, ...]:
+    return tuple(getattr(settings, "BINGO_THUMBNAIL_WIDTHS", DEFAULT_THUMBNAIL_WIDTHS))
+
+
+def _thumbnail_format() -> tuple[str, str]:
+    if Image is not None and features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+def derived_name(blob_name: str, key) -> str:
+    stem = os.path.splitext(blob_name)[0]
+    if key == POSTER_KEY:
+        return posixpath.join(THUMBNAIL_DIR, f"{stem}-poster.jpg")
+    return posixpath.join(THUMBNAIL_DIR, f"{stem}-{key}{_thumbnail_format()[1]}")
+
+
+def derived_names(blob_name: str) -> list[str]:
+    return [derived_name(blob_name, width) for width in thumbnail_widths()] + [derived_name(blob_name, POSTER_KEY)]
+
+
+def _save(name: str, data: bytes) -> str:
+    # 파생 파일은 원본 블롭 이름으로 위치가 정해지므로 내용 주소 저장소가 아닌 기본 저장소에 둔다.
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(data))
+
+
+def delete_derived_files(blob_names) -> None:
+    for blob_name in blob_names:
+        for name in derived_names(blob_name):
+            if default_storage.exists(name):
+                default_storage.delete(name)
+
+
+def _resize_image(image, blob_name: str) -> dict[str, str]:
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    fmt, _ = _thumbnail_format()
+    if fmt == "JPEG" and image.mode == "RGBA":
+        image = image.convert("RGB")
+    result = {}
+    for width in thumbnail_widths():
+        copy = image.copy()
+        copy.thumbnail((width, width * 4))
+        buffer = BytesIO()
+        copy.save(buffer, fmt, quality=80)
+        result[str(width)] = _save(derived_name(blob_name, width), buffer.getvalue())
+    return result
+
+
+def _image_thumbnails(blob_name: str) -> dict[str, str]:
+    with default_attachment_storage.open(blob_name, "rb") as fh:
+        with Image.open(fh) as image:
+            return _resize_image(image, blob_name)
+
+
+def _video_poster(blob_name: str) -> dict[str, str]:
+    ffmpeg = shutil.which(getattr(settings, "BINGO_FFMPEG_BINARY", "ffmpeg"))
+    if not ffmpeg:
+        return {}
+    width = max(thumbnail_widths())
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "poster.jpg")
+        subprocess.run(
+            [
+                ffmpeg, "-v", "error", "-y", "-ss", "1", "-i", default_attachment_storage.path(blob_name),
+                "-frames:v", "1", "-vf", f"scale='min({width},iw)':-2", out,
+            ],
+            check=True,
+            timeout=60,
+        )
+        if not os.path.exists(out):
+            return {}
+        with open(out, "rb") as fh:
+            data = fh.read()
+    result = {POSTER_KEY: _save(derived_name(blob_name, POSTER_KEY), data)}
+    if Image is not None:
+        with Image.open(BytesIO(data)) as image:
+            result.update(_resize_image(image, blob_name))
+    return result
+
+
+def generate_for_attachments(attachment_ids) -> int:
+    """첨부들의 파생 파일을 만들고 같은 블롭을 쓰는 모든 첨부에 기록한다. 처리한 블롭 수를 돌려준다."""
+    if Image is None:
+        return 0
+    blobs = {}
+    for attachment in BingoSubmissionAttachment.objects.filter(pk__in=list(attachment_ids)):
+        blobs.setdefault(attachment.file.name, attachment)
+    done = 0
+    for blob_name, attachment in blobs.items():
+        kind = attachment.kind
+        same_blob = BingoSubmissionAttachment.objects.filter(file=blob_name)
+        # 같은 블롭의 파생 파일이 이미 있으면 다시 만들지 않고 그대로 쓴다.
+        existing = same_blob.exclude(thumbnails={}).values_list("thumbnails", flat=True).first()
+        try:
+            if existing:
+                thumbnails = existing
+            elif kind == "image":
+                thumbnails = _image_thumbnails(blob_name)
+            elif kind == "video":
+                thumbnails = _video_poster(blob_name)
+            else:
+                continue
+        except Exception as exc:
+            # 손상되었거나 Pillow/ffmpeg 가 읽지 못하는 형식은 원본만 보여준다.
+            logger.warning("썸네일 생성 실패: %s (%s)", blob_name, exc)
+            continue
+        if not thumbnails:
+            continue
+        owners = set(same_blob.values_list("submission_id", "submission__team", "submission__bingo_item_id"))
+        same_blob.update(thumbnails=thumbnails)
+        # board_cells 는 updated_at 커서 이후의 칸만 보내므로 제출도 건드려야 새 썸네일이 내려간다.
+        BingoSubmission.objects.filter(pk__in={o[0] for o in owners}).update(updated_at=timezone.now())
+        bump_team_version(*{o[1] for o in owners})
+        for submission_id, team, item_id in owners:
+            events.publish_on_commit(team, events.submission_event(events.EVENT_MEDIA, submission_id, item_id))
+        done += 1
+    return done
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "BINGO_THUMBNAIL_WORKERS", 2),
+                thread_name_prefix="bingo-thumbnails",
+            )
+        return _executor
+
+
+def _run_in_background(attachment_ids) -> None:
+    try:
+        generate_for_attachments(attachment_ids)
+    except Exception:
+        logger.exception("썸네일 작업 실패: %s", attachment_ids)
+    finally:
+        # 작업 스레드가 잡고 있는 DB 연결을 돌려준다.
+        connections.close_all()
+
+
+def schedule_thumbnails(attachment_ids) -> None:
+    """커밋 후 썸네일 생성을 예약한다. BINGO_THUMBNAILS_SYNC 이면 같은 스레드에서 바로 만든다."""
+    attachment_ids = list(attachment_ids)
+    if not attachment_ids or Image is None:
+        return
+    if getattr(settings, "BINGO_THUMBNAILS_SYNC", False):
+        transaction.on_commit(lambda: generate_for_attachments(attachment_ids))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_background, attachment_ids))
+
+
+def drain_thumbnails() -> None:
+    """예약된 썸네일 작업이 모두 끝날 때까지 기다린다. 벤치마크처럼 DB 를 곧 지울 때 쓴다."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
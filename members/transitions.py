@@ -0,0 +1,79 @@
+"""
+제출 상태 일괄 전이.
+
+행들을 UPDATE 한 번으로 바꾸고(updated_at 포함) 행마다 SubmissionStatusEvent 이력을
+bulk_create 로 남긴 뒤, submissions_transitioned 시그널을 한 번만 보낸다. 진행 상황,
+팀 보드 캐시, 실시간 알림은 signals.py 의 수신자가 팀 단위로 처리한다.
+"""
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import BingoSubmission, SubmissionStatusEvent
+
+# sender=BingoSubmission, transitions=[Transition], teams=[팀], status, reason, actor
+submissions_transitioned = Signal()
+
+
+@dataclass(frozen=True)
+class Transition:
+    submission_id: int
+    team: str
+    item_id: int
+    item_position: int
+    from_status: str
+
+
+def transition_submissions(queryset, status: str, reason: str = "", actor=None) -> list[Transition]:
+    """queryset 의 제출을 status 로 바꾸고 바뀐 행 목록을 돌려준다."""
+    if status != BingoSubmission.STATUS_REJECTED:
+        reason = ""
+    with transaction.atomic():
+        # 이미 같은 상태인 행은 UPDATE 도, 이력도, 시그널 대상도 아니다.
+        queryset = queryset.exclude(status=status)
+        transitions = [
+            Transition(*row)
+            for row in queryset.values_list("id", "team", "bingo_item_id", "bingo_item__position", "status")
+        ]
+        if not transitions:
+            return []
+        # 이력과 같은 행만 바꾼다.
+        BingoSubmission.objects.filter(pk__in=[t.submission_id for t in transitions]).exclude(status=status).update(
+            status=status, rejected_reason=reason, updated_at=timezone.now()
+        )
+        SubmissionStatusEvent.objects.bulk_create(
+            SubmissionStatusEvent(
+                submission_id=t.submission_id,
+                team=t.team,
+                item_position=t.item_position,
+                from_status=t.from_status,
+                to_status=status,
+                reason=reason,
+                actor=actor,
+            )
+            for t in transitions
+        )
+        submissions_transitioned.send(
+            sender=BingoSubmission,
+            transitions=transitions,
+            teams=sorted({t.team for t in transitions}),
+            status=status,
+            reason=reason,
+            actor=actor,
+        )
+    return transitions
+
+
+def record_status_event(submission, from_status: str, actor=None) -> SubmissionStatusEvent:
+    """admin 변경 화면처럼 한 건씩 저장하는 경로의 이력."""
+    return SubmissionStatusEvent.objects.create(
+        submission=submission,
+        team=submission.team,
+        item_position=submission.bingo_item.position,
+        from_status=from_status,
+        to_status=submission.status,
+        reason=submission.rejected_reason if submission.status == BingoSubmission.STATUS_REJECTED else "",
+        actor=actor,
+    )
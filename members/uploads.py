@@ -0,0 +1,215 @@
+"""
+첨부 파일 업로드 처리.
+
+StreamingAttachmentUploadHandler 는 업로드 청크를 받는 즉시 임시 파일에 쓰면서
+SHA-256 과 바이트 수를 계산하고, 파일당/요청당 크기 제한을 넘으면 그 파일을 바로
+건너뛴다. 첫 청크의 매직 바이트로 실제 MIME 타입도 추정한다.
+FILE_UPLOAD_TEMP_DIR 을 MEDIA_ROOT 와 같은 파일시스템에 두면 저장 단계에서 복사 없이
+이름만 바뀐다.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from django.template.defaultfilters import filesizeformat
+
+from .board import bump_team_version
+from .metrics import phase
+from .models import BingoSubmissionAttachment
+from .storage import content_sha256, default_attachment_storage
+
+DEFAULT_MAX_ATTACHMENT_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_SUBMISSION_BYTES = 500 * 1024 * 1024
+
+_SNIFF_BYTES = 32
+_HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1", b"avif"}
+
+
+def sniff_content_type(head: bytes) -> str:
+    """파일 앞부분으로 MIME 타입을 추정한다. 알 수 없으면 빈 문자열."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"BM"):
+        return "image/bmp"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "video/x-msvideo"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in _HEIF_BRANDS:
+            return "image/avif" if brand == b"avif" else "image/heic"
+        if brand == b"qt  ":
+            return "video/quicktime"
+        return "video/mp4"
+    # 미디어가 아닌 흔한 형식은 브라우저가 보낸 타입을 믿지 않도록 명시적으로 판정한다.
+    if head.startswith(b"%PDF"):
+        return "application/pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip"
+    if head.startswith(b"MZ"):
+        return "application/x-msdownload"
+    return ""
+
+
+class ChecksummedUploadedFile(TemporaryUploadedFile):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sha256 = ""
+        self.detected_type = ""
+
+
+class StreamingAttachmentUploadHandler(FileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_file_bytes = getattr(settings, "BINGO_MAX_ATTACHMENT_BYTES", DEFAULT_MAX_ATTACHMENT_BYTES)
+        self.max_total_bytes = getattr(settings, "BINGO_MAX_SUBMISSION_BYTES", DEFAULT_MAX_SUBMISSION_BYTES)
+        self.total_bytes = 0
+        if request is not None:
+            request.upload_errors = []
+
+    def _reject(self, message: str):
+        if self.request is not None:
+            self.request.upload_errors.append(message)
+        raise SkipFile()
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        temp_dir = getattr(settings, "FILE_UPLOAD_TEMP_DIR", None)
+        if temp_dir:
+            os.makedirs(temp_dir, exist_ok=True)
+        # SkipFile 이 나면 파서가 self.file 을 닫으므로, 거절하기 전에 이번 파일을 먼저 만든다.
+        self.file = ChecksummedUploadedFile(file_name, content_type, 0, charset, content_type_extra)
+        self.hasher = hashlib.sha256()
+        self.file_bytes = 0
+        self.head = b""
+        if content_length is not None and content_length > self.max_file_bytes:
+            self._reject(self._file_too_large())
+        raise StopFutureHandlers()
+
+    def _file_too_large(self) -> str:
+        return f"{self.file_name}: 파일 하나는 최대 {filesizeformat(self.max_file_bytes)}까지 올릴 수 있습니다."
+
+    def receive_data_chunk(self, raw_data, start):
+        self.file_bytes += len(raw_data)
+        self.total_bytes += len(raw_data)
+        if self.file_bytes > self.max_file_bytes:
+            self._reject(self._file_too_large())
+        if self.total_bytes > self.max_total_bytes:
+            self._reject(
+                f"{self.file_name}: 한 번에 올릴 수 있는 첨부 파일은 모두 합쳐 "
+                f"{filesizeformat(self.max_total_bytes)}까지입니다."
+            )
+        if len(self.head) < _SNIFF_BYTES:
+            self.head += raw_data[: _SNIFF_BYTES - len(self.head)]
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hasher.hexdigest()
+        self.file.detected_type = sniff_content_type(self.head)
+        return self.file
+
+    def upload_interrupted(self):
+        file = getattr(self, "file", None)
+        if file is not None:
+            file.close()
+
+
+def upload_content_type(upload) -> str:
+    """업로드 핸들러가 추정한 타입을 우선하고, 없으면 브라우저가 보낸 타입을 쓴다."""
+    return getattr(upload, "detected_type", "") or getattr(upload, "content_type", "") or ""
+
+
+def upload_sha256(upload) -> str:
+    checksum = content_sha256(upload)
+    upload.sha256 = checksum
+    return checksum
+
+
+def attachment_from_upload(submission, upload) -> BingoSubmissionAttachment:
+    # store_uploads 로 미리 저장한 업로드는 이름만 넣어 FileField.pre_save 가 다시 쓰지 않게 한다.
+    return BingoSubmissionAttachment(
+        submission=submission,
+        file=getattr(upload, "blob_name", "") or upload,
+        original_name=os.path.basename(upload.name or "")[:255],
+        size=upload.size or 0,
+        sha256=upload_sha256(upload),
+        content_type=upload_content_type(upload),
+    )
+
+
+def upload_blob_name(upload) -> str:
+    """업로드가 내용 주소 저장소에 저장될 이름. 저장 전에도 알 수 있다."""
+    saved = getattr(upload, "blob_name", "")
+    if saved:
+        return saved
+    field = BingoSubmissionAttachment._meta.get_field("file")
+    return default_attachment_storage.content_name(field.generate_filename(None, upload.name), upload)
+
+
+def store_uploads(uploads) -> None:
+    """
+    업로드를 내용 주소 저장소에 먼저 저장하고 이름을 upload.blob_name 에 적어 둔다.
+    트랜잭션(tuned 프로파일에서는 BEGIN IMMEDIATE) 밖에서 불러, 큰 파일을 쓰거나 복사하는 동안
+    SQLite 쓰기 잠금을 붙잡지 않게 한다. 이름은 업로드 핸들러가 계산한 SHA-256 으로 정해진다.
+    새로 쓴 블롭이면 upload.blob_written_ns 에 수정 시각을 남겨 실패 시 바로 지울 수 있게 한다.
+    """
+    field = BingoSubmissionAttachment._meta.get_field("file")
+    with phase("storage"):
+        for upload in uploads:
+            if not getattr(upload, "blob_name", ""):
+                name = field.generate_filename(None, upload.name)
+                upload.blob_name, upload.blob_written_ns = default_attachment_storage.store(
+                    name, upload, max_length=field.max_length
+                )
+
+
+def add_attachments(submission, uploads) -> list[BingoSubmissionAttachment]:
+    """
+    첨부 행을 INSERT 한 번으로 만든다. 블롭은 store_uploads 로 미리 저장해 두는 것이 좋다
+    (그렇지 않으면 FileField.pre_save 가 트랜잭션 안에서 쓴다). bulk_create 는 post_save 를
+    보내지 않으므로 팀 보드 버전은 커밋 후 여기서 올린다.
+    """
+    attachments = [attachment_from_upload(submission, upload) for upload in uploads]
+    if attachments:
+        BingoSubmissionAttachment.objects.bulk_create(attachments)
+        team = submission.team
+        transaction.on_commit(lambda: bump_team_version(team))
+    return attachments
+
+
+def replace_attachments(submission, uploads, existing=None) -> tuple[list[BingoSubmissionAttachment], list[str]]:
+    """
+    제출의 첨부를 uploads 로 바꾼다. 이미 같은 내용(SHA-256)으로 올라가 있는 첨부는
+    그대로 두어 다시 쓰지 않는다. (새로 만든 첨부, 더 이상 쓰지 않는 파일 이름) 을 돌려준다.
+    existing 으로 이미 읽어 둔 첨부 목록을 넘기면 다시 조회하지 않는다.
+    """
+    existing = list(submission.attachments.all()) if existing is None else existing
+    remaining = list(uploads)
+    stale = []
+    for attachment in existing:
+        match = next(
+            (u for u in remaining if attachment.sha256 and upload_sha256(u) == attachment.sha256),
+            None,
+        )
+        if match is None:
+            stale.append(attachment)
+        else:
+            remaining.remove(match)
+    if stale:
+        # 관계 매니저로 지우면 삭제 시그널이 받는 행에 submission 이 채워져 있어 행마다 조회하지 않는다.
+        submission.attachments.filter(pk__in=[a.pk for a in stale]).delete()
+    created = add_attachments(submission, remaining)
+    return created, [a.file.name for a in stale]
@@ -5,8 +5,20 @@ from . import views
 urlpatterns = [
     path("", views.login_view, name="login"),
     path("board/", views.board_view, name="board"),
+    path("board/cells/", views.board_cells, name="board_cells"),
+    path("board/events/", views.board_events, name="board_events"),
     path("board/submit/<int:item_id>/", views.submit_bingo_item, name="submit_bingo_item"),
+    path("board/submission/<int:submission_id>/", views.submission_detail, name="submission_detail"),
     path("board/submission/<int:submission_id>/update/", views.update_submission, name="update_submission"),
     path("board/submission/<int:submission_id>/cancel/", views.cancel_submission, name="cancel_submission"),
+    # MEDIA_URL(/media/) 과 겹치지 않게 두어 앞단 서버의 /media/ 별칭이 권한 확인을 건너뛰지 못하게 한다.
+    path("attachments/<int:attachment_id>/", views.attachment_media, name="attachment_media"),
+    path(
+        "attachments/<int:attachment_id>/<slug:variant>/",
+        views.attachment_media,
+        name="attachment_media_variant",
+    ),
+    path("leaderboard/", views.leaderboard_view, name="leaderboard"),
+    path("metrics/", views.metrics_view, name="metrics"),
     path("logout/", views.logout_view, name="logout"),
 ]
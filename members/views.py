@@ -1,27 +1,71 @@
+import asyncio
+import json
+
+from django.conf import settings
 from django.contrib import messages
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.html import json_script
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 
+from .board import (
+    board_cache_timeout,
+    build_board_snapshot,
+    get_board_snapshot,
+    get_roster_version,
+    get_submission_detail,
+)
+from .events import get_broker
 from .forms import BingoSubmissionForm, LoginForm
+from .leaderboard import build_leaderboard, leaderboard_etag, leaderboard_event_slug, leaderboard_last_modified
+from .login import LOGIN_MISMATCH, LOGIN_THROTTLED, LOGIN_UNKNOWN, check_login
+from .media import serve_file
+from .metrics import phase, registry
+from .middleware import aget_member, get_member, login_member
 from .models import BingoItem, BingoSubmission, BingoSubmissionAttachment, Member
+from .storage import default_attachment_storage, release_attachment_files_on_commit
+from .submissions import create_submission, edit_submission
 
 
-def _get_member_from_session(request):
-    member_id = request.session.get("member_id")
-    if not member_id:
-        return None
-    try:
-        return Member.objects.get(pk=member_id)
-    except Member.DoesNotExist:
-        request.session.pop("member_id", None)
-        return None
+def _upload_errors(request) -> list[str]:
+    # request.FILES 를 읽어야 업로드 핸들러가 실행되고 오류가 기록된다.
+    with phase("upload"):
+        request.FILES
+    return getattr(request, "upload_errors", [])
+
+
+def _render_board(request, member, snapshot, **extra_context):
+    # 템플릿 필터 대신 여기서 직렬화해 렌더 시간과 따로 잰다.
+    with phase("serialize"):
+        submission_summary_script = json_script(snapshot.submission_summaries(), "submission-data")
+    context = {
+        "member": member,
+        "board_data": snapshot.board_data,
+        "team_members": snapshot.team_members,
+        "board_size": snapshot.board_size,
+        "board_cursor": snapshot.cursor,
+        "board_version": snapshot.version,
+        "roster_version": get_roster_version(member.team),
+        "fragment_cache": getattr(settings, "BINGO_BOARD_CACHE_ALIAS", "default"),
+        "fragment_timeout": board_cache_timeout(),
+        "submission_summary_script": submission_summary_script,
+        "board_events_enabled": getattr(settings, "BINGO_EVENTS_ENABLED", False),
+        "board_poll_seconds": getattr(settings, "BINGO_BOARD_POLL_SECONDS", 15),
+    }
+    context.update(extra_context)
+    with phase("render"):
+        return render(request, "members/board.html", context)
 
 
 @require_http_methods(["GET", "POST"])
 def login_view(request):
-    if _get_member_from_session(request):
+    if get_member(request):
         return redirect("board")
 
     form = LoginForm(request.POST or None)
@@ -29,68 +73,34 @@ def login_view(request):
         student_id = form.cleaned_data["student_id"]
         phone_last4 = form.cleaned_data["phone_last4"]
 
-        try:
-            member = Member.objects.get(student_id=student_id)
-        except Member.DoesNotExist:
+        result, member_id = check_login(request, student_id, phone_last4)
+        if result == LOGIN_THROTTLED:
+            form.add_error(None, "로그인 시도가 너무 많아요. 잠시 후 다시 시도해주세요.")
+            return render(request, "members/login.html", {"form": form, "member": None}, status=429)
+        if result == LOGIN_UNKNOWN:
             form.add_error(None, "회원 정보가 없어요. 관리자에게 문의해주세요.")
+        elif result == LOGIN_MISMATCH:
+            form.add_error("phone_last4", "전화번호 뒷자리가 일치하지 않아요.")
         else:
-            if member.phone_last4 != phone_last4:
-                form.add_error("phone_last4", "전화번호 뒷자리가 일치하지 않아요.")
-            else:
-                request.session["member_id"] = member.id
-                messages.success(request, f"{member.name}님, 환영합니다!")
-                return redirect("board")
+            member = Member.objects.get(pk=member_id)
+            login_member(request, member)
+            messages.success(request, f"{member.name}님, 환영합니다!")
+            return redirect("board")
 
     return render(request, "members/login.html", {"form": form, "member": None})
 
 
 def board_view(request):
-    member = _get_member_from_session(request)
+    member = get_member(request)
     if not member:
         return redirect("login")
 
-    bingo_items = list(BingoItem.objects.filter(team=member.team).order_by("position"))
-    submissions = list(
-        BingoSubmission.objects.filter(team=member.team)
-        .select_related("bingo_item", "submitted_by")
-        .prefetch_related("participants", "attachments")
-    )
-    submissions_map = {s.bingo_item_id: s for s in submissions}
-    team_members = Member.objects.filter(team=member.team).order_by("name")
-    approved_count = sum(1 for s in submissions_map.values() if s.status == BingoSubmission.STATUS_APPROVED)
-    approved_positions = {s.bingo_item.position for s in submissions if s.status == BingoSubmission.STATUS_APPROVED}
-    winning_lines = [
-        {1, 2, 3}, {4, 5, 6}, {7, 8, 9},  # 가로
-        {1, 4, 7}, {2, 5, 8}, {3, 6, 9},  # 세로
-        {1, 5, 9}, {3, 5, 7},  # 대각선
-    ]
-    bingo_line_completed = any(line.issubset(approved_positions) for line in winning_lines)
-    completed = bingo_line_completed
-    board_data = [(item, submissions_map.get(item.id)) for item in bingo_items]
-
-    submission_details = {}
-    for s in submissions:
-        attachments = [
-            {"url": a.file.url, "name": a.filename, "kind": a.kind} for a in s.attachments.all()
-        ]
-        submission_details[s.bingo_item_id] = {
-            "id": s.id,
-            "title": s.title,
-            "content": s.content,
-            "status": s.status,
-            "rejected_reason": s.rejected_reason,
-            "participants": [p.name for p in s.participants.all()],
-            "participant_ids": [p.id for p in s.participants.all()],
-            "attachments": attachments,
-            "submitted_by": s.submitted_by.name,
-            "submitted_by_id": s.submitted_by_id,
-            "item_title": s.bingo_item.title,
-            "item_desc": s.bingo_item.description or "",
-            "item_position": s.bingo_item.position,
-        }
+    with phase("snapshot"):
+        snapshot = get_board_snapshot(member.team)
+    bingo_line_completed = snapshot.bingo_line_completed
 
     # 팀 반려 알림(1회성)
-    rejected_submissions = [s for s in submissions if s.status == BingoSubmission.STATUS_REJECTED]
+    rejected_submissions = snapshot.rejected_submissions
     notified_ids = set(request.session.get("notified_rejections", []))
     new_rejections = [s for s in rejected_submissions if s.id not in notified_ids]
     if new_rejections:
@@ -98,24 +108,138 @@ def board_view(request):
             reason = s.rejected_reason or "사유 없음"
             messages.warning(
                 request,
-                f"{s.bingo_item.position}번 빙고가 반려되었습니다. 사유: {reason}",
+                f"{s.item_position}번 빙고가 반려되었습니다. 사유: {reason}",
             )
         request.session["notified_rejections"] = list(
             notified_ids.union({s.id for s in rejected_submissions})
         )
 
-    return render(
+    return _render_board(
         request,
-        "members/board.html",
-        {
-            "member": member,
-            "board_data": board_data,
-            "team_members": team_members,
-            "completed": completed,
-            "bingo_line_completed": bingo_line_completed,
-            "submission_details": submission_details,
-        },
+        member,
+        snapshot,
+        completed=bingo_line_completed,
+        bingo_line_completed=bingo_line_completed,
+    )
+
+
+@require_http_methods(["GET", "HEAD"])
+@cache_control(no_cache=True)
+@condition(etag_func=leaderboard_etag, last_modified_func=leaderboard_last_modified)
+def leaderboard_view(request):
+    # 조건부 요청은 condition 데코레이터가 캐시만 보고 304 로 응답한다.
+    teams = build_leaderboard(leaderboard_event_slug(request))
+    if teams is None:
+        raise Http404("행사가 없습니다.")
+    return JsonResponse({"teams": teams})
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """
+    Prometheus 텍스트 형식의 지표. 스태프이거나 BINGO_METRICS_TOKEN 과 같은 Bearer 토큰을 보내야 한다.
+    """
+    token = getattr(settings, "BINGO_METRICS_TOKEN", "")
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    allowed = (request.user.is_authenticated and request.user.is_staff) or (
+        token and constant_time_compare(authorization, f"Bearer {token}")
     )
+    if not allowed:
+        return HttpResponse(status=403)
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@require_http_methods(["GET"])
+def board_cells(request):
+    """since 커서 이후 바뀐 칸만 JSON 으로 돌려준다. 보드 페이지의 부분 갱신용."""
+    member = get_member(request)
+    if not member:
+        return JsonResponse({"error": "login required"}, status=401)
+    try:
+        cursor = int(request.GET.get("since") or 0)
+    except ValueError:
+        return JsonResponse({"error": "invalid cursor"}, status=400)
+    return JsonResponse(get_board_snapshot(member.team).cells_since(cursor))
+
+
+@require_http_methods(["GET"])
+def submission_detail(request, submission_id: int):
+    """모달을 열 때 한 제출의 본문, 참가자, 첨부를 JSON 으로 돌려준다. 같은 팀 제출만 볼 수 있다."""
+    member = get_member(request)
+    if not member:
+        return JsonResponse({"error": "login required"}, status=401)
+    detail = get_submission_detail(member.team, submission_id)
+    if detail is None:
+        return JsonResponse({"error": "not found"}, status=404)
+    return JsonResponse(detail)
+
+
+@require_http_methods(["GET"])
+async def board_events(request):
+    """
+    팀 제출 변경 사항을 Server-Sent Events 로 내보낸다. ASGI 서버(secant.asgi)에서
+    실행해야 연결 하나가 워커를 붙잡지 않으므로 BINGO_EVENTS_ENABLED 를 켠 경우에만 연다.
+    """
+    if not getattr(settings, "BINGO_EVENTS_ENABLED", False):
+        raise Http404("실시간 알림이 꺼져 있습니다.")
+    member = await aget_member(request)
+    if not member:
+        return HttpResponse(status=401)
+
+    broker = get_broker()
+    subscription = broker.subscribe(member.team)
+    heartbeat = getattr(settings, "BINGO_EVENT_HEARTBEAT", 15)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def attachment_media(request, attachment_id: int, variant: str = ""):
+    """
+    첨부 원본 또는 썸네일(variant: 너비/"poster")을 돌려준다. 같은 팀원과 스태프만 받을 수 있다.
+    """
+    attachments = BingoSubmissionAttachment.objects.all()
+    if not (request.user.is_authenticated and request.user.is_staff):
+        member = get_member(request)
+        if not member:
+            return HttpResponse(status=401)
+        attachments = attachments.filter(submission__event_id=member.event_id, submission__team=member.team)
+    attachment = get_object_or_404(attachments, pk=attachment_id)
+
+    if not variant:
+        # 내용 주소 저장소의 파일 이름에 SHA-256 이 들어 있으므로 예전 행도 ETag 를 만들 수 있다.
+        with phase("storage"):
+            return serve_file(
+                request,
+                default_attachment_storage,
+                attachment.file.name,
+                etag=attachment.sha256 or attachment.file.name,
+                content_type=attachment.content_type,
+                filename=attachment.filename,
+            )
+    name = attachment.thumbnails.get(variant)
+    if not name:
+        raise Http404("썸네일이 없습니다.")
+    with phase("storage"):
+        return serve_file(request, default_storage, name, etag=f"{attachment.sha256 or attachment.pk}-{variant}")
 
 
 @csrf_exempt
@@ -128,122 +252,75 @@ def logout_view(request):
 
 @require_http_methods(["POST"])
 def submit_bingo_item(request, item_id: int):
-    member = _get_member_from_session(request)
+    member = get_member(request)
     if not member:
         return redirect("login")
 
-    bingo_item = get_object_or_404(BingoItem, id=item_id, team=member.team)
-    existing = BingoSubmission.objects.filter(team=member.team, bingo_item=bingo_item).first()
-    if existing:
-        messages.info(request, "이미 제출된 항목입니다. 상태를 기다려주세요.")
-        return redirect("board")
-
-    form = BingoSubmissionForm(request.POST, request.FILES, member=member)
+    bingo_item = get_object_or_404(BingoItem.objects.for_team(member.team), id=item_id)
+    form = BingoSubmissionForm(
+        request.POST,
+        request.FILES,
+        member=member,
+        upload_errors=_upload_errors(request),
+    )
     # 모델 clean에서 bingo_item을 참조하므로 검증 전에 미리 설정해 준다.
     form.instance.bingo_item = bingo_item
     form.instance.team = member.team
     form.instance.submitted_by = member
 
     if form.is_valid():
-        submission: BingoSubmission = form.save(commit=False)
-        submission.bingo_item = bingo_item
-        submission.team = member.team
-        submission.submitted_by = member
-        submission.status = BingoSubmission.STATUS_PENDING
-        submission.save()
-        form.save_m2m()
         uploaded_files = form.cleaned_data.get("attachments") or request.FILES.getlist("attachments")
         if not isinstance(uploaded_files, (list, tuple)):
             uploaded_files = [uploaded_files] if uploaded_files else []
-        for f in uploaded_files:
-            BingoSubmissionAttachment.objects.create(submission=submission, file=f)
+        try:
+            create_submission(form, member, bingo_item, uploaded_files)
+        except IntegrityError:
+            # 같은 칸을 동시에 제출한 경우 unique_submission_per_team_item 이 한쪽만 통과시킨다.
+            if not BingoSubmission.objects.for_team(member.team).filter(bingo_item=bingo_item).exists():
+                raise
+            messages.info(request, "이미 제출된 항목입니다. 상태를 기다려주세요.")
+            return redirect("board")
         messages.success(request, "제출이 완료되었어요. 승인 대기 상태입니다.")
         return redirect("board")
 
     # If validation fails, re-render board with errors
-    bingo_items = list(BingoItem.objects.filter(team=member.team).order_by("position"))
-    submissions = list(
-        BingoSubmission.objects.filter(team=member.team)
-        .select_related("bingo_item", "submitted_by")
-        .prefetch_related("participants", "attachments")
-    )
-    submissions_map = {s.bingo_item_id: s for s in submissions}
-    team_members = Member.objects.filter(team=member.team).order_by("name")
-    board_data = [(item, submissions_map.get(item.id)) for item in bingo_items]
-    submission_details = {}
-    for s in submissions:
-        submission_details[s.bingo_item_id] = {
-            "id": s.id,
-            "title": s.title,
-            "content": s.content,
-            "status": s.status,
-            "rejected_reason": s.rejected_reason,
-            "participants": [p.name for p in s.participants.all()],
-            "participant_ids": [p.id for p in s.participants.all()],
-            "attachments": [
-                {"url": a.file.url, "name": a.filename, "kind": a.kind} for a in s.attachments.all()
-            ],
-            "submitted_by": s.submitted_by.name,
-            "submitted_by_id": s.submitted_by_id,
-            "item_title": s.bingo_item.title,
-            "item_desc": s.bingo_item.description or "",
-            "item_position": s.bingo_item.position,
-        }
-    return render(
+    return _render_board(
         request,
-        "members/board.html",
-        {
-            "member": member,
-            "board_data": board_data,
-            "team_members": team_members,
-            "form_errors": form.errors,
-            "completed": False,
-            "bingo_line_completed": False,
-            "submission_details": submission_details,
-        },
+        member,
+        build_board_snapshot(member.team),
+        form_errors=form.errors,
+        completed=False,
+        bingo_line_completed=False,
     )
 
 
 @require_http_methods(["POST"])
 def update_submission(request, submission_id: int):
-    member = _get_member_from_session(request)
+    member = get_member(request)
     if not member:
         return redirect("login")
 
     submission = get_object_or_404(
-        BingoSubmission,
+        # 모델 clean 이 아이템과 제출자의 팀을 확인하므로 함께 읽는다.
+        BingoSubmission.objects.select_related("bingo_item", "submitted_by"),
         id=submission_id,
         submitted_by=member,
         status__in=[BingoSubmission.STATUS_PENDING, BingoSubmission.STATUS_REJECTED],
     )
-    existing_count = submission.attachments.count()
+    existing_attachments = list(submission.attachments.all())
     form = BingoSubmissionForm(
         request.POST,
         request.FILES,
         member=member,
-        existing_attachment_count=existing_count,
+        existing_attachment_count=len(existing_attachments),
+        upload_errors=_upload_errors(request),
         instance=submission,
     )
     if form.is_valid():
-        submission.title = form.cleaned_data["title"]
-        submission.content = form.cleaned_data["content"]
-        submission.save()
-        submission.participants.set(form.cleaned_data["participants"])
-
         uploaded_files = form.cleaned_data.get("attachments") or request.FILES.getlist("attachments")
         if not isinstance(uploaded_files, (list, tuple)):
             uploaded_files = [uploaded_files] if uploaded_files else []
-        if uploaded_files:
-            if submission.photo:
-                submission.photo.delete(save=False)
-                submission.photo = None
-                submission.save(update_fields=["photo"])
-            for attachment in submission.attachments.all():
-                attachment.file.delete(save=False)
-                attachment.delete()
-            for f in uploaded_files:
-                BingoSubmissionAttachment.objects.create(submission=submission, file=f)
-
+        edit_submission(submission, form, uploaded_files, existing_attachments)
         messages.success(request, "제출 내용을 수정했습니다.")
         return redirect("board")
 
@@ -253,7 +330,7 @@ def update_submission(request, submission_id: int):
 
 @require_http_methods(["POST"])
 def cancel_submission(request, submission_id: int):
-    member = _get_member_from_session(request)
+    member = get_member(request)
     if not member:
         return redirect("login")
 
@@ -265,9 +342,10 @@ def cancel_submission(request, submission_id: int):
     )
     if submission.photo:
         submission.photo.delete(save=False)
-    for attachment in submission.attachments.all():
-        attachment.file.delete(save=False)
-        attachment.delete()
-    submission.delete()
+    # 첨부 이름을 읽고 제출을 지우는 사이에 다른 쓰기가 끼어들지 않도록 한 트랜잭션으로 묶는다.
+    with transaction.atomic():
+        names = list(submission.attachments.values_list("file", flat=True))
+        submission.delete()
+        release_attachment_files_on_commit(names)
     messages.info(request, "제출을 취소했어요. 다시 제출할 수 있습니다.")
     return redirect("board")
@@ -3,6 +3,10 @@ ASGI config for secant project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The board event stream (members.views.board_events) is an async view that
+holds one long-lived connection per client, so run it under an ASGI server
+(e.g. ``uvicorn secant.asgi:application``) rather than the WSGI workers.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
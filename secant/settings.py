@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .sqlite import sqlite_options
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,11 +44,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 가장 바깥에 두어 다른 미들웨어 시간까지 잰다.
+    'members.metrics.InstrumentationMiddleware',
+    # 토큰이 있거나 표본으로 뽑힌 요청만 프로파일한다(members.profiling).
+    'members.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'members.middleware.MemberMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -56,8 +64,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # DEBUG 와 상관없이 컴파일한 템플릿을 프로세스에 보관한다(DEBUG 에서는 파일이 바뀌면 비운다).
+            # 보드의 칸/참가자 목록 조각은 {% cache %} 로 BINGO_BOARD_CACHE_ALIAS 에 따로 캐시한다.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -74,14 +89,117 @@ WSGI_APPLICATION = 'secant.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# SQLite 연결 프로파일(secant/sqlite.py). 'tuned' 는 WAL·busy_timeout 등의 PRAGMA 와
+# BEGIN IMMEDIATE 트랜잭션을 쓴다. 'default' 는 Django 기본 설정 그대로다.
+BINGO_SQLITE_PROFILE = os.environ.get('BINGO_SQLITE_PROFILE', 'tuned')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': sqlite_options(BINGO_SQLITE_PROFILE),
+        # 테스트도 운영과 같은 잠금 동작(WAL·busy_timeout)을 쓰도록 메모리 대신 파일 DB 를 쓴다.
+        # 메모리 DB 의 공유 캐시 모드는 동시 연결에서 busy_timeout 없이 바로 실패한다.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# 팀 빙고판 스냅샷 캐시에 사용한다. 여러 워커 프로세스가 같은 캐시를 보도록 하려면
+# 'django.core.cache.backends.filebased.FileBasedCache' 와 LOCATION 을 지정한다.
+# 기본 LocMemCache 는 프로세스마다 따로라서, 한 워커에서 일어난 제출/승인이 다른 워커의
+# 빙고판 캐시를 지우지 못한다. 그래서 이 경우 스냅샷/조각 캐시 수명은
+# BINGO_LOCAL_BOARD_CACHE_TIMEOUT 초로 줄어들고, BINGO_BOARD_CACHE_TIMEOUT 은 공유 캐시에서만 그대로 쓰인다.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'secant-bingo',
+    }
+}
+
+BINGO_BOARD_CACHE_ALIAS = 'default'
+BINGO_BOARD_CACHE_TIMEOUT = 60 * 60
+BINGO_LOCAL_BOARD_CACHE_TIMEOUT = 5
+# 리더보드 ETag/Last-Modified 의 기준 시각을 캐시에 두는 시간(초). 다른 워커에서 생긴 변경은
+# 프로세스별 캐시를 지우지 못하므로, 이 시간이 지나면 DB 에서 다시 읽어 304 가 멈추지 않게 한다.
+BINGO_LAST_CHANGE_TIMEOUT = 10
+
+# 리더보드 주소에 ?event=<slug> 가 없을 때 보여줄 행사(members.Event.slug)
+BINGO_DEFAULT_EVENT_SLUG = os.environ.get('BINGO_DEFAULT_EVENT_SLUG', 'default')
+
+# 로그인 회원 레코드 캐시(request.member). Member 저장/삭제 시 시그널이 지운다.
+# 시그널은 저장한 프로세스의 캐시만 지우므로, 프로세스별 LocMemCache 에서는 다른 워커가
+# 최대 BINGO_MEMBER_CACHE_TIMEOUT 초 동안 옛 팀/이름을 본다. 그래서 기본값은 몇 초로 두고,
+# 여러 워커가 공유하는 캐시(Redis 등)를 별칭으로 지정했을 때만 늘린다. 빙고판 캐시도 같은 이유로
+# LocMemCache 에서는 BINGO_LOCAL_BOARD_CACHE_TIMEOUT 초만 유지한다.
+BINGO_MEMBER_CACHE_ALIAS = 'default'
+BINGO_MEMBER_CACHE_TIMEOUT = 30
+
+# 로그인 시도 제한(토큰 버킷). 범위별 (버킷 크기, 가득 차는 데 걸리는 초).
+# 추측은 학번 버킷이 막는다. IP 버킷은 행사장처럼 한 공인 IP(NAT) 뒤에서 참가자 전원이
+# 몰려 로그인해도 걸리지 않도록 넉넉하게 두고, 학번을 훑는 스크립트만 막는다.
+# 여러 프로세스가 한도를 공유하려면 공용 캐시(Redis 등)의 별칭을 지정한다.
+BINGO_LOGIN_THROTTLE_RATES = {
+    'ip': (600, 60),
+    'student_id': (5, 300),
+}
+BINGO_LOGIN_THROTTLE_CACHE_ALIAS = 'default'
+# 리버스 프록시(nginx 등) 뒤에서는 반드시 원래 클라이언트 주소가 담긴 META 키를 지정한다
+# (예: 'HTTP_X_FORWARDED_FOR', 프록시가 한 값으로 덮어쓰는 'HTTP_X_REAL_IP'). 비워 두면 모든
+# 요청이 프록시 주소로 보여 IP 버킷 하나를 전체가 나눠 쓴다.
+# 목록 헤더는 클라이언트가 앞부분을 마음대로 채워 보낼 수 있으므로 오른쪽에서
+# BINGO_TRUSTED_PROXY_COUNT 번째 항목(우리 프록시가 덧붙인 주소)만 쓴다. 프록시를 두 단계
+# (예: CDN + nginx) 거치면 2 로 올린다. 프록시 없이 헤더를 지정하면 헤더 전체를 꾸밀 수 있다.
+BINGO_CLIENT_IP_HEADER = ''
+BINGO_TRUSTED_PROXY_COUNT = 1
+
+# 세션 저장 방식 프리셋. 기본 cached_db 는 읽기를 캐시에서 처리하고,
+# signed_cookies 는 세션 테이블을 전혀 쓰지 않는다(세션 데이터가 쿠키에 서명되어 담긴다).
+SESSION_PRESETS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+BINGO_SESSION_PRESET = os.environ.get('BINGO_SESSION_PRESET', 'cached_db')
+SESSION_ENGINE = SESSION_PRESETS[BINGO_SESSION_PRESET]
+SESSION_CACHE_ALIAS = 'default'
+
+# 요청 계측(members.metrics). 지표는 /metrics/ 에서 Prometheus 텍스트 형식으로 읽는다.
+# 스태프 로그인 또는 "Authorization: Bearer <BINGO_METRICS_TOKEN>" 이 필요하다.
+BINGO_METRICS_ENABLED = True
+BINGO_METRICS_TOKEN = os.environ.get('BINGO_METRICS_TOKEN', '')
+# 이 시간(ms)을 넘긴 요청은 members.metrics.slow 로거에 경고로 남긴다.
+BINGO_SLOW_REQUEST_MS = 500
+# 켜면 응답에 Server-Timing 헤더(db/구간/전체 시간)를 붙인다.
+BINGO_SERVER_TIMING = DEBUG
+
+# 요청 프로파일링(members.profiling). /admin/profiles/ 에서 토큰을 만들고 결과를 내려받는다.
+# WSGI 와 ASGI 모두에서 동기 뷰를 잰다. 비동기 뷰(SSE 스트림)는 프로파일하지 않는다.
+# 'sampling' 은 스택 표본(.collapsed, flamegraph 용), 'cprofile' 은 cProfile(.prof).
+BINGO_PROFILER = os.environ.get('BINGO_PROFILER', 'sampling')
+# 토큰 없이도 이 비율만큼 무작위로 프로파일한다. 운영에서는 0.01 이하로 둔다.
+BINGO_PROFILE_SAMPLE_RATE = float(os.environ.get('BINGO_PROFILE_SAMPLE_RATE', '0'))
+BINGO_PROFILE_INTERVAL = 0.005
+BINGO_PROFILE_TOKEN_MAX_AGE = 60 * 60
+BINGO_PROFILE_DIR = os.environ.get('BINGO_PROFILE_DIR', str(BASE_DIR / 'var' / 'profiles'))
+# 이 개수를 넘으면 오래된 파일부터 지운다.
+BINGO_PROFILE_MAX_FILES = 50
+
+# 보드 실시간 알림(SSE). 기본은 꺼져 있고 보드는 BINGO_BOARD_POLL_SECONDS 마다 바뀐 칸만 가져온다.
+# 켜려면 두 가지가 필요하다.
+#   - ASGI 서버(secant.asgi)로 실행한다. WSGI 에서는 열린 보드 탭마다 워커 스레드 하나를 계속 붙잡는다.
+#   - 프로세스가 하나이거나, 여러 프로세스와 admin 의 변경을 모두 전달하는 공유 브로커를
+#     BINGO_EVENT_BROKER 로 지정한다. 기본 LocalBroker 는 같은 프로세스에서 일어난 변경만 전달한다.
+BINGO_EVENTS_ENABLED = os.environ.get('BINGO_EVENTS_ENABLED', '') == '1'
+BINGO_BOARD_POLL_SECONDS = 15
+BINGO_EVENT_BROKER = 'members.events.LocalBroker'
+BINGO_EVENT_HEARTBEAT = 15
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -121,6 +239,34 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# File uploads
+# 첨부 파일은 청크 단위로 임시 파일에 바로 기록하며 크기 제한과 SHA-256 을 함께 계산한다.
+# 운영 서버에서는 FILE_UPLOAD_TEMP_DIR 을 MEDIA_ROOT 와 같은 파일시스템의 디렉터리로
+# 지정하면 저장 시 복사 없이 이동만 한다.
+FILE_UPLOAD_HANDLERS = ['members.uploads.StreamingAttachmentUploadHandler']
+BINGO_MAX_ATTACHMENT_BYTES = 200 * 1024 * 1024
+BINGO_MAX_SUBMISSION_BYTES = 500 * 1024 * 1024
+
+# 첨부 썸네일(Pillow)과 동영상 포스터 프레임(ffmpeg, 있을 때만)을 업로드 후 백그라운드에서 만든다.
+BINGO_THUMBNAIL_WIDTHS = (320, 960)
+BINGO_THUMBNAIL_WORKERS = 2
+BINGO_THUMBNAILS_SYNC = False
+
+# 첨부 전송(/attachments/<id>/). 운영에서는 앞단 서버에 실제 전송을 맡긴다.
+#   nginx: BINGO_MEDIA_ACCEL = 'x-accel-redirect' 와 함께
+#     location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+#   internal 이 없으면 누구나 /protected-media/ 로 블롭을 직접 받을 수 있다. /media/ 를 공개로
+#   내보낸다면 <MEDIA_ROOT>/bingo_photos/ 만 별칭으로 걸고, bingo_attachments/·bingo_thumbnails/
+#   는 공개 위치에 두지 않는다.
+#   Apache(mod_xsendfile)/lighttpd: BINGO_MEDIA_ACCEL = 'x-sendfile'
+# 비워 두면 Django 가 Range 요청을 포함해 직접 보낸다.
+# 참조가 사라진 첨부 블롭도 이 시간(초) 안에 쓰였거나 다른 업로드가 다시 쓴 것은 바로 지우지 않는다.
+# 남은 블롭은 manage.py sweep_attachment_blobs 를 주기적으로 실행해 정리한다.
+BINGO_ATTACHMENT_RELEASE_GRACE = 15 * 60
+BINGO_MEDIA_ACCEL = ''
+BINGO_MEDIA_ACCEL_PREFIX = '/protected-media/'
+BINGO_MEDIA_MAX_AGE = 60 * 60 * 24
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -19,7 +19,22 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from members.admin import profile_detail_view, profile_download_view, profile_list_view
+
 urlpatterns = [
+    # admin.site.urls 보다 먼저 두어야 admin 의 catch-all 에 걸리지 않는다.
+    path("admin/profiles/", admin.site.admin_view(profile_list_view), name="admin_profiles"),
+    path("admin/profiles/<str:name>/", admin.site.admin_view(profile_detail_view), name="admin_profile_detail"),
+    path(
+        "admin/profiles/<str:name>/download/",
+        admin.site.admin_view(profile_download_view),
+        name="admin_profile_download",
+    ),
     path("admin/", admin.site.urls),
     path("", include("members.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + static(
+    # 개발 서버에서는 예전 단일 사진(bingo_photos)만 그대로 보낸다. 첨부 블롭과 썸네일은
+    # 팀 권한을 확인하는 members.views.attachment_media 로만 받을 수 있다.
+    settings.MEDIA_URL + "bingo_photos/",
+    document_root=settings.MEDIA_ROOT / "bingo_photos",
+)